@@ -1,107 +1,70 @@
-from flask import Flask, request, jsonify, send_file
+from flask import Flask, Request, request, jsonify, Response, send_file, stream_with_context
+from werkzeug.exceptions import HTTPException
 from flask_cors import CORS
-import tempfile
 import os
-from cryptography.fernet import Fernet
-import base64
-import hashlib
 from datetime import datetime
-from openpyxl import load_workbook
-import io
+import functools
+import itertools
+import shutil
+import tempfile
+from mxtcore.cipher import get_cipher_context, DEFAULT_KDF, KDF_CHOICES
+from mxtcore.inventory import open_inventory_rows, check_session_types, detect_input_format
+from mxtcore.render import iter_mxtsessions_content, iter_chunks, STREAM_CHUNK_SIZE
+from mxtcore.templates import DEFAULT_TEMPLATES
+from mxtcore.batch import plan_sections, convert_sections, iter_zip_archive, OUTPUT_MERGED, OUTPUT_ZIP, OUTPUT_CHOICES
+from mxtcore.cache import ResultCache, result_cache_key
+from mxtcore.jobs import JobStore, JobQueueFull, JOB_COMPLETED, JOB_FAILED
+from mxtcore.metrics import GenerateMetrics, render_metrics, ADMISSION_REJECTED, ADMISSION_WAIT_SECONDS
+from mxtcore.admission import AdmissionController, AdmissionRejected
+from mxtcore.timing import STAGE_UPLOAD, STAGE_PARSE, STAGE_RENDER
+from mxtcore.compression import negotiate_encoding, iter_compressed, strip_gzip_suffix
+from mxtcore.uploads import UploadTooLarge, spooled_file, open_upload, detach_upload, save_upload, stream_size, format_limit, MAX_UPLOAD_BYTES
+from mxtcore.incremental import PreviousSessions
+from mxtcore.profiling import RequestProfiler, profile_path, PROFILE_FORMAT_PSTATS, PROFILE_FORMAT_TEXT
+
+class SpoolingRequest(Request):
+    """Request whose uploaded files are spooled to disk past MXT_UPLOAD_SPOOL_BYTES"""
+    
+    def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+        return spooled_file()
 
 app = Flask(__name__)
+app.request_class = SpoolingRequest
 CORS(app)  # Enable CORS for all routes
 
-def generate_key_from_password(password):
-    """Generate a Fernet key from a password"""
-    # Create a consistent key from password using SHA-256 and base64 encoding
-    key = hashlib.sha256(password.encode()).digest()
-    return base64.urlsafe_b64encode(key)
+# Requests with a larger body are answered with 413 before it is read (MXT_MAX_UPLOAD_BYTES=0 disables the limit)
+app.config['MAX_CONTENT_LENGTH'] = MAX_UPLOAD_BYTES or None
 
-def encrypt_password(password, encryption_key):
-    """Encrypt a password using Fernet encryption"""
-    try:
-        key = generate_key_from_password(encryption_key)
-        fernet = Fernet(key)
-        encrypted = fernet.encrypt(password.encode())
-        return base64.urlsafe_b64encode(encrypted).decode()
-    except Exception as e:
-        raise Exception(f"Encryption failed: {str(e)}")
+# Bump when the generated output changes so cached results and ETags are invalidated
+OUTPUT_FORMAT_VERSION = 2
 
-def decrypt_password(encrypted_password, encryption_key):
-    """Decrypt a password using Fernet encryption"""
-    try:
-        key = generate_key_from_password(encryption_key)
-        fernet = Fernet(key)
-        encrypted_bytes = base64.urlsafe_b64decode(encrypted_password.encode())
-        decrypted = fernet.decrypt(encrypted_bytes)
-        return decrypted.decode()
-    except Exception as e:
-        raise Exception(f"Decryption failed: {str(e)}")
+# Cache of plain-mode results; encrypted output is never cached
+result_cache = ResultCache(
+    max_entries=int(os.environ.get('MXT_RESULT_CACHE_SIZE', 32)),
+    ttl=int(os.environ.get('MXT_RESULT_CACHE_TTL', 3600)),
+    max_entry_bytes=int(os.environ.get('MXT_RESULT_CACHE_MAX_BYTES', 16 * 1024 * 1024)),
+    max_total_bytes=int(os.environ.get('MXT_RESULT_CACHE_TOTAL_BYTES', 64 * 1024 * 1024))
+)
 
-def read_excel_file(file_content):
-    """Read Excel file using openpyxl and return data as list of dictionaries"""
-    try:
-        # Load workbook from file content
-        workbook = load_workbook(io.BytesIO(file_content))
-        worksheet = workbook.active
-        
-        # Get header row (first row)
-        headers = []
-        for cell in worksheet[1]:
-            if cell.value:
-                headers.append(str(cell.value).strip())
-            else:
-                headers.append('')
-        
-        # Validate required columns
-        required_columns = ['Hostname', 'IP', 'user', 'password']
-        missing_columns = [col for col in required_columns if col not in headers]
-        
-        if missing_columns:
-            raise ValueError(f"Missing required columns: {', '.join(missing_columns)}")
-        
-        # Get column indices
-        hostname_idx = headers.index('Hostname')
-        ip_idx = headers.index('IP')
-        user_idx = headers.index('user')
-        password_idx = headers.index('password')
-        
-        # Read data rows
-        data = []
-        for row_num, row in enumerate(worksheet.iter_rows(min_row=2, values_only=True), start=2):
-            if not row or all(cell is None or str(cell).strip() == '' for cell in row):
-                continue  # Skip empty rows
-            
-            # Ensure we have enough columns
-            row_data = list(row) + [None] * (len(headers) - len(row))
-            
-            hostname = str(row_data[hostname_idx] or '').strip()
-            ip = str(row_data[ip_idx] or '').strip()
-            user = str(row_data[user_idx] or '').strip()
-            password = str(row_data[password_idx] or '').strip()
-            
-            # Skip rows without essential data
-            if not hostname or not ip:
-                continue
-                
-            data.append({
-                'Hostname': hostname,
-                'IP': ip,
-                'user': user,
-                'password': password
-            })
-        
-        if not data:
-            raise ValueError("No valid data rows found in Excel file")
-        
-        return data
-        
-    except Exception as e:
-        if "Missing required columns" in str(e) or "No valid data rows" in str(e):
-            raise e
-        else:
-            raise Exception(f"Failed to read Excel file: {str(e)}")
+# Background conversions; the directory is shared by all workers on the host
+job_store = JobStore(
+    os.environ.get('MXT_JOBS_DIR', os.path.join(tempfile.gettempdir(), 'mxtsessions-jobs')),
+    max_workers=int(os.environ.get('MXT_JOB_WORKERS', 2)),
+    max_pending=int(os.environ.get('MXT_JOB_QUEUE_LIMIT', 8)),
+    ttl=int(os.environ.get('MXT_JOB_TTL', 3600))
+)
+
+# Admission control for /generate, per worker; keep capacity + queue below GUNICORN_THREADS so /health always finds a free thread
+admission = AdmissionController.from_environ()
+
+# Generated output up to this size is produced before the headers go out, so they can carry Server-Timing.
+# The default of one stream chunk costs no extra delay (the first chunk is built before anything is sent anyway)
+# and covers small files; larger values report timings for bigger files at the cost of a later first byte
+SERVER_TIMING_BUFFER_BYTES = int(os.environ.get('MXT_SERVER_TIMING_BUFFER_BYTES', STREAM_CHUNK_SIZE))
+
+# Per-request profiling, requested with the X-MXT-Profile header once enabled here
+PROFILING_ENABLED = os.environ.get('MXT_PROFILING', '').lower() in ('1', 'true', 'yes', 'on')
+PROFILE_DIR = os.environ.get('MXT_PROFILE_DIR', os.path.join(tempfile.gettempdir(), 'mxtsessions-profiles'))
 
 def write_excel_file(data, output_path):
     """Write data to Excel file using openpyxl"""
@@ -125,56 +88,56 @@ def write_excel_file(data, output_path):
             worksheet.cell(row=row_num, column=4, value=row_data['password'])
         
         workbook.save(output_path)
-        
+    
     except Exception as e:
         raise Exception(f"Failed to write Excel file: {str(e)}")
 
-def mobaxterm_encrypt_password(password, master_password):
+def mobaxterm_encrypt_password(password, master_password, kdf=DEFAULT_KDF):
     """
     Encrypt password using MobaXterm-compatible method
     This uses a simplified version of MobaXterm's encryption
     """
     try:
-        # Use the same encryption method but format for MobaXterm
-        key = generate_key_from_password(master_password)
-        fernet = Fernet(key)
-        encrypted = fernet.encrypt(password.encode())
-        # Return base64 encoded for MobaXterm compatibility
-        return base64.urlsafe_b64encode(encrypted).decode()
+        # Reuse the cached cipher context; output is base64 encoded for MobaXterm compatibility
+        return get_cipher_context(master_password, kdf).encrypt(password)
     except Exception as e:
         raise Exception(f"MobaXterm encryption failed: {str(e)}")
 
-def generate_mxtsessions_content(data, file_name, password_format='plain', encryption_key=None):
-    """Generate MobaXterm sessions file content with password format option"""
+def response_encoding(mimetype='text/plain'):
+    """Content coding negotiated from Accept-Encoding; zip archives are already compressed"""
+    if mimetype == 'application/zip':
+        return None
+    return negotiate_encoding(request.accept_encodings)
+
+def encoded_etag(etag, encoding):
+    """Each content coding is a different representation, so it gets its own ETag"""
+    return f"{etag}-{encoding}" if encoding else etag
+
+def sessions_response(chunks, output_filename, etag=None, mimetype='text/plain', metrics=None):
+    """Build the streamed download response for a generated sessions file
+
+    The body is compressed incrementally when the client accepts it.
+    """
+    encoding = response_encoding(mimetype)
+    if encoding:
+        chunks = iter_compressed(chunks, encoding)
+    if metrics is not None:
+        chunks = metrics.stream(chunks)
     
-    # Header section
-    content = "[Bookmarks]\n"
-    content += f"SubRep={file_name}\n"
-    content += f"ImgNum=41\n\n"
+    # Keep the request (and its spooled upload, read lazily by the parser) open until the body is sent
+    response = Response(stream_with_context(chunks), mimetype=mimetype)
+    response.headers.set('Content-Disposition', 'attachment', filename=output_filename)
     
-    # Sessions section
-    for row in data:
-        hostname = row['Hostname']
-        ip = row['IP']
-        username = row['user']
-        password = row['password']
-        
-        # Handle password based on format preference
-        if password_format == 'encrypted' and encryption_key and password:
-            try:
-                # Encrypt password for MobaXterm
-                password = mobaxterm_encrypt_password(password, encryption_key)
-                # Add encryption indicator for MobaXterm (custom format)
-                password = f"ENC:{password}"
-            except Exception as e:
-                # If encryption fails, fall back to plain text with warning
-                password = f"ENCRYPT_FAILED_{password}"
-        
-        # Session entry format for MobaXterm
-        session_name = f"{hostname}_{ip}"
-        content += f"{session_name}=#109#0%{ip}%22%{username}%{password}%-1%-1%%%%%0%0%0%%1080%%0%0%1#MobaFont%10%0%0%-1%15%236,236,236%30,30,30%180,180,192%0%-1%0%%xterm%-1%-1%_Std_Colors_0_%80%24%0%1%-1%<none>%%0%1%-1#0# #-1\n"
+    if mimetype != 'application/zip':
+        response.vary.add('Accept-Encoding')
+    if encoding:
+        response.content_encoding = encoding
     
-    return content
+    if etag is not None:
+        response.set_etag(encoded_etag(etag, encoding))
+        response.headers['Cache-Control'] = 'no-cache'
+    
+    return response
 
 @app.route('/', methods=['GET'])
 def home():
@@ -188,85 +151,444 @@ def home():
             "Lightweight processing without pandas"
         ],
         "endpoints": {
-            "/generate": "POST - Generate MobaXterm sessions file (supports passwordFormat: 'plain' or 'encrypted')",
-            "/health": "GET - Health check"
+            "/generate": "POST - Generate MobaXterm sessions file (supports passwordFormat: 'plain' or 'encrypted', multiple files, allSheets and output: 'merged' or 'zip')",
+            "/jobs": "POST - Start a background conversion (same fields as /generate), returns a job id",
+            "/jobs/<id>": "GET - Job status and rows processed",
+            "/jobs/<id>/result": "GET - Download the output of a completed job",
+            "/health": "GET - Health check",
+            "/metrics": "GET - Prometheus metrics",
+            "/profiles/<id>": "GET - Download a request profile (when MXT_PROFILING is enabled)"
         }
     })
 
+@app.errorhandler(413)
+def request_too_large(e):
+    limit = app.config['MAX_CONTENT_LENGTH']
+    return jsonify({"error": f"Upload exceeds the {format_limit(limit)} limit" if limit else "Upload too large"}), 413
+
 @app.route('/health', methods=['GET'])
 def health_check():
     return jsonify({"status": "healthy", "timestamp": datetime.now().isoformat()})
 
+@app.route('/metrics', methods=['GET'])
+def metrics():
+    payload, content_type = render_metrics()
+    return Response(payload, mimetype=content_type)
+
+UNSUPPORTED_FILE_ERROR = "Only .xlsx, .csv, .tsv and .jsonl files are supported"
+
+def read_upload(file):
+    """Open an uploaded inventory for reading and detect its format
+
+    Returns ``(file_content, input_format)`` where ``file_content`` is the
+    spooled upload stream itself, not a copy. Gzip-compressed uploads
+    (e.g. ``servers.xlsx.gz``) are decompressed into a new spool that
+    replaces the upload's stream, so the request still closes it.
+    ``input_format`` is None when neither the extension nor the content
+    is recognised.
+    """
+    file_content = open_upload(file.stream)
+    if file_content is not file.stream:
+        file.stream.close()
+        file.stream = file_content
+    return file_content, detect_input_format(strip_gzip_suffix(file.filename), file_content)
+
+def upload_error_response(e, filename=None):
+    """413 for uploads over a size limit, 400 for anything else wrong with them"""
+    message = f"{filename}: {str(e)}" if filename else str(e)
+    return jsonify({"error": message}), 413 if isinstance(e, UploadTooLarge) else 400
+
+def read_generate_form():
+    """Validate the form fields shared by /generate and /jobs
+
+    Returns ``(options, None)`` on success or ``(None, error_response)``.
+    """
+    # Check if file is present
+    if 'file' not in request.files:
+        return None, (jsonify({"error": "No file uploaded"}), 400)
+    
+    files = request.files.getlist('file')
+    if any(file.filename == '' for file in files):
+        return None, (jsonify({"error": "No file selected"}), 400)
+    
+    # Get password format preference (plain or encrypted)
+    password_format = request.form.get('passwordFormat', 'plain')
+    encryption_key = request.form.get('encryptionKey', '') if password_format == 'encrypted' else None
+    
+    # Validate encryption key if encrypted format is requested
+    if password_format == 'encrypted' and not encryption_key:
+        return None, (jsonify({"error": "Master password is required for encrypted format"}), 400)
+    
+    # Optional slow key derivation (must match when decrypting)
+    kdf = request.form.get('kdf', DEFAULT_KDF)
+    if kdf not in KDF_CHOICES:
+        return None, (jsonify({"error": f"Unsupported kdf '{kdf}', expected one of: {', '.join(KDF_CHOICES)}"}), 400)
+    
+    # Batch options: convert every sheet, and merge into one file or return a zip
+    all_sheets = request.form.get('allSheets', '').lower() in ('1', 'true', 'yes', 'on')
+    output = request.form.get('output', OUTPUT_MERGED)
+    if output not in OUTPUT_CHOICES:
+        return None, (jsonify({"error": f"Unsupported output '{output}', expected one of: {', '.join(OUTPUT_CHOICES)}"}), 400)
+    
+    # Generate file name from original filename
+    base_filename = os.path.splitext(strip_gzip_suffix(files[0].filename))[0] if len(files) == 1 else 'sessions'
+    
+    # Generate filename based on format
+    format_suffix = '_encrypted' if password_format == 'encrypted' else ''
+    extension = 'zip' if output == OUTPUT_ZIP else 'mxtsessions'
+    
+    return {
+        'file': files[0],
+        'files': files,
+        'previous_file': request.files.get('previousFile'),
+        'password_format': password_format,
+        'encryption_key': encryption_key,
+        'kdf': kdf,
+        'all_sheets': all_sheets,
+        'output': output,
+        'batch': len(files) > 1 or all_sheets or output == OUTPUT_ZIP,
+        'base_filename': base_filename,
+        'output_filename': f"{base_filename}{format_suffix}.{extension}"
+    }, None
+
+def generate_batch(options, metrics):
+    """Convert several workbooks or sheets concurrently into one merged file or zip archive"""
+    # Sheets are converted on the process pool, so each workbook is saved where the workers can open it
+    workdir = tempfile.mkdtemp(prefix='mxt-batch-')
+    metrics.on_finish.append(functools.partial(shutil.rmtree, workdir, ignore_errors=True))
+    
+    workbooks = []
+    for index, file in enumerate(options['files']):
+        try:
+            file_content, input_format = metrics.clock.measure(STAGE_UPLOAD, read_upload, file)
+        except Exception as e:
+            return upload_error_response(e, file.filename)
+        if input_format is None:
+            return jsonify({"error": f"{file.filename}: {UNSUPPORTED_FILE_ERROR}"}), 400
+        metrics.input_bytes += stream_size(file_content)
+        path = save_upload(file_content, os.path.join(workdir, f"{index}.{input_format}"))
+        workbooks.append((os.path.splitext(strip_gzip_suffix(file.filename))[0], path, input_format))
+    
+    merged = options['output'] == OUTPUT_MERGED
+    
+    try:
+        sections = plan_sections(workbooks, options['all_sheets'])
+        # Every section is converted before or while streaming, so check their session types up front
+        for section in sections:
+            with open(section.path, 'rb') as f:
+                metrics.clock.measure(STAGE_PARSE, check_session_types, f, section.input_format, section.sheet_name)
+        contents = convert_sections(
+            sections,
+            password_format=options['password_format'],
+            encryption_key=options['encryption_key'],
+            kdf=options['kdf'],
+            merged=merged
+        )
+        # Convert the first section before responding, so a bad inventory still gets a 400
+        contents = itertools.chain(list(itertools.islice(contents, 1)), contents)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    
+    if merged:
+        return sessions_response(iter_chunks(contents), options['output_filename'], metrics=metrics)
+    
+    entries = zip((section.entry_name for section in sections), contents)
+    return sessions_response(iter_zip_archive(entries), options['output_filename'], mimetype='application/zip', metrics=metrics)
+
+def profile_requested():
+    """True when profiling is enabled and the client asked for a profile of this request"""
+    return PROFILING_ENABLED and request.headers.get('X-MXT-Profile', '').lower() in ('1', 'true', 'yes', 'on')
+
 @app.route('/generate', methods=['POST'])
 def generate_sessions():
+    # Profiled requests are diagnostic, so their whole body is produced up front for complete timings
+    profiler = RequestProfiler(PROFILE_DIR) if profile_requested() else None
+    metrics = GenerateMetrics(prefetch_bytes=None if profiler else SERVER_TIMING_BUFFER_BYTES)
+    
+    if profiler is not None:
+        if profiler.start():
+            metrics.on_finish.append(profiler.stop)
+        else:
+            profiler = None
+    
+    try:
+        response = app.make_response(admit_generate(metrics))
+    except Exception:
+        metrics.finish(500)
+        raise
+    
+    # Streamed bodies are recorded once the last chunk has been sent
+    if not metrics.streaming:
+        metrics.finish(response.status_code)
+    
+    # Timings are only complete when the body was produced before the headers were sent
+    if not metrics.streaming or metrics.body_complete:
+        response.headers['Server-Timing'] = metrics.clock.server_timing()
+        response.headers['Timing-Allow-Origin'] = '*'
+    
+    if profiler is not None:
+        response.headers['X-MXT-Profile-URL'] = f"/profiles/{profiler.profile_id}"
+    
+    return response
+
+def admit_generate(metrics):
+    """Run handle_generate once admission control has a slot for this upload
+
+    The upload is weighed by Content-Length before its body is read, so
+    rejected requests are answered without reading it. The slot is held
+    until the response body has been sent.
+    """
+    if not admission.enabled:
+        return handle_generate(metrics)
+    
     try:
-        # Check if file is present
-        if 'file' not in request.files:
-            return jsonify({"error": "No file uploaded"}), 400
+        permit = admission.acquire(admission.weight_for(request.content_length))
+    except AdmissionRejected as e:
+        ADMISSION_REJECTED.labels(str(e.status)).inc()
+        response = jsonify({"error": str(e)})
+        response.headers['Retry-After'] = str(e.retry_after)
+        return response, e.status
+    
+    ADMISSION_WAIT_SECONDS.observe(permit.waited)
+    metrics.on_finish.append(permit.release)
+    
+    try:
+        response = app.make_response(handle_generate(metrics))
+    except Exception:
+        permit.release()
+        raise
+    
+    # Also released if the server closes the response without iterating the body
+    response.call_on_close(permit.release)
+    return response
+
+def handle_generate(metrics):
+    try:
+        options, error_response = metrics.clock.measure(STAGE_UPLOAD, read_generate_form)
+        if error_response:
+            return error_response
         
-        file = request.files['file']
-        if file.filename == '':
-            return jsonify({"error": "No file selected"}), 400
+        metrics.password_format = 'encrypted' if options['password_format'] == 'encrypted' else 'plain'
         
-        if not file.filename.endswith('.xlsx'):
-            return jsonify({"error": "Only .xlsx files are supported"}), 400
+        if options['batch']:
+            if options['previous_file']:
+                return jsonify({"error": "previousFile is only supported when converting a single inventory"}), 400
+            return generate_batch(options, metrics)
         
-        # Get password format preference (plain or encrypted)
-        password_format = request.form.get('passwordFormat', 'plain')
-        encryption_key = request.form.get('encryptionKey', '') if password_format == 'encrypted' else None
+        try:
+            file_content, input_format = metrics.clock.measure(STAGE_UPLOAD, read_upload, options['file'])
+        except Exception as e:
+            return upload_error_response(e)
+        if input_format is None:
+            return jsonify({"error": UNSUPPORTED_FILE_ERROR}), 400
+        metrics.input_bytes = stream_size(file_content)
         
-        # Validate encryption key if encrypted format is requested
-        if password_format == 'encrypted' and not encryption_key:
-            return jsonify({"error": "Master password is required for encrypted format"}), 400
+        password_format = options['password_format']
+        base_filename = options['base_filename']
+        output_filename = options['output_filename']
+        
+        # Incremental mode: keep the tokens of unchanged sessions from the previous file
+        previous = None
+        if options['previous_file']:
+            try:
+                previous_content, _ = read_upload(options['previous_file'])
+                previous = PreviousSessions.from_content(previous_content)
+                if password_format == 'encrypted':
+                    previous.verify_master_password(options['encryption_key'], options['kdf'])
+            except Exception as e:
+                return upload_error_response(e)
+            
+            # Count the changes in a first pass over the inventory, so the report can go in the headers
+            # without holding the body back; in encrypted mode this pass also checks the previous tokens
+            try:
+                master_password = options['encryption_key'] if password_format == 'encrypted' else None
+                metrics.clock.measure(STAGE_PARSE, previous.compare, open_inventory_rows(file_content, input_format),
+                                      master_password, options['kdf'])
+            except Exception as e:
+                return jsonify({"error": str(e)}), 400
+            file_content.seek(0)
+        
+        # Plain output is fully determined by the upload, so repeats can skip parsing entirely
+        cache_key = None
+        if password_format != 'encrypted' and previous is None:
+            cache_key = result_cache_key(file_content, OUTPUT_FORMAT_VERSION, DEFAULT_TEMPLATES.fingerprint, input_format,
+                                         password_format, base_filename)
+            
+            etag = encoded_etag(cache_key, response_encoding())
+            if request.if_none_match.contains(etag):
+                response = Response(status=304)
+                response.set_etag(etag)
+                response.vary.add('Accept-Encoding')
+                return response
+            
+            cached_content = result_cache.get(cache_key)
+            if cached_content is not None:
+                return sessions_response([cached_content], output_filename, cache_key, metrics=metrics)
         
-        # Read Excel file
+        # Read the inventory; an unsupported session type is rejected here rather than mid-stream
+        # (the first pass of incremental mode has already checked every row)
         try:
-            file_content = file.read()
-            data = read_excel_file(file_content)
+            if previous is None:
+                metrics.clock.measure(STAGE_PARSE, check_session_types, file_content, input_format)
+                file_content.seek(0)
+            data = metrics.clock.measure(STAGE_PARSE, open_inventory_rows, file_content, input_format)
         except Exception as e:
             return jsonify({"error": str(e)}), 400
         
-        # Generate file name from original filename
-        base_filename = os.path.splitext(file.filename)[0]
+        # Stream the sessions file as it is generated instead of buffering it
+        sessions_content = iter_mxtsessions_content(
+            data,
+            base_filename,
+            password_format=password_format,
+            encryption_key=options['encryption_key'],
+            kdf=options['kdf'],
+            clock=metrics.clock,
+            previous=previous
+        )
         
-        # Generate MobaXterm sessions content
-        try:
-            sessions_content = generate_mxtsessions_content(
-                data, 
-                base_filename, 
-                password_format=password_format,
-                encryption_key=encryption_key
-            )
-        except Exception as e:
-            return jsonify({"error": f"Failed to generate sessions: {str(e)}"}), 500
+        chunks = metrics.clock.wrap(iter_chunks(sessions_content), STAGE_RENDER)
+        if cache_key is not None:
+            chunks = result_cache.tee(cache_key, chunks)
+        
+        response = sessions_response(chunks, output_filename, cache_key, metrics=metrics)
+        if previous is not None:
+            # Already complete: filled in by the first pass
+            report = previous.report
+            response.headers['X-MXT-Sessions-Added'] = str(len(report.added))
+            response.headers['X-MXT-Sessions-Changed'] = str(len(report.changed))
+            response.headers['X-MXT-Sessions-Removed'] = str(len(report.removed))
+            response.headers['X-MXT-Sessions-Unchanged'] = str(report.unchanged)
+        
+        return response
+    
+    except HTTPException:
+        # e.g. 413 raised by werkzeug while parsing the form
+        raise
+    except Exception as e:
+        return jsonify({"error": f"Internal server error: {str(e)}"}), 500
+
+def run_generate_job(progress, result_path, file_content, input_format, base_filename, password_format, encryption_key, kdf):
+    """Convert an uploaded inventory in the background, writing the output to ``result_path``
+
+    ``file_content`` is a detached copy of the upload, closed once the job is done.
+    """
+    try:
+        data = progress.track(open_inventory_rows(file_content, input_format))
+        sessions_content = iter_mxtsessions_content(
+            data,
+            base_filename,
+            password_format=password_format,
+            encryption_key=encryption_key,
+            kdf=kdf
+        )
+        
+        with open(result_path, 'wb') as f:
+            for chunk in iter_chunks(sessions_content):
+                f.write(chunk)
+    finally:
+        file_content.close()
+
+def job_status_response(status):
+    """Public view of a job's status"""
+    job_id = status['job_id']
+    return {
+        **status,
+        "status_url": f"/jobs/{job_id}",
+        "result_url": f"/jobs/{job_id}/result"
+    }
+
+@app.route('/jobs', methods=['POST'])
+def create_job():
+    try:
+        options, error_response = read_generate_form()
+        if error_response:
+            return error_response
         
-        # Create temporary file
-        with tempfile.NamedTemporaryFile(mode='w', suffix='.mxtsessions', delete=False) as tmp_file:
-            tmp_file.write(sessions_content)
-            tmp_file_path = tmp_file.name
+        if options['batch']:
+            return jsonify({"error": "Jobs accept a single workbook; use /generate for multi-sheet or multi-file conversion"}), 400
         
-        # Generate filename based on format
-        format_suffix = '_encrypted' if password_format == 'encrypted' else ''
-        output_filename = f"{base_filename}{format_suffix}.mxtsessions"
+        if options['previous_file']:
+            return jsonify({"error": "previousFile is not supported for jobs; use /generate"}), 400
         
-        # Return file
         try:
-            return send_file(
-                tmp_file_path,
-                as_attachment=True,
-                download_name=output_filename,
-                mimetype='text/plain'
+            file_content, input_format = read_upload(options['file'])
+        except Exception as e:
+            return upload_error_response(e)
+        if input_format is None:
+            return jsonify({"error": UNSUPPORTED_FILE_ERROR}), 400
+        
+        # The job outlives the request, which closes the upload's own stream
+        file_content = detach_upload(file_content)
+        try:
+            job_id = job_store.submit(
+                functools.partial(
+                    run_generate_job,
+                    file_content=file_content,
+                    input_format=input_format,
+                    base_filename=options['base_filename'],
+                    password_format=options['password_format'],
+                    encryption_key=options['encryption_key'],
+                    kdf=options['kdf']
+                ),
+                options['output_filename']
             )
-        finally:
-            # Clean up temporary file
-            try:
-                os.unlink(tmp_file_path)
-            except:
-                pass
-                
+        except JobQueueFull as e:
+            file_content.close()
+            response = jsonify({"error": str(e)})
+            response.headers['Retry-After'] = '30'
+            return response, 503
+        
+        return jsonify(job_status_response(job_store.get(job_id))), 202
+    
+    except HTTPException:
+        raise
     except Exception as e:
         return jsonify({"error": f"Internal server error: {str(e)}"}), 500
 
+@app.route('/jobs/<job_id>', methods=['GET'])
+def get_job(job_id):
+    status = job_store.get(job_id)
+    if status is None:
+        return jsonify({"error": "Job not found"}), 404
+    
+    return jsonify(job_status_response(status))
+
+@app.route('/jobs/<job_id>/result', methods=['GET'])
+def get_job_result(job_id):
+    status = job_store.get(job_id)
+    if status is None:
+        return jsonify({"error": "Job not found"}), 404
+    
+    if status['status'] == JOB_FAILED:
+        return jsonify({"error": f"Job failed: {status['error']}"}), 409
+    
+    if status['status'] != JOB_COMPLETED:
+        return jsonify({"error": f"Job is {status['status']}", "rows_processed": status['rows_processed']}), 409
+    
+    return send_file(
+        job_store.result_path(job_id),
+        as_attachment=True,
+        download_name=status['output_filename'],
+        mimetype='text/plain'
+    )
+
+@app.route('/profiles/<profile_id>', methods=['GET'])
+def get_profile(profile_id):
+    if not PROFILING_ENABLED:
+        return jsonify({"error": "Profiling is disabled"}), 404
+    
+    profile_format = request.args.get('format', PROFILE_FORMAT_PSTATS)
+    path = profile_path(PROFILE_DIR, profile_id, profile_format)
+    if path is None or not os.path.exists(path):
+        return jsonify({"error": "Profile not found"}), 404
+    
+    return send_file(
+        path,
+        as_attachment=True,
+        download_name=os.path.basename(path),
+        mimetype='text/plain' if profile_format == PROFILE_FORMAT_TEXT else 'application/octet-stream'
+    )
+
 if __name__ == '__main__':
     port = int(os.environ.get('PORT', 5000))
     app.run(host='0.0.0.0', port=port, debug=False)
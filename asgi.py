@@ -0,0 +1,290 @@
+"""
+ASGI entry point for the MXTSessions Generator
+
+An async alternative to app.py for deployments with many slow clients.
+Uploads and downloads are handled on the event loop. Parsing,
+encryption and compression run on the shared process pool, from a
+spooled input file to an output file. A slow connection therefore
+costs a coroutine instead of a whole worker. Serves /health, /metrics
+and single-inventory /generate; multi-file, incremental (previousFile)
+and /jobs conversions stay on the Flask app.
+
+Needs the optional packages in requirements-asgi.txt:
+    uvicorn asgi:app --port 5000
+    GUNICORN_WORKER_CLASS=uvicorn.workers.UvicornWorker gunicorn -c gunicorn.conf.py asgi:app
+"""
+
+import asyncio
+import contextlib
+import functools
+import os
+import shutil
+import tempfile
+import time
+from datetime import datetime
+from starlette.applications import Starlette
+from starlette.background import BackgroundTask
+from starlette.concurrency import run_in_threadpool
+from starlette.middleware import Middleware
+from starlette.middleware.cors import CORSMiddleware
+from starlette.requests import Request
+from starlette.responses import FileResponse, JSONResponse, Response
+from starlette.routing import Route
+from werkzeug.http import parse_accept_header
+from mxtcore.cipher import DEFAULT_KDF, KDF_CHOICES
+from mxtcore.inventory import detect_input_format
+from mxtcore.compression import negotiate_encoding, strip_gzip_suffix
+from mxtcore.uploads import UploadTooLarge, open_upload, format_limit, COPY_BUFFER_BYTES, MAX_UPLOAD_BYTES
+from mxtcore.admission import AdmissionController, AdmissionRejected
+from mxtcore.metrics import GenerateMetrics, render_metrics, ADMISSION_REJECTED, ADMISSION_WAIT_SECONDS
+from mxtcore.parallel import get_executor, shutdown_executors, EXECUTOR_PROCESS
+from mxtcore.offload import convert_file
+from mxtcore.timing import STAGE_UPLOAD, STAGE_SEND
+
+# Processes converting uploads for this server (shared with parallel encryption)
+CONVERT_PROCESSES = int(os.environ.get('MXT_ASGI_PROCESSES', os.cpu_count() or 1))
+
+# Spooled inputs and finished outputs waiting to be sent
+SPOOL_DIR = os.environ.get('MXT_ASGI_SPOOL_DIR', tempfile.gettempdir())
+
+UNSUPPORTED_FILE_ERROR = "Only .xlsx, .csv, .tsv and .jsonl files are supported"
+
+# Conversions admitted at once; the process pool queues the rest of the admitted work
+admission = AdmissionController.from_environ()
+
+def error_response(message, status=400, headers=None):
+    return JSONResponse({"error": message}, status_code=status, headers=headers)
+
+def request_encoding(request):
+    """Content coding for the response, negotiated from Accept-Encoding like the Flask app"""
+    return negotiate_encoding(parse_accept_header(request.headers.get('accept-encoding', '')))
+
+def spool_path(prefix):
+    """Path of a new, empty temp file in SPOOL_DIR"""
+    fd, path = tempfile.mkstemp(prefix=prefix, dir=SPOOL_DIR)
+    os.close(fd)
+    return path
+
+def save_upload(upload, path):
+    """Copy an uploaded file (decompressing gzip) to ``path``; return ``(input_format, size)``"""
+    stream = open_upload(upload.file)
+    input_format = detect_input_format(strip_gzip_suffix(upload.filename), stream)
+    if input_format is None:
+        return None, 0
+    
+    with open(path, 'wb') as f:
+        shutil.copyfileobj(stream, f, COPY_BUFFER_BYTES)
+        return input_format, f.tell()
+
+def remove_files(*paths):
+    for path in paths:
+        try:
+            os.unlink(path)
+        except OSError:
+            pass
+
+async def health(request):
+    return JSONResponse({"status": "healthy", "timestamp": datetime.now().isoformat()})
+
+async def metrics(request):
+    payload, content_type = render_metrics()
+    return Response(payload, media_type=content_type)
+
+async def generate(request):
+    metrics = GenerateMetrics()
+    try:
+        response = await handle_generate(request, metrics)
+    except Exception:
+        metrics.finish(500)
+        raise
+    
+    # Successful requests are recorded once the file has been sent
+    if response.background is None:
+        metrics.finish(response.status_code)
+    return response
+
+class LimitedReceive:
+    """ASGI ``receive`` wrapper that counts request body bytes and raises UploadTooLarge past ``limit``
+
+    Unlike the Content-Length check, this also bounds chunked bodies.
+    """
+    
+    def __init__(self, receive, limit):
+        self.receive = receive
+        self.limit = limit
+        self.received = 0
+    
+    async def __call__(self):
+        message = await self.receive()
+        if message['type'] == 'http.request':
+            self.received += len(message.get('body', b''))
+            if self.limit and self.received > self.limit:
+                raise UploadTooLarge(f"Upload exceeds the {format_limit(self.limit)} limit")
+        return message
+
+async def handle_generate(request, metrics):
+    """Spool the upload on the event loop, then convert it once admission control has a slot"""
+    content_length = request.headers.get('content-length')
+    content_length = int(content_length) if content_length and content_length.isdigit() else None
+    
+    if MAX_UPLOAD_BYTES and content_length is not None and content_length > MAX_UPLOAD_BYTES:
+        return error_response(f"Upload exceeds the {format_limit(MAX_UPLOAD_BYTES)} limit", 413)
+    
+    options, response = await read_generate_form(request, metrics)
+    if response is not None:
+        return response
+    
+    return await convert_upload(request, metrics, options)
+
+async def read_generate_form(request, metrics):
+    """Read the form and spool the upload to disk, enforcing MAX_UPLOAD_BYTES as the body arrives
+
+    Returns ``(options, None)`` on success or ``(None, error_response)``.
+    """
+    upload_started = time.perf_counter()
+    receive = LimitedReceive(request.receive, MAX_UPLOAD_BYTES)
+    try:
+        form = await Request(request.scope, receive).form()
+    except UploadTooLarge as e:
+        return None, error_response(str(e), 413)
+    
+    try:
+        files = form.getlist('file')
+        if not files or isinstance(files[0], str):
+            return None, error_response("No file uploaded")
+        
+        all_sheets = str(form.get('allSheets', '')).lower() in ('1', 'true', 'yes', 'on')
+        if len(files) > 1 or all_sheets or form.get('previousFile') is not None or form.get('output', 'merged') != 'merged':
+            return None, error_response("The async server converts a single inventory; use the Flask app for batch and incremental conversion")
+        
+        upload = files[0]
+        if not upload.filename:
+            return None, error_response("No file selected")
+        
+        password_format = form.get('passwordFormat', 'plain')
+        encryption_key = form.get('encryptionKey', '') if password_format == 'encrypted' else None
+        if password_format == 'encrypted' and not encryption_key:
+            return None, error_response("Master password is required for encrypted format")
+        
+        kdf = form.get('kdf', DEFAULT_KDF)
+        if kdf not in KDF_CHOICES:
+            return None, error_response(f"Unsupported kdf '{kdf}', expected one of: {', '.join(KDF_CHOICES)}")
+        
+        base_filename = os.path.splitext(strip_gzip_suffix(upload.filename))[0]
+        format_suffix = '_encrypted' if password_format == 'encrypted' else ''
+        metrics.password_format = 'encrypted' if password_format == 'encrypted' else 'plain'
+        
+        input_path = spool_path('mxt-in-')
+        
+        try:
+            input_format, metrics.input_bytes = await run_in_threadpool(save_upload, upload, input_path)
+        except UploadTooLarge as e:
+            remove_files(input_path)
+            return None, error_response(str(e), 413)
+        except Exception as e:
+            remove_files(input_path)
+            return None, error_response(str(e))
+        if input_format is None:
+            remove_files(input_path)
+            return None, error_response(UNSUPPORTED_FILE_ERROR)
+    finally:
+        await form.close()
+    metrics.clock.add(STAGE_UPLOAD, time.perf_counter() - upload_started)
+    
+    return {
+        'input_path': input_path,
+        'input_format': input_format,
+        'upload_bytes': receive.received,
+        'password_format': password_format,
+        'encryption_key': encryption_key,
+        'kdf': kdf,
+        'base_filename': base_filename,
+        'output_filename': f"{base_filename}{format_suffix}.mxtsessions"
+    }, None
+
+async def acquire_permit(upload_bytes):
+    """Wait for an admission slot for a spooled upload
+
+    Returns ``(permit, None)``, or ``(None, error_response)`` when the
+    request is turned away.
+    """
+    try:
+        # Waiting blocks a thread, but the queue is short and bounded
+        permit = await run_in_threadpool(admission.acquire, admission.weight_for(upload_bytes))
+    except AdmissionRejected as e:
+        ADMISSION_REJECTED.labels(str(e.status)).inc()
+        return None, error_response(str(e), e.status, {'Retry-After': str(e.retry_after)})
+    
+    ADMISSION_WAIT_SECONDS.observe(permit.waited)
+    return permit, None
+
+async def convert_upload(request, metrics, options):
+    """Convert a spooled upload on the process pool and send the result from disk"""
+    input_path = options['input_path']
+    encoding = request_encoding(request)
+    output_path = spool_path('mxt-out-')
+    convert = functools.partial(convert_file, input_path, output_path, options['input_format'], options['base_filename'],
+                                password_format=options['password_format'], encryption_key=options['encryption_key'],
+                                kdf=options['kdf'], encoding=encoding)
+    
+    # The slot only covers the conversion: the upload was read before and the output is sent after
+    permit = None
+    if admission.enabled:
+        permit, response = await acquire_permit(options['upload_bytes'])
+        if response is not None:
+            remove_files(input_path, output_path)
+            return response
+    
+    try:
+        pool = get_executor(EXECUTOR_PROCESS, CONVERT_PROCESSES)
+        totals, counts = await asyncio.get_running_loop().run_in_executor(pool, convert)
+    except ValueError as e:
+        remove_files(input_path, output_path)
+        return error_response(str(e))
+    except Exception as e:
+        remove_files(input_path, output_path)
+        return error_response(f"Internal server error: {str(e)}", 500)
+    finally:
+        if permit is not None:
+            permit.release()
+    remove_files(input_path)
+    
+    for stage, seconds in totals.items():
+        metrics.clock.add(stage, seconds)
+    metrics.clock.counts.update(counts)
+    metrics.output_bytes = os.path.getsize(output_path)
+    sending_started = time.perf_counter()
+    
+    def finish():
+        remove_files(output_path)
+        metrics.clock.add(STAGE_SEND, time.perf_counter() - sending_started)
+        metrics.finish(200)
+    
+    headers = {
+        'Server-Timing': metrics.clock.server_timing(),
+        'Timing-Allow-Origin': '*',
+        'Vary': 'Accept-Encoding'
+    }
+    if encoding:
+        headers['Content-Encoding'] = encoding
+    
+    # The whole body exists before the headers go out, so Server-Timing is complete
+    return FileResponse(output_path, media_type='text/plain', filename=options['output_filename'], headers=headers,
+                        background=BackgroundTask(finish))
+
+@contextlib.asynccontextmanager
+async def lifespan(app):
+    yield
+    # uvicorn ends the process with the signal that stopped it, which skips atexit;
+    # stop the pool here or its processes are left behind
+    shutdown_executors()
+
+app = Starlette(
+    lifespan=lifespan,
+    routes=[
+        Route('/health', health, methods=['GET']),
+        Route('/metrics', metrics, methods=['GET']),
+        Route('/generate', generate, methods=['POST'])
+    ],
+    middleware=[Middleware(CORSMiddleware, allow_origins=['*'], allow_methods=['*'], allow_headers=['*'])]
+)
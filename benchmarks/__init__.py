@@ -0,0 +1,5 @@
+"""
+Benchmark harness for the MXTSessions Generator
+
+See run_benchmarks.py for usage.
+"""
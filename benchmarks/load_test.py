@@ -0,0 +1,260 @@
+#!/usr/bin/env python3
+"""
+Load test of /generate through gunicorn
+
+Starts the app under gunicorn with the production config and keeps
+--concurrency clients posting synthetic workbooks to /generate for
+--duration seconds (or until --requests have been sent). Each upload is
+drawn from a mix of small and large, plain and encrypted inventories.
+Reports throughput, p50/p95/p99 latency and error rates per upload kind,
+and samples every worker's resident memory (including its process pool)
+while the test runs. With --max-error-rate or --max-p95-ms, exits
+non-zero when the run is worse.
+Linux only (reads /proc).
+
+Usage:
+    python benchmarks/load_test.py
+    python benchmarks/load_test.py --concurrency 16 --duration 60 --workers 4 --output load.json
+    python benchmarks/load_test.py --large-rows 200000 --large-share 0.1 --max-p95-ms 5000
+"""
+
+import argparse
+import json
+import math
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.synth import write_synthetic
+from benchmarks.upload_memory import multipart_body, start_server, stop_server, worker_pids, tree_memory_mb, post_upload
+
+PERCENTILES = (50, 95, 99)
+
+def percentile(values, pct):
+    """Nearest-rank percentile of a list of numbers (None when empty)"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(pct / 100 * len(ordered)) - 1)]
+
+def build_uploads(small_rows, large_rows):
+    """Multipart bodies for each upload kind, keyed ``<size>-<password format>``"""
+    uploads = {}
+    with tempfile.TemporaryDirectory(prefix='mxt-load-') as workdir:
+        for size, rows in (('small', small_rows), ('large', large_rows)):
+            path = os.path.join(workdir, f'{size}.xlsx')
+            write_synthetic(path, rows)
+            with open(path, 'rb') as f:
+                content = f.read()
+            
+            for password_format in ('plain', 'encrypted'):
+                fields = {'passwordFormat': password_format}
+                if password_format == 'encrypted':
+                    fields['encryptionKey'] = 'load-test-benchmark'
+                body, content_type = multipart_body(f'{size}.xlsx', content, fields)
+                uploads[f'{size}-{password_format}'] = {'rows': rows, 'body': body, 'content_type': content_type}
+    return uploads
+
+def upload_weights(large_share, encrypted_share):
+    """Probability of each upload kind"""
+    return {
+        'small-plain': (1 - large_share) * (1 - encrypted_share),
+        'small-encrypted': (1 - large_share) * encrypted_share,
+        'large-plain': large_share * (1 - encrypted_share),
+        'large-encrypted': large_share * encrypted_share
+    }
+
+def sample_memory(master_pid, interval, start, samples, stop):
+    """Record every worker's RSS, summed over its process tree, each ``interval`` seconds and once more when ``stop`` is set"""
+    while True:
+        workers = {}
+        for pid in worker_pids(master_pid):
+            try:
+                workers[pid] = round(tree_memory_mb(pid, 'VmRSS'), 1)
+            except OSError:
+                pass
+        samples.append({'seconds': round(time.perf_counter() - start, 1), 'rss_mb': workers})
+        if stop.is_set():
+            break
+        stop.wait(interval)
+
+def run_client(port, uploads, kinds, weights, seed, deadline, budget, results):
+    """Post uploads back to back until the deadline passes or the shared request budget runs out"""
+    rng = random.Random(seed)
+    while time.perf_counter() < deadline:
+        with budget['lock']:
+            if budget['remaining'] is not None:
+                if budget['remaining'] <= 0:
+                    return
+                budget['remaining'] -= 1
+        
+        kind = rng.choices(kinds, weights)[0]
+        upload = uploads[kind]
+        outcome = []
+        post_upload(port, upload['body'], upload['content_type'], outcome)
+        results.append(dict(outcome[0], kind=kind))
+
+def summarize(results, elapsed):
+    """Throughput, latency percentiles and error rate of a list of request results"""
+    latencies = [result['seconds'] * 1000 for result in results if result['status'] == 200]
+    errors = sum(1 for result in results if result['status'] != 200)
+    statuses = {}
+    for result in results:
+        status = str(result['status'] or 'error')
+        statuses[status] = statuses.get(status, 0) + 1
+    
+    summary = {
+        'requests': len(results),
+        'errors': errors,
+        'error_rate': round(errors / len(results), 4) if results else 0.0,
+        'statuses': statuses,
+        'requests_per_sec': round(len(results) / elapsed, 2) if elapsed else 0.0
+    }
+    for pct in PERCENTILES:
+        value = percentile(latencies, pct)
+        summary[f'p{pct}_ms'] = round(value, 1) if value is not None else None
+    return summary
+
+def run(concurrency, duration, port, workers, small_rows, large_rows, large_share=0.2, encrypted_share=0.5,
+        max_requests=None, sample_interval=1.0, seed=0, app='app:app'):
+    """Load the server and return the overall and per-kind summaries plus the memory samples"""
+    uploads = build_uploads(small_rows, large_rows)
+    weights = upload_weights(large_share, encrypted_share)
+    kinds = list(weights)
+    
+    server = start_server(port, workers, app=app)
+    try:
+        samples = []
+        stop = threading.Event()
+        results = []
+        budget = {'lock': threading.Lock(), 'remaining': max_requests}
+        
+        start = time.perf_counter()
+        sampler = threading.Thread(target=sample_memory, args=(server.pid, sample_interval, start, samples, stop))
+        sampler.start()
+        
+        clients = [
+            threading.Thread(target=run_client,
+                             args=(port, uploads, kinds, [weights[kind] for kind in kinds], seed + i,
+                                   start + duration, budget, results))
+            for i in range(concurrency)
+        ]
+        for client in clients:
+            client.start()
+        for client in clients:
+            client.join()
+        elapsed = time.perf_counter() - start
+        
+        stop.set()
+        sampler.join()
+    finally:
+        stop_server(server)
+    
+    return {
+        'app': app,
+        'concurrency': concurrency,
+        'workers': workers,
+        'seconds': round(elapsed, 2),
+        'mix': {kind: {'rows': uploads[kind]['rows'], 'share': round(weights[kind], 3)} for kind in kinds},
+        'overall': summarize(results, elapsed),
+        'by_kind': {
+            kind: summarize([result for result in results if result['kind'] == kind], elapsed)
+            for kind in kinds
+        },
+        'memory': samples
+    }
+
+def format_ms(value):
+    return f"{value:,.0f}" if value is not None else '-'
+
+def print_report(result):
+    overall = result['overall']
+    print(f"📊 {overall['requests']} requests in {result['seconds']}s: {overall['requests_per_sec']} req/s, "
+          f"{overall['errors']} errors ({overall['error_rate']:.1%})")
+    
+    print(f"   {'kind':<16} {'requests':>8} {'req/s':>7} {'errors':>7} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}")
+    for kind, summary in list(result['by_kind'].items()) + [('all', overall)]:
+        print(f"   {kind:<16} {summary['requests']:>8} {summary['requests_per_sec']:>7} {summary['errors']:>7} "
+              f"{format_ms(summary['p50_ms']):>8} {format_ms(summary['p95_ms']):>8} {format_ms(summary['p99_ms']):>8}")
+    
+    statuses = ', '.join(f"{status}: {count}" for status, count in sorted(overall['statuses'].items()))
+    print(f"   statuses: {statuses}")
+    
+    print("🧠 Worker RSS over time (MB):")
+    for sample in result['memory']:
+        values = list(sample['rss_mb'].values())
+        if values:
+            print(f"   {sample['seconds']:>6.1f}s  total {sum(values):7.1f}  max {max(values):6.1f}  "
+                  f"workers {' '.join(f'{value:.0f}' for value in values)}")
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Load test of /generate through gunicorn',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  %(prog)s --concurrency 8 --duration 30
+  %(prog)s --workers 2 --concurrency 16 --large-share 0.1 --output load.json
+  %(prog)s --requests 200 --max-error-rate 0.01 --max-p95-ms 3000
+  GUNICORN_WORKER_CLASS=uvicorn.workers.UvicornWorker %(prog)s --app asgi:app
+
+Server settings not covered by the options (GUNICORN_THREADS,
+MXT_ADMISSION_*, ...) are read from the environment as usual.
+        """
+    )
+    parser.add_argument('--concurrency', '-c', type=int, default=8, help='Simultaneous clients (default: %(default)s)')
+    parser.add_argument('--duration', '-d', type=float, default=30, help='Seconds to keep sending (default: %(default)s)')
+    parser.add_argument('--requests', '-n', type=int, help='Stop after this many requests (within --duration)')
+    parser.add_argument('--workers', type=int, default=4, help='Gunicorn workers (default: %(default)s)')
+    parser.add_argument('--app', default='app:app', help='Application to serve, e.g. asgi:app (default: %(default)s)')
+    parser.add_argument('--small-rows', type=int, default=500, help='Rows in a small workbook (default: %(default)s)')
+    parser.add_argument('--large-rows', type=int, default=50000, help='Rows in a large workbook (default: %(default)s)')
+    parser.add_argument('--large-share', type=float, default=0.2, help='Fraction of large uploads (default: %(default)s)')
+    parser.add_argument('--encrypted-share', type=float, default=0.5,
+                        help='Fraction of uploads asking for encrypted output (default: %(default)s)')
+    parser.add_argument('--sample-interval', type=float, default=1.0,
+                        help='Seconds between worker memory samples (default: %(default)s)')
+    parser.add_argument('--seed', type=int, default=0, help='Seed for the upload mix (default: %(default)s)')
+    parser.add_argument('--port', type=int, default=5098, help='Local port for the server (default: %(default)s)')
+    parser.add_argument('--max-error-rate', type=float, help='Exit non-zero if the error rate exceeds this fraction')
+    parser.add_argument('--max-p95-ms', type=float, help='Exit non-zero if the overall p95 latency exceeds this')
+    parser.add_argument('--output', '-o', help='Write the results to this JSON file')
+    
+    args = parser.parse_args()
+    
+    print(f"🚀 {args.concurrency} clients against {args.workers} workers for {args.duration:g}s "
+          f"({args.small_rows}/{args.large_rows} rows, {args.large_share:.0%} large, {args.encrypted_share:.0%} encrypted)...")
+    result = run(args.concurrency, args.duration, args.port, args.workers, args.small_rows, args.large_rows,
+                 large_share=args.large_share, encrypted_share=args.encrypted_share, max_requests=args.requests,
+                 sample_interval=args.sample_interval, seed=args.seed, app=args.app)
+    
+    print_report(result)
+    
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(result, f, indent=2)
+        print(f"💾 Results written to {args.output}")
+    
+    overall = result['overall']
+    failed = False
+    if not overall['requests']:
+        print("❌ No requests completed", file=sys.stderr)
+        failed = True
+    if args.max_error_rate is not None and overall['error_rate'] > args.max_error_rate:
+        print(f"❌ Error rate {overall['error_rate']:.1%} exceeds {args.max_error_rate:.1%}", file=sys.stderr)
+        failed = True
+    if args.max_p95_ms is not None and overall['p95_ms'] is not None and overall['p95_ms'] > args.max_p95_ms:
+        print(f"❌ p95 latency {overall['p95_ms']:,.0f} ms exceeds {args.max_p95_ms:,.0f} ms", file=sys.stderr)
+        failed = True
+    if failed:
+        sys.exit(1)
+    
+    print(f"✅ p95 {format_ms(overall['p95_ms'])} ms at {overall['requests_per_sec']} req/s")
+
+if __name__ == '__main__':
+    main()
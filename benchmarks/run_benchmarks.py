@@ -0,0 +1,238 @@
+#!/usr/bin/env python3
+"""
+Stage-by-stage benchmarks with regression gates
+
+Generates synthetic inventories and session files, times each stage in
+plain and encrypted mode (best of --repeat samples, each long enough to
+rise above timer noise), records peak traced memory and writes the
+results as JSON. With --baseline, exits non-zero when any stage's
+throughput drops more than --threshold below the stored baseline.
+
+Usage:
+    python benchmarks/run_benchmarks.py
+    python benchmarks/run_benchmarks.py --sizes 1000,10000,100000,1000000 --output results.json
+    python benchmarks/run_benchmarks.py --baseline benchmarks/baseline.json --threshold 0.25
+    python benchmarks/run_benchmarks.py --update-baseline benchmarks/baseline.json
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import math
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.synth import write_synthetic
+from mxtcore.inventory import read_excel_file, open_inventory_rows
+from mxtcore.render import generate_mxtsessions_content
+import encrypt_tool
+import mobaxterm_decrypt
+
+MASTER_PASSWORD = 'benchmark-master-password'
+MODES = ('plain', 'encrypted')
+DEFAULT_SIZES = (10000, 50000)
+DEFAULT_REPEAT = 5
+
+# Fast stages are called in a loop until one sample lasts at least this long
+MIN_SAMPLE_SECONDS = 0.2
+
+def build_stages(workdir, rows):
+    """Create the input files for one size and return ``(name, modes, setup)`` stage definitions
+
+    ``setup(mode)`` returns the zero-argument callable that is timed.
+    """
+    xlsx_path = os.path.join(workdir, f'inventory_{rows}.xlsx')
+    csv_path = os.path.join(workdir, f'inventory_{rows}.csv')
+    write_synthetic(xlsx_path, rows)
+    write_synthetic(csv_path, rows)
+    
+    sessions_paths = {}
+    for mode in MODES:
+        sessions_paths[mode] = os.path.join(workdir, f'sessions_{mode}_{rows}.mxtsessions')
+        write_synthetic(sessions_paths[mode], rows, MASTER_PASSWORD if mode == 'encrypted' else None)
+    
+    with open(xlsx_path, 'rb') as f:
+        xlsx_content = f.read()
+    with open(csv_path, 'rb') as f:
+        csv_content = f.read()
+    parsed_rows = read_excel_file(xlsx_content)
+    
+    def read_excel(mode):
+        return lambda: read_excel_file(xlsx_content)
+    
+    def read_csv(mode):
+        return lambda: sum(1 for _ in open_inventory_rows(csv_content, 'csv'))
+    
+    def generate_content(mode):
+        key = MASTER_PASSWORD if mode == 'encrypted' else None
+        return lambda: generate_mxtsessions_content(parsed_rows, 'bench', mode, key)
+    
+    def batch_encrypt(mode):
+        output_path = os.path.join(workdir, f'encrypted_{rows}.xlsx')
+        def run():
+            with contextlib.redirect_stdout(io.StringIO()):
+                encrypt_tool.batch_encrypt_excel(xlsx_path, output_path, MASTER_PASSWORD)
+        return run
+    
+    def parse_sessions(mode):
+        return lambda: mobaxterm_decrypt.parse_mxtsessions_file(sessions_paths[mode])
+    
+    return [
+        ('read_excel_file', ('plain',), read_excel),
+        ('read_csv', ('plain',), read_csv),
+        ('generate_mxtsessions_content', MODES, generate_content),
+        ('batch_encrypt_excel', ('encrypted',), batch_encrypt),
+        ('parse_mxtsessions_file', MODES, parse_sessions)
+    ]
+
+def measure(func, repeat, trace_memory):
+    """Return ``(best_seconds, peak_bytes)`` for ``func``
+
+    ``best_seconds`` is the lowest per-call time over ``repeat`` samples.
+    """
+    # Untimed warm-up call, which also sizes the samples
+    start = time.perf_counter()
+    func()
+    first = time.perf_counter() - start
+    loops = max(1, math.ceil(MIN_SAMPLE_SECONDS / first)) if first > 0 else 1
+    
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(loops):
+            func()
+        elapsed = (time.perf_counter() - start) / loops
+        best = elapsed if best is None else min(best, elapsed)
+    
+    peak = None
+    if trace_memory:
+        # Separate run so tracing overhead doesn't skew the timings
+        tracemalloc.start()
+        try:
+            func()
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+    
+    return best, peak
+
+def run_benchmarks(sizes, stages=None, repeat=DEFAULT_REPEAT, trace_memory=True, log=print):
+    """Run every stage for every size and mode, returning a list of result dictionaries"""
+    results = []
+    
+    with tempfile.TemporaryDirectory(prefix='mxt-bench-') as workdir:
+        for rows in sizes:
+            log(f"📦 Preparing {rows} rows...")
+            for name, modes, setup in build_stages(workdir, rows):
+                if stages and name not in stages:
+                    continue
+                for mode in modes:
+                    seconds, peak = measure(setup(mode), repeat, trace_memory)
+                    result = {
+                        'stage': name,
+                        'mode': mode,
+                        'rows': rows,
+                        'seconds': round(seconds, 6),
+                        'rows_per_sec': round(rows / seconds, 1) if seconds else None,
+                        'peak_bytes': peak
+                    }
+                    results.append(result)
+                    peak_text = f", peak {peak / 2 ** 20:.1f} MiB" if peak is not None else ''
+                    log(f"   ⏱️  {name} [{mode}] {rows} rows: {seconds:.3f}s ({result['rows_per_sec']:,.0f} rows/s{peak_text})")
+    
+    return results
+
+def result_key(result):
+    return (result['stage'], result['mode'], result['rows'])
+
+def find_regressions(results, baseline_results, threshold):
+    """Return the stages whose throughput fell more than ``threshold`` below the baseline"""
+    baseline = {result_key(result): result for result in baseline_results}
+    regressions = []
+    
+    for result in results:
+        reference = baseline.get(result_key(result))
+        if not reference or not reference.get('rows_per_sec') or not result.get('rows_per_sec'):
+            continue
+        
+        ratio = result['rows_per_sec'] / reference['rows_per_sec']
+        if ratio < 1 - threshold:
+            regressions.append({**result, 'baseline_rows_per_sec': reference['rows_per_sec'], 'ratio': round(ratio, 3)})
+    
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='MXTSessions Generator benchmarks',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  %(prog)s
+  %(prog)s --sizes 1000,10000,100000,1000000 --output results.json
+  %(prog)s --baseline benchmarks/baseline.json --threshold 0.25
+  %(prog)s --update-baseline benchmarks/baseline.json
+
+Refresh the baseline (on the reference machine, with the default sizes
+and repeats) in every change that is expected to move performance.
+        """
+    )
+    
+    parser.add_argument('--sizes', default=','.join(str(size) for size in DEFAULT_SIZES),
+                       help='Comma separated row counts (default: %(default)s)')
+    parser.add_argument('--stages', help='Comma separated subset of stages to run')
+    parser.add_argument('--repeat', type=int, default=DEFAULT_REPEAT,
+                       help='Timed samples per stage, best is kept (default: %(default)s)')
+    parser.add_argument('--no-memory', action='store_true', help='Skip the peak memory run')
+    parser.add_argument('--output', '-o', help='Write machine-readable results to this JSON file')
+    parser.add_argument('--baseline', '-b', help='Baseline JSON file to compare throughput against')
+    parser.add_argument('--threshold', '-t', type=float, default=0.2,
+                       help='Allowed throughput drop versus the baseline, as a fraction (default: %(default)s)')
+    parser.add_argument('--update-baseline', metavar='PATH', help='Write these results as the new baseline')
+    
+    args = parser.parse_args()
+    
+    sizes = [int(size) for size in args.sizes.split(',') if size.strip()]
+    stages = set(args.stages.split(',')) if args.stages else None
+    
+    results = run_benchmarks(sizes, stages, args.repeat, trace_memory=not args.no_memory)
+    report = {
+        'meta': {
+            'timestamp': datetime.now().isoformat(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count()
+        },
+        'results': results
+    }
+    
+    for path in (args.output, args.update_baseline):
+        if path:
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump(report, f, indent=2)
+            print(f"💾 Results written to: {path}")
+    
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f)
+        
+        regressions = find_regressions(results, baseline['results'], args.threshold)
+        if regressions:
+            print(f"❌ {len(regressions)} stage(s) regressed more than {args.threshold:.0%}:", file=sys.stderr)
+            for regression in regressions:
+                print(f"   {regression['stage']} [{regression['mode']}] {regression['rows']} rows: "
+                      f"{regression['rows_per_sec']:,.0f} vs {regression['baseline_rows_per_sec']:,.0f} rows/s "
+                      f"({regression['ratio']:.0%})", file=sys.stderr)
+            sys.exit(1)
+        
+        print(f"✅ No regressions beyond {args.threshold:.0%} against {args.baseline}")
+
+if __name__ == '__main__':
+    main()
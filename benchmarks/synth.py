@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Synthetic inventory generator for benchmarks
+
+Usage:
+    python benchmarks/synth.py inventory.xlsx --rows 100000
+    python benchmarks/synth.py inventory.csv --rows 1000000
+    python benchmarks/synth.py sessions.mxtsessions --rows 100000 --master-password "bench"
+"""
+
+import argparse
+import csv
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from mxtcore.render import iter_mxtsessions_content, iter_chunks
+
+HEADERS = ['Hostname', 'IP', 'user', 'password']
+
+def synthetic_rows(count):
+    """Yield ``count`` deterministic inventory rows as tuples in header order"""
+    for i in range(count):
+        yield (
+            f"srv-{i:07d}",
+            f"10.{(i >> 16) & 255}.{(i >> 8) & 255}.{i & 255}",
+            'admin' if i % 3 else 'root',
+            f"Pa55-{i * 7919 % 1000003:07d}!"
+        )
+
+def write_xlsx(path, count):
+    """Write a synthetic workbook with openpyxl's write-only mode"""
+    from openpyxl import Workbook
+    
+    workbook = Workbook(write_only=True)
+    worksheet = workbook.create_sheet('Servers')
+    worksheet.append(HEADERS)
+    for row in synthetic_rows(count):
+        worksheet.append(row)
+    workbook.save(path)
+
+def write_delimited(path, count, delimiter=','):
+    """Write a synthetic CSV or TSV inventory"""
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f, delimiter=delimiter)
+        writer.writerow(HEADERS)
+        writer.writerows(synthetic_rows(count))
+
+def write_jsonl(path, count):
+    """Write a synthetic JSON lines inventory"""
+    with open(path, 'w', encoding='utf-8') as f:
+        for row in synthetic_rows(count):
+            f.write(json.dumps(dict(zip(HEADERS, row))) + '\n')
+
+def write_mxtsessions(path, count, master_password=None):
+    """Write a synthetic .mxtsessions file, encrypted when ``master_password`` is given"""
+    rows = (dict(zip(HEADERS, row)) for row in synthetic_rows(count))
+    password_format = 'encrypted' if master_password else 'plain'
+    
+    with open(path, 'wb') as f:
+        for chunk in iter_chunks(iter_mxtsessions_content(rows, 'bench', password_format, master_password)):
+            f.write(chunk)
+
+def write_synthetic(path, count, master_password=None):
+    """Write a synthetic file whose type is chosen from the extension of ``path``"""
+    extension = os.path.splitext(path)[1].lower()
+    
+    if extension == '.xlsx':
+        write_xlsx(path, count)
+    elif extension == '.csv':
+        write_delimited(path, count, ',')
+    elif extension == '.tsv':
+        write_delimited(path, count, '\t')
+    elif extension == '.jsonl':
+        write_jsonl(path, count)
+    elif extension == '.mxtsessions':
+        write_mxtsessions(path, count, master_password)
+    else:
+        raise ValueError(f"Unsupported synthetic file type: {extension}")
+
+def main():
+    parser = argparse.ArgumentParser(description='Synthetic inventory generator for benchmarks')
+    parser.add_argument('output', help='Output file (.xlsx, .csv, .tsv, .jsonl or .mxtsessions)')
+    parser.add_argument('--rows', '-n', type=int, default=10000, help='Number of rows (default: %(default)s)')
+    parser.add_argument('--master-password', '-m', help='Encrypt passwords when writing .mxtsessions')
+    
+    args = parser.parse_args()
+    
+    try:
+        write_synthetic(args.output, args.rows, args.master_password)
+        print(f"✅ Wrote {args.rows} rows to '{args.output}'")
+    except Exception as e:
+        print(f"❌ Error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,256 @@
+#!/usr/bin/env python3
+"""
+Peak worker memory under concurrent large uploads
+
+Starts the app under gunicorn with the production config, posts the same
+large synthetic inventory to /generate from several clients at once and
+reports each worker's resident memory before the run and at its peak
+(VmHWM), summed over the worker and everything it started (the process
+pool's fork server, pool processes and resource tracker). With --max-rss-mb, exits non-zero when any worker's peak exceeds
+the limit. Linux only (reads /proc).
+
+Usage:
+    python benchmarks/upload_memory.py
+    python benchmarks/upload_memory.py --rows 1000000 --format csv --concurrency 4 --max-rss-mb 300
+    python benchmarks/upload_memory.py --rows 200000 --format xlsx --gzip --output upload_memory.json
+"""
+
+import argparse
+import gzip
+import http.client
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import uuid
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.synth import write_synthetic
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+READ_BLOCK_BYTES = 64 * 1024
+
+def multipart_body(filename, content, fields=None):
+    """Encode one file (plus plain form fields) as multipart/form-data"""
+    boundary = uuid.uuid4().hex
+    parts = []
+    for name, value in (fields or {}).items():
+        parts.append(f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"\r\n\r\n{value}\r\n'.encode())
+    parts.append(f'--{boundary}\r\nContent-Disposition: form-data; name="file"; filename="{filename}"\r\n'
+                 f'Content-Type: application/octet-stream\r\n\r\n'.encode())
+    parts.append(content)
+    parts.append(f'\r\n--{boundary}--\r\n'.encode())
+    return b''.join(parts), f'multipart/form-data; boundary={boundary}'
+
+def start_server(port, workers, extra_env=None, app='app:app'):
+    """Launch gunicorn with gunicorn.conf.py and wait until /health answers"""
+    env = dict(os.environ, PORT=str(port), GUNICORN_WORKERS=str(workers), **(extra_env or {}))
+    server = subprocess.Popen(
+        [sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py', app],
+        cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        if server.poll() is not None:
+            raise RuntimeError(f"gunicorn exited with code {server.returncode}")
+        try:
+            connection = http.client.HTTPConnection('127.0.0.1', port, timeout=2)
+            connection.request('GET', '/health')
+            if connection.getresponse().status == 200 and len(worker_pids(server.pid)) >= workers:
+                return server
+        except OSError:
+            pass
+        time.sleep(0.2)
+    
+    server.terminate()
+    raise RuntimeError("gunicorn did not become ready within 30s")
+
+def stop_server(server):
+    server.terminate()
+    try:
+        server.wait(timeout=30)
+    except subprocess.TimeoutExpired:
+        server.kill()
+
+def parent_pids():
+    """Map every running pid to its parent pid"""
+    parents = {}
+    for entry in os.listdir('/proc'):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f'/proc/{entry}/stat') as f:
+                fields = f.read().rsplit(')', 1)[1].split()
+        except OSError:
+            continue
+        parents[int(entry)] = int(fields[1])
+    return parents
+
+def worker_pids(master_pid):
+    """Pids of the processes forked by the gunicorn master"""
+    return sorted(pid for pid, parent in parent_pids().items() if parent == master_pid)
+
+def process_tree(pid):
+    """``pid`` followed by all of its descendants
+
+    With the forkserver start method, pool processes are grandchildren of
+    the worker (worker -> fork server -> pool processes).
+    """
+    children = {}
+    for child, parent in parent_pids().items():
+        children.setdefault(parent, []).append(child)
+    
+    tree = [pid]
+    for member in tree:
+        tree.extend(children.get(member, ()))
+    return tree
+
+def tree_memory_mb(pid, field):
+    """``memory_mb`` summed over ``pid`` and its descendants, skipping processes that exit meanwhile"""
+    total = 0.0
+    for member in process_tree(pid):
+        try:
+            total += memory_mb(member, field)
+        except OSError:
+            if member == pid:
+                raise
+    return total
+
+def memory_mb(pid, field):
+    """``VmRSS`` or ``VmHWM`` (peak) of a process in MB"""
+    with open(f'/proc/{pid}/status') as f:
+        for line in f:
+            if line.startswith(field + ':'):
+                return int(line.split()[1]) / 1024
+    return 0.0
+
+def post_upload(port, body, content_type, results):
+    """POST one upload to /generate, discarding the response body as it arrives"""
+    start = time.perf_counter()
+    try:
+        connection = http.client.HTTPConnection('127.0.0.1', port, timeout=600)
+        connection.request('POST', '/generate', body=body, headers={'Content-Type': content_type})
+        response = connection.getresponse()
+        received = 0
+        while True:
+            block = response.read(READ_BLOCK_BYTES)
+            if not block:
+                break
+            received += len(block)
+        results.append({'status': response.status, 'bytes': received, 'seconds': time.perf_counter() - start})
+    except Exception as e:
+        results.append({'status': None, 'error': str(e), 'seconds': time.perf_counter() - start})
+
+def run(rows, input_format, concurrency, rounds, port, workers, use_gzip=False, password_format='plain'):
+    """Measure worker RSS before and during ``rounds`` bursts of ``concurrency`` uploads"""
+    with tempfile.TemporaryDirectory(prefix='mxt-upload-') as workdir:
+        path = os.path.join(workdir, f'inventory.{input_format}')
+        write_synthetic(path, rows)
+        with open(path, 'rb') as f:
+            content = f.read()
+    
+    filename = f'inventory.{input_format}'
+    if use_gzip:
+        content = gzip.compress(content)
+        filename += '.gz'
+    
+    fields = {'passwordFormat': password_format}
+    if password_format == 'encrypted':
+        fields['encryptionKey'] = 'upload-memory-benchmark'
+    body, content_type = multipart_body(filename, content, fields)
+    
+    server = start_server(port, workers)
+    try:
+        pids = worker_pids(server.pid)
+        baseline = {pid: tree_memory_mb(pid, 'VmRSS') for pid in pids}
+        
+        results = []
+        start = time.perf_counter()
+        for _ in range(rounds):
+            clients = [threading.Thread(target=post_upload, args=(port, body, content_type, results))
+                       for _ in range(concurrency)]
+            for client in clients:
+                client.start()
+            for client in clients:
+                client.join()
+        elapsed = time.perf_counter() - start
+        
+        # Sum of each process's own peak, an upper bound when they peak at different times
+        peak = {pid: tree_memory_mb(pid, 'VmHWM') for pid in pids}
+    finally:
+        stop_server(server)
+    
+    return {
+        'rows': rows,
+        'format': input_format,
+        'gzip': use_gzip,
+        'password_format': password_format,
+        'upload_mb': round(len(content) / (1024 * 1024), 1),
+        'concurrency': concurrency,
+        'rounds': rounds,
+        'workers': [
+            {'pid': pid, 'baseline_rss_mb': round(baseline[pid], 1), 'peak_rss_mb': round(peak[pid], 1)}
+            for pid in pids
+        ],
+        'requests': len(results),
+        'errors': sum(1 for result in results if result['status'] != 200),
+        'seconds': round(elapsed, 2)
+    }
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Peak worker memory under concurrent large uploads',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  %(prog)s --rows 1000000 --format csv --concurrency 4
+  %(prog)s --rows 200000 --format xlsx --gzip --max-rss-mb 300
+        """
+    )
+    parser.add_argument('--rows', '-n', type=int, default=500000, help='Rows in the uploaded inventory (default: %(default)s)')
+    parser.add_argument('--format', choices=['xlsx', 'csv', 'tsv', 'jsonl'], default='csv',
+                        help='Inventory format (default: %(default)s)')
+    parser.add_argument('--gzip', action='store_true', help='Upload the inventory gzip-compressed')
+    parser.add_argument('--encrypted', action='store_true', help='Request encrypted output')
+    parser.add_argument('--concurrency', '-c', type=int, default=4, help='Simultaneous uploads (default: %(default)s)')
+    parser.add_argument('--rounds', type=int, default=1, help='Bursts of uploads to send (default: %(default)s)')
+    parser.add_argument('--workers', type=int, help='Gunicorn workers (default: same as --concurrency)')
+    parser.add_argument('--port', type=int, default=5099, help='Local port for the server (default: %(default)s)')
+    parser.add_argument('--max-rss-mb', type=float, help='Exit non-zero if any worker peaks above this')
+    parser.add_argument('--output', '-o', help='Write the results to this JSON file')
+    
+    args = parser.parse_args()
+    
+    print(f"📦 Uploading {args.rows} rows ({args.format}{', gzip' if args.gzip else ''}) "
+          f"from {args.concurrency} clients x {args.rounds} rounds...")
+    result = run(args.rows, args.format, args.concurrency, args.rounds, args.port, args.workers or args.concurrency,
+                 use_gzip=args.gzip, password_format='encrypted' if args.encrypted else 'plain')
+    
+    print(f"📊 Upload size: {result['upload_mb']} MB, {result['requests']} requests, "
+          f"{result['errors']} errors, {result['seconds']}s")
+    for worker in result['workers']:
+        print(f"   worker {worker['pid']}: {worker['baseline_rss_mb']:.1f} MB idle -> {worker['peak_rss_mb']:.1f} MB peak")
+    
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(result, f, indent=2)
+        print(f"💾 Results written to {args.output}")
+    
+    if result['errors']:
+        print(f"❌ {result['errors']} uploads failed", file=sys.stderr)
+        sys.exit(1)
+    
+    worst = max(worker['peak_rss_mb'] for worker in result['workers'])
+    if args.max_rss_mb is not None and worst > args.max_rss_mb:
+        print(f"❌ Worker peak RSS {worst:.1f} MB exceeds the {args.max_rss_mb:.0f} MB limit", file=sys.stderr)
+        sys.exit(1)
+    
+    print(f"✅ Highest worker peak: {worst:.1f} MB")
+
+if __name__ == '__main__':
+    main()
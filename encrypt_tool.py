@@ -6,50 +6,26 @@ Compatible with the web application's encryption method
 Usage:
     python encrypt_tool.py encrypt "password123" "my_secret_key"
     python encrypt_tool.py decrypt "gAAAAABh..." "my_secret_key"
-    
+
     # For batch processing Excel files:
     python encrypt_tool.py batch-encrypt input.xlsx output.xlsx "my_secret_key"
     python encrypt_tool.py batch-decrypt encrypted.xlsx decrypted.xlsx "my_secret_key"
+
+    # For workbooks too large to load with pandas:
+    python encrypt_tool.py --streaming batch-encrypt input.xlsx output.xlsx "my_secret_key"
 """
 
-from cryptography.fernet import Fernet
-import base64
-import hashlib
 import argparse
 import sys
-import pandas as pd
 import os
+from mxtcore.cipher import get_cipher_context, encrypt_password, decrypt_password, DEFAULT_KDF, KDF_CHOICES
+from mxtcore.parallel import encrypt_passwords, iter_encrypted, EXECUTOR_CHOICES
 
-def generate_key_from_password(password):
-    """Generate a Fernet key from a password"""
-    key = hashlib.sha256(password.encode()).digest()
-    return base64.urlsafe_b64encode(key)
-
-def encrypt_password(password, encryption_key):
-    """Encrypt a password using Fernet encryption"""
-    try:
-        key = generate_key_from_password(encryption_key)
-        fernet = Fernet(key)
-        encrypted = fernet.encrypt(password.encode())
-        return base64.urlsafe_b64encode(encrypted).decode()
-    except Exception as e:
-        raise Exception(f"Encryption failed: {str(e)}")
-
-def decrypt_password(encrypted_password, encryption_key):
-    """Decrypt a password using Fernet encryption"""
-    try:
-        key = generate_key_from_password(encryption_key)
-        fernet = Fernet(key)
-        encrypted_bytes = base64.urlsafe_b64decode(encrypted_password.encode())
-        decrypted = fernet.decrypt(encrypted_bytes)
-        return decrypted.decode()
-    except Exception as e:
-        raise Exception(f"Decryption failed: {str(e)}")
+REQUIRED_COLUMNS = ['Hostname', 'IP', 'user', 'password']
 
 def validate_excel_structure(df):
     """Validate that the Excel file has the required columns"""
-    required_columns = ['Hostname', 'IP', 'user', 'password']
-    missing_columns = [col for col in required_columns if col not in df.columns]
+    missing_columns = [col for col in REQUIRED_COLUMNS if col not in df.columns]
     
     if missing_columns:
         raise ValueError(f"Missing required columns: {', '.join(missing_columns)}")
@@ -59,53 +35,173 @@ def validate_excel_structure(df):
     
     return True
 
-def batch_encrypt_excel(input_file, output_file, encryption_key):
+def _password_column(df):
+    """Return the stripped password column and a mask of the cells that hold a password"""
+    column = df['password']
+    values = column.astype(str).str.strip()
+    mask = column.notna() & (values != '') & (values != 'nan')
+    return values, mask
+
+def _decrypt_cell(cipher, encrypted_password, row_num):
+    """Decrypt one password cell, naming the row when it fails (InvalidToken has no message of its own)"""
+    try:
+        return cipher.decrypt(encrypted_password)
+    except Exception as e:
+        raise Exception(f"Decryption failed for row {row_num}: {str(e) or type(e).__name__}")
+
+def batch_encrypt_excel(input_file, output_file, encryption_key, kdf=DEFAULT_KDF, workers=None, executor=None):
     """Encrypt passwords in an Excel file"""
     try:
+        import pandas as pd
+        
         # Read Excel file
         df = pd.read_excel(input_file, engine='openpyxl')
         
         # Validate structure
         validate_excel_structure(df)
         
-        # Encrypt passwords
-        for index in df.index:
-            password = str(df.at[index, 'password'])
-            if password and password != 'nan' and password.strip():
-                df.at[index, 'password'] = encrypt_password(password.strip(), encryption_key)
+        # Pull the password column out once and encrypt it in ordered parallel chunks
+        values, mask = _password_column(df)
+        encrypted_passwords = encrypt_passwords(values[mask].tolist(), encryption_key, kdf, workers=workers, executor=executor)
+        
+        if None in encrypted_passwords:
+            failed_row = mask[mask].index[encrypted_passwords.index(None)] + 2
+            raise Exception(f"Encryption failed for row {failed_row}")
+        
+        # Write the whole column back in a single assignment
+        df['password'] = df['password'].astype(object)
+        df.loc[mask, 'password'] = encrypted_passwords
         
         # Save encrypted file
         df.to_excel(output_file, index=False, engine='openpyxl')
         print(f"✅ Successfully encrypted passwords in '{output_file}'")
-        
+    
     except Exception as e:
         print(f"❌ Error processing Excel file: {e}", file=sys.stderr)
         sys.exit(1)
 
-def batch_decrypt_excel(input_file, output_file, encryption_key):
+def batch_decrypt_excel(input_file, output_file, encryption_key, kdf=DEFAULT_KDF):
     """Decrypt passwords in an Excel file"""
     try:
+        import pandas as pd
+        
+        cipher = get_cipher_context(encryption_key, kdf)
+        
         # Read Excel file
         df = pd.read_excel(input_file, engine='openpyxl')
         
         # Validate structure
         validate_excel_structure(df)
         
-        # Decrypt passwords
-        for index in df.index:
-            encrypted_password = str(df.at[index, 'password'])
-            if encrypted_password and encrypted_password != 'nan' and encrypted_password.strip():
-                df.at[index, 'password'] = decrypt_password(encrypted_password.strip(), encryption_key)
+        # Decrypt the password column in bulk and write it back in one assignment
+        values, mask = _password_column(df)
+        df['password'] = df['password'].astype(object)
+        df.loc[mask, 'password'] = [_decrypt_cell(cipher, value, index + 2) for index, value in values[mask].items()]
         
         # Save decrypted file
         df.to_excel(output_file, index=False, engine='openpyxl')
         print(f"✅ Successfully decrypted passwords in '{output_file}'")
+    
+    except Exception as e:
+        print(f"❌ Error processing Excel file: {e}", file=sys.stderr)
+        sys.exit(1)
+
+def _open_password_sheet(input_file):
+    """Open a workbook in read-only mode and return its sheet title, header and password column index"""
+    from openpyxl import load_workbook
+    
+    workbook = load_workbook(input_file, read_only=True)
+    worksheet = workbook.active
+    rows = worksheet.iter_rows(values_only=True)
+    
+    header = next(rows, None) or ()
+    headers = [str(value).strip() if value is not None else '' for value in header]
+    missing_columns = [col for col in REQUIRED_COLUMNS if col not in headers]
+    
+    if missing_columns:
+        workbook.close()
+        raise ValueError(f"Missing required columns: {', '.join(missing_columns)}")
+    
+    return workbook, worksheet.title, header, headers.index('password'), rows
+
+def _password_cell(row, password_idx):
+    """Return the stripped password in a row, or '' when the cell is empty"""
+    value = row[password_idx] if password_idx < len(row) else None
+    if value is None:
+        return ''
+    return str(value).strip()
+
+def _stream_rewrite_excel(input_file, output_file, transform_rows):
+    """Copy a workbook row by row, letting ``transform_rows`` rewrite the password column
+
+    Uses openpyxl read-only and write-only workbooks so neither the input
+    nor the output is ever held in memory as a whole.
+    """
+    from openpyxl import Workbook
+    
+    workbook, title, header, password_idx, rows = _open_password_sheet(input_file)
+    output = Workbook(write_only=True)
+    worksheet = output.create_sheet(title)
+    
+    try:
+        worksheet.append(header)
+        
+        row_count = 0
+        for row, password in transform_rows(rows, password_idx):
+            if password:
+                row = list(row)
+                row[password_idx] = password
+            worksheet.append(row)
+            row_count += 1
         
+        if row_count == 0:
+            raise ValueError("Excel file contains no data rows")
+    except BaseException:
+        # Finish the abandoned sheet now; left open, its writer fails noisily when garbage collected
+        worksheet.close()
+        raise
+    finally:
+        workbook.close()
+    
+    output.save(output_file)
+
+def stream_encrypt_excel(input_file, output_file, encryption_key, kdf=DEFAULT_KDF, workers=None, executor=None):
+    """Encrypt passwords in an Excel file without pandas, streaming rows through openpyxl"""
+    def transform_rows(rows, password_idx):
+        encrypted_rows = iter_encrypted(
+            rows, encryption_key, kdf,
+            password_of=lambda row: _password_cell(row, password_idx),
+            workers=workers, executor=executor
+        )
+        for row_num, (row, encrypted) in enumerate(encrypted_rows, start=2):
+            if encrypted is None:
+                raise Exception(f"Encryption failed for row {row_num}")
+            yield row, encrypted
+    
+    try:
+        _stream_rewrite_excel(input_file, output_file, transform_rows)
+        print(f"✅ Successfully encrypted passwords in '{output_file}'")
     except Exception as e:
         print(f"❌ Error processing Excel file: {e}", file=sys.stderr)
         sys.exit(1)
 
-def test_encryption(encryption_key):
+def stream_decrypt_excel(input_file, output_file, encryption_key, kdf=DEFAULT_KDF):
+    """Decrypt passwords in an Excel file without pandas, streaming rows through openpyxl"""
+    cipher = get_cipher_context(encryption_key, kdf)
+    
+    def transform_rows(rows, password_idx):
+        for row_num, row in enumerate(rows, start=2):
+            encrypted_password = _password_cell(row, password_idx)
+            yield row, _decrypt_cell(cipher, encrypted_password, row_num) if encrypted_password else ''
+    
+    try:
+        _stream_rewrite_excel(input_file, output_file, transform_rows)
+        print(f"✅ Successfully decrypted passwords in '{output_file}'")
+    except Exception as e:
+        print(f"❌ Error processing Excel file: {e}", file=sys.stderr)
+        sys.exit(1)
+
+def test_encryption(encryption_key, kdf=DEFAULT_KDF):
     """Test encryption/decryption with sample data"""
     test_passwords = ["password123", "admin@2024", "secure_pass_456"]
     
@@ -115,13 +211,13 @@ def test_encryption(encryption_key):
     for password in test_passwords:
         try:
             # Encrypt
-            encrypted = encrypt_password(password, encryption_key)
+            encrypted = encrypt_password(password, encryption_key, kdf)
             # Decrypt
-            decrypted = decrypt_password(encrypted, encryption_key)
+            decrypted = decrypt_password(encrypted, encryption_key, kdf)
             
             status = "✅ PASS" if password == decrypted else "❌ FAIL"
             print(f"{status} '{password}' -> '{encrypted[:20]}...' -> '{decrypted}'")
-            
+        
         except Exception as e:
             print(f"❌ FAIL '{password}' -> Error: {e}")
     
@@ -139,6 +235,8 @@ Examples:
   %(prog)s batch-encrypt input.xlsx output.xlsx "my_secret_key"
   %(prog)s batch-decrypt encrypted.xlsx decrypted.xlsx "my_secret_key"
   %(prog)s test "my_secret_key"
+  %(prog)s --kdf scrypt batch-encrypt input.xlsx output.xlsx "my_secret_key"
+  %(prog)s --streaming batch-encrypt huge.xlsx output.xlsx "my_secret_key"
         """
     )
     
@@ -149,6 +247,12 @@ Examples:
     )
     
     parser.add_argument('args', nargs='+', help='Arguments for the action')
+    parser.add_argument('--kdf', choices=KDF_CHOICES, default=DEFAULT_KDF,
+                       help='Key derivation function for the encryption key (default: %(default)s)')
+    parser.add_argument('--workers', type=int, help='Worker count for batch-encrypt (default: CPU count)')
+    parser.add_argument('--executor', choices=EXECUTOR_CHOICES, help='Pool type for batch-encrypt (default: process)')
+    parser.add_argument('--streaming', action='store_true',
+                       help='Stream batch files row by row through openpyxl instead of loading them with pandas')
     
     args = parser.parse_args()
     
@@ -159,18 +263,18 @@ Examples:
                 sys.exit(1)
             
             password, key = args.args
-            result = encrypt_password(password, key)
+            result = encrypt_password(password, key, args.kdf)
             print(f"🔒 Encrypted: {result}")
-            
+        
         elif args.action == 'decrypt':
             if len(args.args) != 2:
                 print("❌ Error: decrypt requires <encrypted_password> <encryption_key>", file=sys.stderr)
                 sys.exit(1)
             
             encrypted_password, key = args.args
-            result = decrypt_password(encrypted_password, key)
+            result = decrypt_password(encrypted_password, key, args.kdf)
             print(f"🔓 Decrypted: {result}")
-            
+        
         elif args.action == 'batch-encrypt':
             if len(args.args) != 3:
                 print("❌ Error: batch-encrypt requires <input.xlsx> <output.xlsx> <encryption_key>", file=sys.stderr)
@@ -182,8 +286,11 @@ Examples:
                 print(f"❌ Error: Input file '{input_file}' not found", file=sys.stderr)
                 sys.exit(1)
             
-            batch_encrypt_excel(input_file, output_file, key)
-            
+            if args.streaming:
+                stream_encrypt_excel(input_file, output_file, key, args.kdf, args.workers, args.executor)
+            else:
+                batch_encrypt_excel(input_file, output_file, key, args.kdf, args.workers, args.executor)
+        
         elif args.action == 'batch-decrypt':
             if len(args.args) != 3:
                 print("❌ Error: batch-decrypt requires <input.xlsx> <output.xlsx> <encryption_key>", file=sys.stderr)
@@ -195,16 +302,19 @@ Examples:
                 print(f"❌ Error: Input file '{input_file}' not found", file=sys.stderr)
                 sys.exit(1)
             
-            batch_decrypt_excel(input_file, output_file, key)
-            
+            if args.streaming:
+                stream_decrypt_excel(input_file, output_file, key, args.kdf)
+            else:
+                batch_decrypt_excel(input_file, output_file, key, args.kdf)
+        
         elif args.action == 'test':
             if len(args.args) != 1:
                 print("❌ Error: test requires <encryption_key>", file=sys.stderr)
                 sys.exit(1)
             
             key = args.args[0]
-            test_encryption(key)
-            
+            test_encryption(key, args.kdf)
+    
     except Exception as e:
         print(f"❌ Error: {e}", file=sys.stderr)
         sys.exit(1)
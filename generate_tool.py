@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""
+MXTSessions Generator Command Line Tool
+Converts Excel, CSV/TSV or JSON lines inventories into MobaXterm .mxtsessions files without the web app
+
+Usage:
+    python generate_tool.py servers.xlsx
+    python generate_tool.py servers.xlsx --encrypted --master-password "my_master_password"
+    python generate_tool.py servers.csv
+
+    # Regenerate, keeping the encrypted passwords of unchanged sessions:
+    python generate_tool.py servers.xlsx --encrypted --master-password "my_master_password" --previous servers_encrypted.mxtsessions
+
+    # Every sheet as its own bookmark folder, several workbooks at once:
+    python generate_tool.py dc1.xlsx dc2.xlsx --all-sheets --output all.mxtsessions
+    python generate_tool.py dc1.xlsx dc2.xlsx --all-sheets --zip --output sessions.zip
+"""
+
+import argparse
+import json
+import sys
+import os
+from mxtcore.cipher import DEFAULT_KDF, KDF_CHOICES
+from mxtcore.inventory import open_inventory_rows, detect_input_format
+from mxtcore.render import iter_mxtsessions_content, iter_chunks
+from mxtcore.batch import plan_sections, convert_sections, iter_zip_archive
+from mxtcore.incremental import PreviousSessions
+
+def open_inventory(input_file):
+    """Open an inventory file for reading and detect its format; the caller closes the file"""
+    file_content = open(input_file, 'rb')
+    
+    input_format = detect_input_format(input_file, file_content)
+    if input_format is None:
+        file_content.close()
+        raise ValueError(f"'{input_file}': only .xlsx, .csv, .tsv and .jsonl inventories are supported")
+    
+    return file_content, input_format
+
+def generate_single(input_file, output_file, password_format, master_password, kdf, previous=None):
+    """Stream one inventory (the active sheet of a workbook) straight to ``output_file``
+
+    With ``previous`` (``PreviousSessions``), unchanged encrypted passwords
+    keep their old tokens and ``previous.report`` lists what changed.
+    """
+    base_filename = os.path.splitext(os.path.basename(input_file))[0]
+    file_content, input_format = open_inventory(input_file)
+    
+    with file_content:
+        rows = open_inventory_rows(file_content, input_format)
+        sessions_content = iter_mxtsessions_content(rows, base_filename, password_format, master_password, kdf,
+                                                    previous=previous)
+        
+        # Write to a temporary file first so --previous may name the output file itself
+        temp_file = f"{output_file}.tmp"
+        try:
+            with open(temp_file, 'wb') as f:
+                for chunk in iter_chunks(sessions_content):
+                    f.write(chunk)
+            os.replace(temp_file, output_file)
+        except Exception:
+            if os.path.exists(temp_file):
+                os.remove(temp_file)
+            raise
+
+def generate_batch(input_files, output_file, password_format, master_password, kdf, all_sheets, as_zip, workers):
+    """Convert several workbooks or sheets concurrently into one merged file or zip archive"""
+    workbooks = []
+    for input_file in input_files:
+        file_content, input_format = open_inventory(input_file)
+        file_content.close()
+        # Pool workers open the file themselves
+        workbooks.append((os.path.splitext(os.path.basename(input_file))[0], os.path.abspath(input_file), input_format))
+    
+    sections = plan_sections(workbooks, all_sheets)
+    contents = convert_sections(sections, password_format, master_password, kdf, merged=not as_zip, workers=workers)
+    
+    with open(output_file, 'wb') as f:
+        if as_zip:
+            for chunk in iter_zip_archive(zip((section.entry_name for section in sections), contents)):
+                f.write(chunk)
+        else:
+            for chunk in iter_chunks(contents):
+                f.write(chunk)
+    
+    return len(sections)
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='MXTSessions Generator Command Line Tool',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  %(prog)s servers.xlsx
+  %(prog)s servers.xlsx --output servers.mxtsessions
+  %(prog)s servers.csv inventory.jsonl --output all.mxtsessions
+  %(prog)s servers.xlsx --encrypted --master-password "my_master_password"
+  %(prog)s dc1.xlsx dc2.xlsx --all-sheets --output all.mxtsessions
+  %(prog)s dc1.xlsx dc2.xlsx --all-sheets --zip --output sessions.zip
+  %(prog)s servers.xlsx -e -m "my_master_password" --previous servers_encrypted.mxtsessions --report changes.json
+        """
+    )
+    
+    parser.add_argument('input_files', nargs='+', help='Inventory files (.xlsx, .csv, .tsv or .jsonl)')
+    parser.add_argument('--output', '-o', help='Output file (default: <input>.mxtsessions, or sessions.mxtsessions/.zip for batches)')
+    parser.add_argument('--encrypted', '-e', action='store_true', help='Encrypt passwords in the output')
+    parser.add_argument('--master-password', '-m', help='Master password used with --encrypted')
+    parser.add_argument('--kdf', choices=KDF_CHOICES, default=DEFAULT_KDF,
+                       help='Key derivation function for the master password (default: %(default)s)')
+    parser.add_argument('--all-sheets', '-a', action='store_true',
+                       help='Convert every sheet, each into its own bookmark folder')
+    parser.add_argument('--zip', '-z', action='store_true', help='Write one .mxtsessions file per sheet into a zip archive')
+    parser.add_argument('--workers', type=int, help='Sheets converted concurrently (default: CPU count)')
+    parser.add_argument('--previous', '-p', help='Previously generated .mxtsessions file; unchanged sessions keep their encrypted passwords')
+    parser.add_argument('--report', help='Write the added/changed/removed session names of --previous to this JSON file')
+    
+    args = parser.parse_args()
+    
+    for input_file in args.input_files:
+        if not os.path.exists(input_file):
+            print(f"❌ Error: Input file '{input_file}' not found", file=sys.stderr)
+            sys.exit(1)
+    
+    if args.encrypted and not args.master_password:
+        print("❌ Error: --encrypted requires --master-password", file=sys.stderr)
+        sys.exit(1)
+    
+    password_format = 'encrypted' if args.encrypted else 'plain'
+    batch = len(args.input_files) > 1 or args.all_sheets or args.zip
+    
+    if args.previous and batch:
+        print("❌ Error: --previous works with a single inventory only", file=sys.stderr)
+        sys.exit(1)
+    
+    output_file = args.output
+    if not output_file:
+        base_filename = 'sessions' if len(args.input_files) > 1 else os.path.splitext(args.input_files[0])[0]
+        format_suffix = '_encrypted' if args.encrypted else ''
+        output_file = f"{base_filename}{format_suffix}.{'zip' if args.zip else 'mxtsessions'}"
+    
+    try:
+        if batch:
+            section_count = generate_batch(args.input_files, output_file, password_format, args.master_password,
+                                           args.kdf, args.all_sheets, args.zip, args.workers)
+            print(f"✅ Converted {section_count} sheet(s) into '{output_file}'")
+        else:
+            previous = None
+            if args.previous:
+                previous = PreviousSessions.from_file(args.previous)
+                if args.encrypted:
+                    previous.verify_master_password(args.master_password, args.kdf)
+            
+            generate_single(args.input_files[0], output_file, password_format, args.master_password, args.kdf, previous)
+            print(f"✅ Sessions saved to '{output_file}'")
+            
+            if previous is not None:
+                print(f"📊 Changes since '{args.previous}': {previous.report.summary()}")
+                if args.report:
+                    with open(args.report, 'w', encoding='utf-8') as f:
+                        json.dump(previous.report.as_dict(), f, indent=2)
+                    print(f"💾 Change report written to '{args.report}'")
+    
+    except Exception as e:
+        print(f"❌ Error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
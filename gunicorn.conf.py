@@ -0,0 +1,57 @@
+"""
+Gunicorn configuration for the production image
+
+Usage:
+    gunicorn -c gunicorn.conf.py app:app
+    GUNICORN_WORKER_CLASS=uvicorn.workers.UvicornWorker gunicorn -c gunicorn.conf.py asgi:app
+
+Set PROMETHEUS_MULTIPROC_DIR so /metrics aggregates samples from every
+worker; the directory is emptied when the server starts and samples of
+exited workers are released.
+
+The app is preloaded in the master (GUNICORN_PRELOAD=false turns this
+off), together with the libraries it otherwise imports on first use, so
+forked workers share those modules copy-on-write instead of each
+importing its own copy.
+"""
+
+import importlib
+import os
+import shutil
+
+bind = f"0.0.0.0:{os.environ.get('PORT', 5000)}"
+workers = int(os.environ.get('GUNICORN_WORKERS', 4))
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', 120))
+
+# gthread for app:app; set GUNICORN_WORKER_CLASS=uvicorn.workers.UvicornWorker to serve asgi:app
+worker_class = os.environ.get('GUNICORN_WORKER_CLASS', 'gthread')
+
+# Threads per worker (gthread). Heavy conversions are capped by admission control
+# (MXT_ADMISSION_CAPACITY + MXT_ADMISSION_QUEUE), so the spare threads keep /health responsive.
+threads = int(os.environ.get('GUNICORN_THREADS', 8))
+
+preload_app = os.environ.get('GUNICORN_PRELOAD', 'true').lower() in ('1', 'true', 'yes', 'on')
+
+# Imported lazily by the app, but worth sharing between workers when preloading
+PRELOAD_MODULES = ('openpyxl', 'cryptography.fernet')
+
+if preload_app and os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+    # The preloaded app creates its metric files before on_starting runs
+    os.makedirs(os.environ['PROMETHEUS_MULTIPROC_DIR'], exist_ok=True)
+
+def on_starting(server):
+    """Start every run with an empty metrics directory and, when preloading, the shared imports"""
+    directory = os.environ.get('PROMETHEUS_MULTIPROC_DIR')
+    if directory:
+        shutil.rmtree(directory, ignore_errors=True)
+        os.makedirs(directory, exist_ok=True)
+    
+    if server.cfg.preload_app:
+        for name in PRELOAD_MODULES:
+            importlib.import_module(name)
+
+def child_exit(server, worker):
+    """Drop the live gauges of a worker that has exited"""
+    if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+        from prometheus_client import multiprocess
+        multiprocess.mark_process_dead(worker.pid)
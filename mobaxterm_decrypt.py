@@ -7,140 +7,365 @@ Usage:
     python mobaxterm_decrypt.py sessions.mxtsessions master_password
     python mobaxterm_decrypt.py sessions.mxtsessions master_password --output decrypted.mxtsessions
     python mobaxterm_decrypt.py sessions.mxtsessions master_password --show-passwords
+    python mobaxterm_decrypt.py sessions.mxtsessions master_password --host web01 --show-passwords
+    python mobaxterm_decrypt.py sessions.mxtsessions master_password --output decrypted.mxtsessions --jobs 8
 """
 
-from cryptography.fernet import Fernet
-import base64
-import hashlib
 import argparse
 import sys
-import re
 import os
+import mmap
+import operator
+import stat
+import tempfile
+import time
+from mxtcore.cipher import get_cipher_context, decrypt_password, DEFAULT_KDF, KDF_CHOICES
+from mxtcore.sessions import SESSION_MARKER, SessionEntry, match_session_line, iter_session_entries
+from mxtcore.records import SessionRecord, STATUS_DECRYPTED, STATUS_PLAIN, STATUS_FAILED
+from mxtcore.index import SessionIndex
+from mxtcore.parallel import iter_encrypted, decrypt_chunk, EXECUTOR_PROCESS
 
-def generate_key_from_password(password):
-    """Generate a Fernet key from a password"""
-    key = hashlib.sha256(password.encode()).digest()
-    return base64.urlsafe_b64encode(key)
-
-def decrypt_mobaxterm_password(encrypted_password, master_password):
+def decrypt_mobaxterm_password(encrypted_password, master_password, kdf=DEFAULT_KDF):
     """Decrypt a MobaXterm encrypted password"""
+    # Remove ENC: prefix if present
+    if encrypted_password.startswith('ENC:'):
+        encrypted_password = encrypted_password[4:]
+    
+    return decrypt_password(encrypted_password, master_password, kdf)
+
+def _iter_raw_lines(f, use_mmap):
+    """Iterate the raw byte lines of an open binary file, optionally through mmap"""
+    # Pipes and other special files can't be mapped
+    file_stat = os.fstat(f.fileno())
+    if not use_mmap or not stat.S_ISREG(file_stat.st_mode):
+        yield from f
+        return
+    
+    if file_stat.st_size == 0:
+        return
+    
+    with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+        if hasattr(mapped, 'madvise'):
+            # Read-ahead, and let the kernel drop pages behind us
+            mapped.madvise(mmap.MADV_SEQUENTIAL)
+        yield from iter(mapped.readline, b'')
+
+def iter_mxtsessions_file(file_path, use_mmap=False):
+    """Incrementally parse a .mxtsessions file, yielding one SessionEntry per session
+
+    The file is streamed (or memory-mapped with ``use_mmap``) rather than
+    read into memory, and lines without the session marker are skipped
+    without being decoded. Stop iterating at any point to exit early.
+    """
     try:
-        # Remove ENC: prefix if present
-        if encrypted_password.startswith('ENC:'):
-            encrypted_password = encrypted_password[4:]
-        
-        key = generate_key_from_password(master_password)
-        fernet = Fernet(key)
-        encrypted_bytes = base64.urlsafe_b64decode(encrypted_password.encode())
-        decrypted = fernet.decrypt(encrypted_bytes)
-        return decrypted.decode()
+        with open(file_path, 'rb') as f:
+            yield from iter_session_entries(_iter_raw_lines(f, use_mmap))
     except Exception as e:
-        raise Exception(f"Decryption failed: {str(e)}")
+        raise Exception(f"Failed to parse sessions file: {str(e)}")
 
-def parse_mxtsessions_file(file_path):
-    """Parse .mxtsessions file and extract session information"""
-    sessions = []
-    
+def iter_session_lines(file_path, use_mmap=False):
+    """Yield ``(raw_line, match, session)`` for every line of a .mxtsessions file
+
+    ``session`` is a SessionRecord and ``match`` its session-line match;
+    both are None for lines that are not sessions. Lines are read one at a
+    time, so memory does not grow with the file.
+    """
     try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            content = f.read()
-        
-        # Find session entries (lines that contain session data)
-        session_pattern = r'^([^=]+)=#109#0%([^%]+)%22%([^%]+)%([^%]+)%-1%-1.*
-        
-        for line in content.split('\n'):
-            line = line.strip()
-            if line and not line.startswith('[') and '=' in line and '#109#0%' in line:
-                match = re.match(session_pattern, line)
-                if match:
-                    session_name = match.group(1)
-                    ip = match.group(2)
-                    username = match.group(3)
-                    password = match.group(4)
-                    
-                    sessions.append({
-                        'session_name': session_name,
-                        'ip': ip,
-                        'username': username,
-                        'password': password,
-                        'original_line': line
-                    })
-        
-        return sessions
+        with open(file_path, 'rb') as f:
+            for raw_line in _iter_raw_lines(f, use_mmap):
+                match = match_session_line(raw_line.decode('utf-8').strip()) if SESSION_MARKER in raw_line else None
+                if match is None:
+                    yield raw_line, None, None
+                else:
+                    yield raw_line, match, SessionRecord.from_session_entry(SessionEntry(*match.group(1, 2, 3, 4)))
     except Exception as e:
         raise Exception(f"Failed to parse sessions file: {str(e)}")
 
-def decrypt_sessions(sessions, master_password):
-    """Decrypt passwords in sessions list"""
-    decrypted_sessions = []
+def find_first_session(file_path, predicate=None):
+    """Return the first session matching ``predicate`` (or the first session at all), or None"""
+    for entry in iter_mxtsessions_file(file_path):
+        if predicate is None or predicate(entry):
+            return entry
+    return None
+
+def parse_mxtsessions_file(file_path):
+    """Parse .mxtsessions file and extract session information as a list of SessionRecords
+
+    Holds every session in memory; the decrypt pipeline streams the file
+    through ``iter_session_lines`` instead.
+    """
+    return [SessionRecord.from_session_entry(entry) for entry in iter_mxtsessions_file(file_path)]
+
+def lookup_sessions(file_path, host=None, ip=None, pattern=None, persist=True):
+    """Return the sessions matching ``host``, ``ip`` and/or ``pattern`` using the sidecar index
+
+    Only the matching lines are read; the index is built on first use
+    and rebuilt whenever the file changes. Pass them to
+    ``decrypt_sessions`` as usual.
+    """
+    try:
+        with SessionIndex(file_path, persist=persist) as index:
+            return index.lookup(host, ip, pattern)
+    except Exception as e:
+        raise Exception(f"Failed to look up sessions: {str(e)}")
+
+def verify_master_password(file_path, master_password, kdf=DEFAULT_KDF):
+    """Raise ValueError unless the file's first ``ENC:`` password decrypts with this master password and KDF
+
+    Only the file up to the first encrypted session is read, so a wrong
+    master password is reported before a long decryption run starts.
+    """
+    entry = find_first_session(file_path, lambda entry: entry.password.startswith('ENC:'))
+    if entry is None:
+        return
+    
+    try:
+        decrypt_mobaxterm_password(entry.password, master_password, kdf)
+    except Exception:
+        raise ValueError(f"Master password or kdf does not decrypt session {entry.session_name}")
+
+def decrypt_sessions(sessions, master_password, kdf=DEFAULT_KDF, jobs=1):
+    """Decrypt passwords in sessions list
+
+    Records are updated in place: ``password`` is replaced and ``status``
+    set to STATUS_DECRYPTED, STATUS_PLAIN or STATUS_FAILED (with
+    ``error``). The same list is returned. With ``jobs`` > 1 large lists
+    are decrypted in ordered chunks on a process pool and failures are
+    only recorded, not printed.
+    """
+    if jobs > 1:
+        return _decrypt_sessions_parallel(sessions, master_password, kdf, jobs)
+    
+    cipher = get_cipher_context(master_password, kdf)
     
     for session in sessions:
         try:
-            password = session['password']
+            password = session.password
             
             # Check if password is encrypted
-            if password.startswith('ENC:') or password.startswith('ENCRYPT_FAILED_'):
-                if password.startswith('ENCRYPT_FAILED_'):
-                    # Handle failed encryption case
-                    decrypted_password = password.replace('ENCRYPT_FAILED_', '')
-                    print(f"⚠️  Warning: {session['session_name']} had encryption failure, using original password")
-                else:
-                    # Decrypt the password
-                    decrypted_password = decrypt_mobaxterm_password(password, master_password)
-                
-                # Create new session with decrypted password
-                new_session = session.copy()
-                new_session['password'] = decrypted_password
-                new_session['decrypted'] = True
-                decrypted_sessions.append(new_session)
+            if password.startswith('ENCRYPT_FAILED_'):
+                # Handle failed encryption case
+                session.password = password.replace('ENCRYPT_FAILED_', '')
+                session.status = STATUS_DECRYPTED
+                print(f"⚠️  Warning: {session.name} had encryption failure, using original password")
+            elif password.startswith('ENC:'):
+                # Decrypt the password
+                session.password = cipher.decrypt(password[4:])
+                session.status = STATUS_DECRYPTED
             else:
                 # Password is already plain text
-                new_session = session.copy()
-                new_session['decrypted'] = False
-                decrypted_sessions.append(new_session)
-                
+                session.status = STATUS_PLAIN
+        
         except Exception as e:
-            print(f"❌ Failed to decrypt {session['session_name']}: {e}")
-            # Keep original session with failed decryption note
-            failed_session = session.copy()
-            failed_session['decryption_error'] = str(e)
-            decrypted_sessions.append(failed_session)
+            print(f"❌ Failed to decrypt {session.name}: {e}")
+            # Keep original password with failed decryption note
+            session.status = STATUS_FAILED
+            session.error = str(e)
+    
+    return sessions
+
+def _decrypt_sessions_parallel(sessions, master_password, kdf, jobs):
+    pairs = iter_encrypted(sessions, master_password, kdf, password_of=operator.attrgetter('password'),
+                           workers=jobs, executor=EXECUTOR_PROCESS, chunk_func=decrypt_chunk)
+    
+    for session, (status, value) in pairs:
+        session.status = status
+        if status == STATUS_FAILED:
+            session.error = value
+        else:
+            session.password = value
     
-    return decrypted_sessions
+    return sessions
+
+def _line_password(item):
+    session = item[2]
+    return session.password if session is not None else ''
+
+def _replace_password(raw_line, match, password):
+    """Swap only the password field so the port and any other fields are kept as they were"""
+    line = raw_line.decode('utf-8')
+    stripped = line.strip()
+    new_line = stripped[:match.start(4)] + password + stripped[match.end(4):]
+    return line.replace(stripped, new_line, 1).encode('utf-8')
+
+def iter_decrypted_lines(file_path, master_password, kdf=DEFAULT_KDF, jobs=1, use_mmap=False):
+    """Decrypt a .mxtsessions file in one pass, yielding ``(raw_line, session)`` for every line
+
+    Session lines come back with the decrypted password swapped in and
+    ``session.status`` set as by ``decrypt_sessions``; other lines are
+    unchanged, with ``session`` None. Only the lines in flight are held in
+    memory (a few chunks; more with ``jobs`` > 1, where they are decrypted
+    on a process pool).
+    """
+    lines = iter_session_lines(file_path, use_mmap)
+    pairs = iter_encrypted(lines, master_password, kdf, password_of=_line_password,
+                           workers=jobs, executor=EXECUTOR_PROCESS, chunk_func=decrypt_chunk)
+    
+    for (raw_line, match, session), (status, value) in pairs:
+        if session is None:
+            yield raw_line, None
+            continue
+        
+        if jobs <= 1 and session.password.startswith('ENCRYPT_FAILED_'):
+            print(f"⚠️  Warning: {session.name} had encryption failure, using original password")
+        
+        session.status = status
+        if status == STATUS_FAILED:
+            session.error = value
+        elif status == STATUS_DECRYPTED:
+            session.password = value
+            raw_line = _replace_password(raw_line, match, value)
+        yield raw_line, session
+
+def iter_decrypted_mxtsessions(original_file, decrypted_sessions):
+    """Yield the lines of a .mxtsessions file with decrypted passwords swapped in
+
+    The file is read line by line in a single pass. Session lines are
+    matched with the same rules as ``parse_mxtsessions_file``, so the n-th
+    session line found here is rewritten with the n-th entry of
+    ``decrypted_sessions``; all other lines are passed through unchanged.
+    """
+    sessions = iter(decrypted_sessions)
+    
+    with open(original_file, 'r', encoding='utf-8') as f:
+        for line in f:
+            stripped = line.strip()
+            match = match_session_line(stripped)
+            if not match:
+                yield line
+                continue
+            
+            session = next(sessions, None)
+            if session is None or session.status != STATUS_DECRYPTED:
+                yield line
+                continue
+            
+            # Swap only the password field so the port and any other fields are kept as they were
+            new_line = stripped[:match.start(4)] + session.password + stripped[match.end(4):]
+            yield line.replace(stripped, new_line, 1)
+
+def write_decrypted_mxtsessions(original_file, decrypted_sessions, output_file):
+    """Stream a .mxtsessions file with decrypted passwords straight to ``output_file``"""
+    try:
+        with open(output_file, 'w', encoding='utf-8') as f:
+            f.writelines(iter_decrypted_mxtsessions(original_file, decrypted_sessions))
+    except Exception as e:
+        raise Exception(f"Failed to generate decrypted file: {str(e)}")
 
 def generate_decrypted_mxtsessions(original_file, decrypted_sessions):
     """Generate new .mxtsessions file with decrypted passwords"""
     try:
-        with open(original_file, 'r', encoding='utf-8') as f:
-            content = f.read()
-        
-        # Replace encrypted passwords with decrypted ones
-        new_content = content
-        
-        for session in decrypted_sessions:
-            if 'decrypted' in session and session['decrypted']:
-                # Replace the password in the original line
-                original_line = session['original_line']
-                
-                # Create new line with decrypted password
-                session_pattern = r'^([^=]+)=#109#0%([^%]+)%22%([^%]+)%([^%]+)(%-1%-1.*)
-                match = re.match(session_pattern, original_line)
-                
-                if match:
-                    session_name = match.group(1)
-                    ip = match.group(2)
-                    username = match.group(3)
-                    old_password = match.group(4)
-                    suffix = match.group(5)
-                    
-                    new_line = f"{session_name}=#109#0%{ip}%22%{username}%{session['password']}{suffix}"
-                    new_content = new_content.replace(original_line, new_line)
-        
-        return new_content
-        
+        return ''.join(iter_decrypted_mxtsessions(original_file, decrypted_sessions))
     except Exception as e:
         raise Exception(f"Failed to generate decrypted file: {str(e)}")
 
+def print_session_detail(session):
+    """Print name, IP, user and password (or error) of one decrypted session"""
+    status = "🔓 DECRYPTED" if session.status == STATUS_DECRYPTED else "📝 PLAIN"
+    if session.status == STATUS_FAILED:
+        status = "❌ FAILED"
+    
+    print(f"{status} | {session.name}")
+    print(f"       IP: {session.ip}")
+    print(f"       User: {session.user}")
+    
+    if session.status == STATUS_FAILED:
+        print(f"       Error: {session.error}")
+    else:
+        print(f"       Password: {session.password}")
+    print()
+
+def print_session_details(sessions):
+    """Print the details of each decrypted session"""
+    print(f"\n🔐 Session Details:")
+    print("-" * 80)
+    for session in sessions:
+        print_session_detail(session)
+
+def decrypt_file(args, jobs):
+    """Decrypt mode: one pass over the (memory-mapped) file, printing and/or writing each session as it is decrypted
+
+    Returns the number of sessions per status; nothing else about the
+    sessions is kept. The output goes to a temp file next to --output that
+    only replaces it once the whole input has been read, so --output may
+    name the input file itself, and is dropped when no sessions were found.
+    """
+    counts = {STATUS_DECRYPTED: 0, STATUS_PLAIN: 0, STATUS_FAILED: 0}
+    output = _open_output_temp(args.output) if args.output else None
+    
+    if args.show_passwords:
+        print(f"\n🔐 Session Details:")
+        print("-" * 80)
+    
+    try:
+        lines = iter_decrypted_lines(args.sessions_file, args.master_password, args.kdf, jobs, use_mmap=not args.no_mmap)
+        for raw_line, session in lines:
+            if output is not None:
+                output.write(raw_line)
+            if session is None:
+                continue
+            
+            counts[session.status] += 1
+            # The pool reports failures only in verbose mode
+            if session.status == STATUS_FAILED and (jobs <= 1 or args.verbose):
+                print(f"❌ Failed to decrypt {session.name}: {session.error}")
+            if args.show_passwords:
+                print_session_detail(session)
+    except BaseException:
+        # Don't leave a partly decrypted file behind
+        if output is not None:
+            output.close()
+            os.unlink(output.name)
+        raise
+    
+    if output is not None:
+        output.close()
+        if sum(counts.values()):
+            os.replace(output.name, args.output)
+        else:
+            os.unlink(output.name)
+    return counts
+
+def _open_output_temp(output_path):
+    """Open a temp file in the directory of ``output_path``, with the permissions it would have been created with"""
+    directory = os.path.dirname(os.path.abspath(output_path))
+    output = tempfile.NamedTemporaryFile('wb', dir=directory, prefix='.mxt-decrypt-', delete=False)
+    
+    if os.path.exists(output_path):
+        mode = stat.S_IMODE(os.stat(output_path).st_mode)
+    else:
+        umask = os.umask(0)
+        os.umask(umask)
+        mode = 0o666 & ~umask
+    os.chmod(output.name, mode)
+    return output
+
+def run_lookup(args):
+    """Query mode: decrypt only the sessions matching --host/--ip/--grep"""
+    print(f"🔍 Looking up sessions in: {args.sessions_file}")
+    
+    start_time = time.perf_counter()
+    with SessionIndex(args.sessions_file, persist=not args.no_index) as index:
+        if args.verbose:
+            state = "rebuilt" if index.rebuilt else "up to date"
+            print(f"📇 Index {state}: {index.path or 'in memory'} ({len(index)} sessions)")
+        sessions = index.lookup(args.host, args.ip, args.grep)
+    
+    if not sessions:
+        print("⚠️  No matching sessions found")
+        return
+    
+    decrypt_sessions(sessions, args.master_password, args.kdf)
+    elapsed_ms = (time.perf_counter() - start_time) * 1000
+    print(f"✅ Found {len(sessions)} matching sessions ({elapsed_ms:.1f} ms)")
+    
+    if args.show_passwords:
+        print_session_details(sessions)
+    else:
+        for session in sessions:
+            print(f"   {session.name} ({session.user}@{session.ip})")
+        print("\n💡 Use --show-passwords to display the matching passwords")
+
 def main():
     parser = argparse.ArgumentParser(
         description='MobaXterm Sessions Password Decryption Tool',
@@ -151,6 +376,19 @@ Examples:
   %(prog)s sessions.mxtsessions "my_master_password" --output decrypted.mxtsessions
   %(prog)s sessions.mxtsessions "my_master_password" --show-passwords
   %(prog)s sessions.mxtsessions "my_master_password" --output decrypted.mxtsessions --show-passwords
+  %(prog)s sessions.mxtsessions "my_master_password" --host web01 --show-passwords
+  %(prog)s sessions.mxtsessions "my_master_password" --output decrypted.mxtsessions --jobs 0
+  %(prog)s sessions.mxtsessions "my_master_password" --grep "^db-.*_10\.20\." --show-passwords
+
+--host, --ip and --grep decrypt only the matching sessions. The first lookup
+writes a sidecar index (sessions.mxtsessions.mxtidx) mapping session names,
+hostnames and IPs to line offsets; it is rebuilt whenever the file changes.
+
+--jobs decrypts on a process pool (0 = one worker per CPU) after checking the
+master password against the first encrypted session.
+
+The file is memory-mapped and decrypted and written in a single pass, so
+files larger than RAM work; use --no-mmap for pipes and other special files.
         """
     )
     
@@ -160,75 +398,82 @@ Examples:
     parser.add_argument('--show-passwords', '-s', action='store_true', 
                        help='Display decrypted passwords in terminal (use with caution)')
     parser.add_argument('--verbose', '-v', action='store_true', help='Verbose output')
+    parser.add_argument('--kdf', choices=KDF_CHOICES, default=DEFAULT_KDF,
+                       help='Key derivation function used when the file was encrypted (default: %(default)s)')
+    parser.add_argument('--host', help='Only decrypt sessions for this hostname (case-insensitive)')
+    parser.add_argument('--ip', help='Only decrypt sessions for this IP address')
+    parser.add_argument('--grep', metavar='REGEX', help='Only decrypt sessions whose name matches this regular expression')
+    parser.add_argument('--no-index', action='store_true',
+                       help='Look up without writing the .mxtidx sidecar index')
+    parser.add_argument('--jobs', '-j', type=int, default=1,
+                       help='Decrypt on N worker processes, 0 for one per CPU (default: %(default)s)')
+    parser.add_argument('--no-mmap', action='store_true',
+                       help='Read the sessions file with buffered reads instead of memory-mapping it')
     
     args = parser.parse_args()
+    query = args.host is not None or args.ip is not None or args.grep is not None
+    
+    if query and args.output:
+        parser.error("--output cannot be combined with --host, --ip or --grep")
+    if args.jobs < 0:
+        parser.error("--jobs must be 0 or a positive number")
+    jobs = args.jobs or os.cpu_count() or 1
     
     # Check if input file exists
     if not os.path.exists(args.sessions_file):
         print(f"❌ Error: Sessions file '{args.sessions_file}' not found", file=sys.stderr)
         sys.exit(1)
     
+    if query:
+        try:
+            run_lookup(args)
+        except Exception as e:
+            print(f"❌ Error: {e}", file=sys.stderr)
+            sys.exit(1)
+        return
+    
     print(f"🔍 Parsing sessions file: {args.sessions_file}")
     
     try:
-        # Parse the sessions file
-        sessions = parse_mxtsessions_file(args.sessions_file)
-        print(f"✅ Found {len(sessions)} sessions")
+        # A wrong master password would fail every session; check it before the pool starts
+        if jobs > 1:
+            verify_master_password(args.sessions_file, args.master_password, args.kdf)
         
-        if len(sessions) == 0:
-            print("⚠️  No sessions found in file")
-            sys.exit(0)
+        # Decrypt sessions, writing the output file in the same pass
+        if jobs > 1:
+            print(f"🔓 Decrypting passwords with master password on {jobs} workers...")
+        else:
+            print(f"🔓 Decrypting passwords with master password...")
+        if args.output:
+            print(f"💾 Generating decrypted sessions file: {args.output}")
         
-        # Decrypt sessions
-        print(f"🔓 Decrypting passwords with master password...")
-        decrypted_sessions = decrypt_sessions(sessions, args.master_password)
+        start_time = time.perf_counter()
+        try:
+            counts = decrypt_file(args, jobs)
+        except OSError as e:
+            print(f"❌ Failed to save output file: {e}", file=sys.stderr)
+            sys.exit(1)
+        elapsed = time.perf_counter() - start_time
+        total = sum(counts.values())
         
-        # Count results
-        encrypted_count = sum(1 for s in decrypted_sessions if s.get('decrypted', False))
-        plain_count = sum(1 for s in decrypted_sessions if not s.get('decrypted', True) and 'decryption_error' not in s)
-        failed_count = sum(1 for s in decrypted_sessions if 'decryption_error' in s)
+        print(f"✅ Found {total} sessions")
+        if total == 0:
+            print("⚠️  No sessions found in file")
+            sys.exit(0)
         
         print(f"📊 Results:")
-        print(f"   🔓 Decrypted: {encrypted_count}")
-        print(f"   📝 Already plain: {plain_count}")
-        print(f"   ❌ Failed: {failed_count}")
+        print(f"   🔓 Decrypted: {counts[STATUS_DECRYPTED]}")
+        print(f"   📝 Already plain: {counts[STATUS_PLAIN]}")
+        print(f"   ❌ Failed: {counts[STATUS_FAILED]}")
+        if args.verbose:
+            print(f"   ⏱️  {elapsed:.2f}s ({total / max(elapsed, 1e-9):,.0f} sessions/s)")
         
-        # Show passwords if requested
-        if args.show_passwords:
-            print(f"\n🔐 Session Details:")
-            print("-" * 80)
-            for session in decrypted_sessions:
-                status = "🔓 DECRYPTED" if session.get('decrypted') else "📝 PLAIN"
-                if 'decryption_error' in session:
-                    status = "❌ FAILED"
-                
-                print(f"{status} | {session['session_name']}")
-                print(f"       IP: {session['ip']}")
-                print(f"       User: {session['username']}")
-                
-                if 'decryption_error' in session:
-                    print(f"       Error: {session['decryption_error']}")
-                else:
-                    print(f"       Password: {session['password']}")
-                print()
-        
-        # Generate output file if requested
         if args.output:
-            print(f"💾 Generating decrypted sessions file: {args.output}")
-            try:
-                decrypted_content = generate_decrypted_mxtsessions(args.sessions_file, decrypted_sessions)
-                
-                with open(args.output, 'w', encoding='utf-8') as f:
-                    f.write(decrypted_content)
-                
-                print(f"✅ Decrypted sessions saved to: {args.output}")
-            except Exception as e:
-                print(f"❌ Failed to save output file: {e}", file=sys.stderr)
-                sys.exit(1)
+            print(f"✅ Decrypted sessions saved to: {args.output}")
         
         if not args.show_passwords and not args.output:
             print("\n💡 Use --show-passwords to display passwords or --output to save decrypted file")
-        
+    
     except Exception as e:
         print(f"❌ Error: {e}", file=sys.stderr)
         sys.exit(1)
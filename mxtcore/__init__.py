@@ -0,0 +1,6 @@
+"""
+Shared core library for the MXTSessions Generator tools
+
+Used by the Flask backend (app.py), the encryption tool (encrypt_tool.py)
+and the decryption tool (mobaxterm_decrypt.py).
+"""
@@ -0,0 +1,122 @@
+"""
+Admission control for heavy /generate requests
+
+Each worker admits conversions up to a capacity measured in weight
+units, where a request weighs one unit per ``unit_bytes`` of upload
+(capped at the whole capacity, so even the largest upload can run on
+its own). Requests that don't fit wait in a short FIFO queue; when the
+queue is full they are turned away at once (429), and when they wait
+longer than ``queue_timeout`` they give up (503). Both carry a
+Retry-After hint. Everything else (/health, /metrics, job status) never
+goes through the controller.
+"""
+
+from collections import deque
+import os
+import threading
+import time
+
+STATUS_QUEUE_FULL = 429
+STATUS_QUEUE_TIMEOUT = 503
+
+class AdmissionRejected(Exception):
+    """Raised when a request is not admitted; carries the HTTP status and Retry-After seconds"""
+    
+    def __init__(self, message, status, retry_after):
+        super().__init__(message)
+        self.status = status
+        self.retry_after = retry_after
+
+class Permit:
+    """Capacity held by one admitted request; ``release`` may be called more than once"""
+    
+    def __init__(self, controller, weight, waited):
+        self._controller = controller
+        self.weight = weight
+        self.waited = waited
+        self._released = False
+    
+    def release(self):
+        if self._released:
+            return
+        self._released = True
+        self._controller._release(self.weight)
+
+class AdmissionController:
+    """Weighted, bounded admission of concurrent work within one worker process"""
+    
+    def __init__(self, capacity=2, unit_bytes=16 * 1024 * 1024, max_queue=4, queue_timeout=10.0, retry_after=5):
+        self.capacity = capacity
+        self.unit_bytes = unit_bytes
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.retry_after = retry_after
+        self.in_flight = 0
+        self._queue = deque()
+        self._condition = threading.Condition()
+    
+    @classmethod
+    def from_environ(cls):
+        """Controller configured from the MXT_ADMISSION_* environment variables"""
+        return cls(
+            capacity=int(os.environ.get('MXT_ADMISSION_CAPACITY', 2)),
+            unit_bytes=int(os.environ.get('MXT_ADMISSION_UNIT_BYTES', 16 * 1024 * 1024)),
+            max_queue=int(os.environ.get('MXT_ADMISSION_QUEUE', 4)),
+            queue_timeout=float(os.environ.get('MXT_ADMISSION_QUEUE_TIMEOUT', 10)),
+            retry_after=int(os.environ.get('MXT_ADMISSION_RETRY_AFTER', 5))
+        )
+    
+    @property
+    def enabled(self):
+        return self.capacity > 0
+    
+    @property
+    def queued(self):
+        return len(self._queue)
+    
+    def weight_for(self, content_length):
+        """Weight of an upload of ``content_length`` bytes; unknown sizes take the whole capacity"""
+        if content_length is None:
+            return self.capacity
+        return min(self.capacity, 1 + content_length // self.unit_bytes)
+    
+    def acquire(self, weight):
+        """Admit work of ``weight`` units, waiting in the queue if needed
+
+        Returns a Permit, or raises AdmissionRejected when the queue is
+        full or the wait times out. Queued requests are admitted in
+        arrival order.
+        """
+        start = time.monotonic()
+        
+        with self._condition:
+            if not self._queue and self.in_flight + weight <= self.capacity:
+                self.in_flight += weight
+                return Permit(self, weight, 0.0)
+            
+            if len(self._queue) >= self.max_queue:
+                raise AdmissionRejected("Server is busy, too many conversions queued", STATUS_QUEUE_FULL,
+                                        self.retry_after)
+            
+            ticket = object()
+            self._queue.append(ticket)
+            try:
+                deadline = start + self.queue_timeout
+                while self._queue[0] is not ticket or self.in_flight + weight > self.capacity:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise AdmissionRejected("Server is busy, timed out waiting for a conversion slot",
+                                                STATUS_QUEUE_TIMEOUT, self.retry_after)
+                    self._condition.wait(remaining)
+                
+                self.in_flight += weight
+                return Permit(self, weight, time.monotonic() - start)
+            finally:
+                self._queue.remove(ticket)
+                # The next request in line may fit now (or become the head after a timeout)
+                self._condition.notify_all()
+    
+    def _release(self, weight):
+        with self._condition:
+            self.in_flight -= weight
+            self._condition.notify_all()
@@ -0,0 +1,140 @@
+"""
+Multi-sheet and multi-file conversion
+
+Every selected worksheet becomes its own bookmark folder (``SubRep``).
+Sheets are converted concurrently on the shared pool and the results are
+yielded as they complete, in input order, to be either merged into a
+single .mxtsessions file or packed into a zip archive. Workers are sent
+the path of each workbook rather than its content.
+"""
+
+from collections import namedtuple, deque
+import zipfile
+from mxtcore.cipher import DEFAULT_KDF
+from mxtcore.inventory import list_excel_sheets, open_inventory_rows, FORMAT_XLSX
+from mxtcore.parallel import get_executor, ENCRYPT_WORKERS
+from mxtcore.render import iter_mxtsessions_content
+
+OUTPUT_MERGED = 'merged'
+OUTPUT_ZIP = 'zip'
+OUTPUT_CHOICES = (OUTPUT_MERGED, OUTPUT_ZIP)
+
+# One worksheet to convert: the path of its file and how to name its output
+Section = namedtuple('Section', ['path', 'input_format', 'sheet_name', 'folder_name', 'entry_name'])
+
+def plan_sections(workbooks, all_sheets=False):
+    """Expand ``(base_filename, path, input_format)`` tuples into the list of sheets to convert
+
+    Without ``all_sheets`` only the active sheet of each workbook is used
+    and the folder is named after the file; otherwise every sheet becomes
+    a ``<file>\\<sheet>`` sub-folder. Text inventories always form a
+    single folder.
+    """
+    sections = []
+    
+    for base_filename, path, input_format in workbooks:
+        if not all_sheets or input_format != FORMAT_XLSX:
+            sections.append(Section(path, input_format, None, base_filename, f"{base_filename}.mxtsessions"))
+            continue
+        
+        for sheet_name in list_excel_sheets(path):
+            sections.append(Section(
+                path,
+                input_format,
+                sheet_name,
+                f"{base_filename}\\{sheet_name}",
+                f"{base_filename}_{sheet_name}.mxtsessions"
+            ))
+    
+    return sections
+
+def convert_section(section, index, password_format='plain', encryption_key=None, kdf=DEFAULT_KDF):
+    """Render one worksheet as a bookmark folder numbered ``index``"""
+    try:
+        with open(section.path, 'rb') as file_content:
+            rows = open_inventory_rows(file_content, section.input_format, section.sheet_name)
+            # Already running on a pool worker, so encrypt serially inside it
+            return ''.join(iter_mxtsessions_content(
+                rows,
+                section.folder_name,
+                password_format=password_format,
+                encryption_key=encryption_key,
+                kdf=kdf,
+                section=index,
+                encrypt_workers=1
+            ))
+    except (ValueError, KeyError) as e:
+        # Problems with the inventory itself; anything else propagates as an internal error
+        raise ValueError(f"{section.folder_name}: {str(e)}")
+
+def convert_sections(sections, password_format='plain', encryption_key=None, kdf=DEFAULT_KDF,
+                     merged=True, workers=None, executor=None):
+    """Convert sections concurrently, yielding each content in input order as soon as it is ready
+
+    When ``merged`` is set the folders are numbered consecutively so the
+    results can be concatenated into one file; otherwise each starts a
+    file of its own. At most ``2 * workers`` sections are in flight, so
+    finished contents never pile up ahead of the consumer. Raises
+    ValueError naming the first failing sheet.
+    """
+    if len(sections) == 1:
+        yield convert_section(sections[0], 0, password_format, encryption_key, kdf)
+        return
+    
+    workers = workers or ENCRYPT_WORKERS
+    pool = get_executor(executor, workers)
+    pending = deque()
+    
+    try:
+        for index, section in enumerate(sections):
+            pending.append(pool.submit(convert_section, section, index if merged else 0, password_format,
+                                       encryption_key, kdf))
+            
+            if len(pending) >= workers * 2:
+                yield pending.popleft().result()
+        
+        while pending:
+            yield pending.popleft().result()
+    finally:
+        # Drop queued sections if the consumer stops early (e.g. client disconnect)
+        for future in pending:
+            future.cancel()
+
+class _ChunkSink:
+    """Write-only file object that hands back whatever zipfile has written so far"""
+    
+    def __init__(self):
+        self._chunks = []
+    
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        return len(data)
+    
+    def flush(self):
+        pass
+    
+    def drain(self):
+        data = b''.join(self._chunks)
+        self._chunks = []
+        return data
+
+def iter_zip_archive(entries):
+    """Yield a deflated zip archive of ``(name, text)`` entries as it is built"""
+    sink = _ChunkSink()
+    used_names = set()
+    
+    with zipfile.ZipFile(sink, 'w', compression=zipfile.ZIP_DEFLATED) as archive:
+        for name, content in entries:
+            # Keep entry names unique when several files share sheet names
+            unique_name = name
+            counter = 1
+            while unique_name in used_names:
+                stem, dot, extension = name.rpartition('.')
+                unique_name = f"{stem}_{counter}{dot}{extension}"
+                counter += 1
+            used_names.add(unique_name)
+            
+            archive.writestr(unique_name, content.encode('utf-8'))
+            yield sink.drain()
+    
+    yield sink.drain()
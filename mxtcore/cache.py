@@ -0,0 +1,111 @@
+"""
+In-process LRU cache for generated sessions files
+
+Entries are keyed by a digest of everything that determines the output
+(uploaded bytes, password format, base filename), so identical uploads
+are answered without parsing the workbook again. The same digest doubles
+as the response ETag.
+"""
+
+from collections import OrderedDict
+import hashlib
+import threading
+import time
+
+class ResultCache:
+    """Thread-safe LRU cache with per-entry TTL, a per-entry size cap and a total size budget
+
+    Least recently used entries are evicted until both ``max_entries``
+    and ``max_total_bytes`` hold.
+    """
+    
+    def __init__(self, max_entries=32, ttl=3600, max_entry_bytes=16 * 1024 * 1024, max_total_bytes=64 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.max_entry_bytes = min(max_entry_bytes, max_total_bytes)
+        self.max_total_bytes = max_total_bytes
+        self.total_bytes = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+    
+    @property
+    def enabled(self):
+        return self.max_entries > 0 and self.max_total_bytes > 0
+    
+    def __len__(self):
+        return len(self._entries)
+    
+    def _remove(self, key):
+        _, content = self._entries.pop(key)
+        self.total_bytes -= len(content)
+    
+    def get(self, key):
+        """Return the cached bytes for ``key``, or None if missing or expired"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            
+            expires_at, content = entry
+            if expires_at < time.monotonic():
+                self._remove(key)
+                return None
+            
+            self._entries.move_to_end(key)
+            return content
+    
+    def set(self, key, content):
+        """Store ``content`` under ``key``, evicting the least recently used entries"""
+        if not self.enabled or len(content) > self.max_entry_bytes:
+            return
+        
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (time.monotonic() + self.ttl, content)
+            self.total_bytes += len(content)
+            while len(self._entries) > self.max_entries or self.total_bytes > self.max_total_bytes:
+                self._remove(next(iter(self._entries)))
+    
+    def tee(self, key, chunks):
+        """Pass ``chunks`` through unchanged and cache their concatenation once complete
+
+        Nothing is stored if the stream is abandoned part way or grows
+        beyond ``max_entry_bytes``.
+        """
+        parts = [] if self.enabled else None
+        size = 0
+        
+        for chunk in chunks:
+            yield chunk
+            if parts is not None:
+                size += len(chunk)
+                if size > self.max_entry_bytes:
+                    parts = None
+                else:
+                    parts.append(chunk)
+        
+        if parts is not None:
+            self.set(key, b''.join(parts))
+
+# Block size used when hashing a spooled upload
+HASH_BLOCK_BYTES = 1024 * 1024
+
+def result_cache_key(file_content, *params):
+    """Digest identifying a generated result from the upload bytes and the generation parameters
+
+    ``file_content`` may be bytes or a seekable binary stream; streams
+    are hashed block by block and rewound to where they were.
+    """
+    if isinstance(file_content, (bytes, bytearray)):
+        digest = hashlib.sha256(file_content)
+    else:
+        digest = hashlib.sha256()
+        position = file_content.tell()
+        for block in iter(lambda: file_content.read(HASH_BLOCK_BYTES), b''):
+            digest.update(block)
+        file_content.seek(position)
+    
+    for param in params:
+        digest.update(b'\0' + str(param).encode())
+    return digest.hexdigest()
@@ -0,0 +1,114 @@
+"""
+Password cipher shared by the MXTSessions tools
+
+Deriving the Fernet key and building the Fernet object is done once per
+master password through a CipherContext; encrypting or decrypting a row
+then only costs the Fernet operation itself. The cryptography package is
+imported on first use, so tools that never encrypt don't pay for it.
+"""
+
+from collections import OrderedDict
+import base64
+import hashlib
+import threading
+
+# Supported key derivation functions
+KDF_SHA256 = 'sha256'
+KDF_PBKDF2 = 'pbkdf2'
+KDF_SCRYPT = 'scrypt'
+KDF_CHOICES = (KDF_SHA256, KDF_PBKDF2, KDF_SCRYPT)
+
+# Plain SHA-256 keeps compatibility with files generated by earlier versions
+DEFAULT_KDF = KDF_SHA256
+
+# The .mxtsessions format has nowhere to store a per-file salt, so the slow
+# KDFs use a fixed application salt. They still make brute-forcing the
+# master password far more expensive than a single SHA-256.
+KDF_SALT = b'mxtsessions-generator'
+PBKDF2_ITERATIONS = 200000
+SCRYPT_N = 2 ** 14
+SCRYPT_R = 8
+SCRYPT_P = 1
+
+# Number of derived cipher contexts kept in memory
+CONTEXT_CACHE_SIZE = 8
+
+def generate_key_from_password(password, kdf=DEFAULT_KDF):
+    """Generate a Fernet key from a password"""
+    if kdf == KDF_SHA256:
+        # Create a consistent key from password using SHA-256 and base64 encoding
+        key = hashlib.sha256(password.encode()).digest()
+    elif kdf == KDF_PBKDF2:
+        key = hashlib.pbkdf2_hmac('sha256', password.encode(), KDF_SALT, PBKDF2_ITERATIONS, dklen=32)
+    elif kdf == KDF_SCRYPT:
+        key = hashlib.scrypt(password.encode(), salt=KDF_SALT, n=SCRYPT_N, r=SCRYPT_R, p=SCRYPT_P, dklen=32)
+    else:
+        raise ValueError(f"Unsupported key derivation function: {kdf}")
+    
+    return base64.urlsafe_b64encode(key)
+
+class CipherContext:
+    """Fernet cipher bound to one master password"""
+    
+    def __init__(self, master_password, kdf=DEFAULT_KDF):
+        from cryptography.fernet import Fernet
+        
+        self.kdf = kdf
+        self._fernet = Fernet(generate_key_from_password(master_password, kdf))
+    
+    def encrypt(self, password):
+        """Encrypt a password and return it as URL-safe base64 text"""
+        encrypted = self._fernet.encrypt(password.encode())
+        return base64.urlsafe_b64encode(encrypted).decode()
+    
+    def decrypt(self, encrypted_password):
+        """Decrypt a password produced by ``encrypt``"""
+        encrypted_bytes = base64.urlsafe_b64decode(encrypted_password.encode())
+        return self._fernet.decrypt(encrypted_bytes).decode()
+
+_contexts = OrderedDict()
+_contexts_lock = threading.Lock()
+
+def _context_cache_key(master_password, kdf):
+    """Digest identifying a master password in the context cache
+
+    Domain-separated so the cache never holds the plaintext, nor the bare
+    SHA-256 of the password that doubles as the legacy Fernet key.
+    """
+    material = b'mxtsessions-cipher-context\0' + kdf.encode() + b'\0' + master_password.encode()
+    return hashlib.sha256(material).hexdigest()
+
+def get_cipher_context(master_password, kdf=DEFAULT_KDF):
+    """Return a cached CipherContext for a master password, creating it if needed"""
+    cache_key = _context_cache_key(master_password, kdf)
+    
+    with _contexts_lock:
+        context = _contexts.get(cache_key)
+        if context is not None:
+            _contexts.move_to_end(cache_key)
+            return context
+    
+    # Derive outside the lock so a slow KDF doesn't block other callers
+    context = CipherContext(master_password, kdf)
+    
+    with _contexts_lock:
+        _contexts[cache_key] = context
+        _contexts.move_to_end(cache_key)
+        while len(_contexts) > CONTEXT_CACHE_SIZE:
+            _contexts.popitem(last=False)
+    
+    return context
+
+def encrypt_password(password, encryption_key, kdf=DEFAULT_KDF):
+    """Encrypt a password using Fernet encryption"""
+    try:
+        return get_cipher_context(encryption_key, kdf).encrypt(password)
+    except Exception as e:
+        raise Exception(f"Encryption failed: {str(e)}")
+
+def decrypt_password(encrypted_password, encryption_key, kdf=DEFAULT_KDF):
+    """Decrypt a password using Fernet encryption"""
+    try:
+        return get_cipher_context(encryption_key, kdf).decrypt(encrypted_password)
+    except Exception as e:
+        raise Exception(f"Decryption failed: {str(e)}")
@@ -0,0 +1,70 @@
+"""
+HTTP content coding for generated output and uploads
+
+Session files repeat the same long settings suffix on every line, so they
+compress extremely well. Output is compressed chunk by chunk as it is
+generated, so nothing is buffered in full. Brotli is used only when the
+optional ``brotli`` package is installed.
+"""
+
+import zlib
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+ENCODING_BROTLI = 'br'
+ENCODING_GZIP = 'gzip'
+ENCODING_DEFLATE = 'deflate'
+
+# Server preference when the client accepts several codings equally
+ENCODING_PREFERENCE = (ENCODING_BROTLI, ENCODING_GZIP, ENCODING_DEFLATE)
+
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5
+
+# First bytes of every gzip stream
+GZIP_MAGIC = b'\x1f\x8b'
+
+def available_encodings():
+    """Content codings this server can produce"""
+    return tuple(encoding for encoding in ENCODING_PREFERENCE if encoding != ENCODING_BROTLI or brotli is not None)
+
+def negotiate_encoding(accept_encodings):
+    """Pick the best coding from a werkzeug ``Accept`` header object, or None for identity"""
+    best = None
+    best_quality = 0
+    
+    for encoding in available_encodings():
+        quality = accept_encodings.quality(encoding)
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    
+    return best
+
+def iter_compressed(chunks, encoding):
+    """Compress a stream of byte chunks incrementally with ``encoding``"""
+    if encoding == ENCODING_BROTLI:
+        compressor = brotli.Compressor(quality=BROTLI_QUALITY)
+        compress, flush = compressor.process, compressor.finish
+    else:
+        # gzip framing for "gzip", zlib framing for HTTP "deflate"
+        wbits = 16 + zlib.MAX_WBITS if encoding == ENCODING_GZIP else zlib.MAX_WBITS
+        compressor = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, wbits)
+        compress, flush = compressor.compress, compressor.flush
+    
+    for chunk in chunks:
+        compressed = compress(chunk)
+        if compressed:
+            yield compressed
+    
+    tail = flush()
+    if tail:
+        yield tail
+
+def strip_gzip_suffix(filename):
+    """``servers.xlsx.gz`` -> ``servers.xlsx``"""
+    if filename and filename.lower().endswith('.gz'):
+        return filename[:-3]
+    return filename
@@ -0,0 +1,191 @@
+"""
+Incremental regeneration against a previously generated .mxtsessions file
+
+Rows are matched to the previous file by session name (``Hostname_IP``).
+A row is unchanged when its rendered session line equals the previous
+one apart from the password field, and its password is the same. In
+encrypted mode a row whose IP, user and password are unchanged keeps
+its previous ``ENC:`` token (checked by decrypting it with the same
+master password), so only new or changed rows are encrypted and
+unchanged sessions stay byte-identical between runs. ``compare`` can
+fill in the report in a first pass, before any output is produced.
+"""
+
+import io
+from mxtcore.cipher import get_cipher_context, DEFAULT_KDF
+from mxtcore.parallel import iter_encrypted, reuse_chunk, verify_chunk
+from mxtcore.sessions import iter_session_entries, match_session_line, session_settings
+from mxtcore.templates import DEFAULT_TEMPLATES
+
+ENCRYPTED_PREFIX = 'ENC:'
+
+class IncrementalReport:
+    """Session names added, changed and removed relative to the previous file"""
+    
+    def __init__(self):
+        self.added = []
+        self.changed = []
+        self.removed = []
+        self.unchanged = 0
+    
+    def record(self, name, entry, unchanged):
+        if entry is None:
+            self.added.append(name)
+        elif unchanged:
+            self.unchanged += 1
+        else:
+            self.changed.append(name)
+    
+    def as_dict(self):
+        return {
+            'added': self.added,
+            'changed': self.changed,
+            'removed': self.removed,
+            'unchanged': self.unchanged
+        }
+    
+    def summary(self):
+        return f"{len(self.added)} added, {len(self.changed)} changed, {len(self.removed)} removed, {self.unchanged} unchanged"
+
+class PreviousSessions:
+    """Sessions of a previously generated file, keyed by session name
+
+    ``report`` is filled in while a new inventory is rendered against it,
+    or beforehand by ``compare``. Entries need their ``settings``, which
+    are compared with rows rendered from ``templates``.
+    """
+    
+    def __init__(self, entries, templates=None):
+        self.entries = {entry.session_name: entry for entry in entries}
+        self.templates = templates or DEFAULT_TEMPLATES
+        self.report = IncrementalReport()
+        self._compared = False
+        self._verdicts = None
+    
+    @classmethod
+    def from_content(cls, content):
+        """Parse previous sessions from bytes or a binary stream"""
+        stream = io.BytesIO(content) if isinstance(content, (bytes, bytearray)) else content
+        try:
+            return cls(iter_session_entries(stream, settings=True))
+        except Exception as e:
+            raise Exception(f"Failed to parse previous sessions file: {str(e)}")
+    
+    @classmethod
+    def from_file(cls, file_path):
+        with open(file_path, 'rb') as f:
+            return cls.from_content(f.read())
+    
+    def verify_master_password(self, master_password, kdf=DEFAULT_KDF):
+        """Raise ValueError unless the first ``ENC:`` token decrypts with this master password and KDF"""
+        for entry in self.entries.values():
+            if entry.password.startswith(ENCRYPTED_PREFIX):
+                try:
+                    get_cipher_context(master_password, kdf).decrypt(entry.password[len(ENCRYPTED_PREFIX):])
+                except Exception:
+                    raise ValueError("Master password or kdf does not match the previous sessions file")
+                return
+    
+    def _candidates(self, data, seen):
+        """Yield ``(row, name, entry, token, same_settings)`` for each row
+
+        ``token`` is the previous encrypted password that may be kept ('' when
+        the previous password was empty), and ``same_settings`` tells whether
+        everything but the password renders as before.
+        """
+        render_line = None
+        
+        for row in data:
+            name = row.name
+            seen.add(name)
+            entry = self.entries.get(name)
+            
+            token = None
+            same_settings = False
+            if entry is not None:
+                if render_line is None:
+                    render_line = self.templates.renderer(row.keys())
+                line = render_line(row, '').strip()
+                match = match_session_line(line)
+                same_settings = match is not None and session_settings(line, match) == entry.settings
+                
+                # Only a token for the same IP and user can be kept; the password is checked by decrypting it
+                if entry.ip == row.ip and entry.username == row.user:
+                    if entry.password.startswith(ENCRYPTED_PREFIX):
+                        token = entry.password[len(ENCRYPTED_PREFIX):]
+                    elif not entry.password:
+                        token = ''
+            
+            yield row, name, entry, token, same_settings
+    
+    def _finish(self, seen):
+        self.report.removed = [name for name in self.entries if name not in seen]
+    
+    def compare(self, data, master_password=None, kdf=DEFAULT_KDF, workers=None):
+        """Fill in ``report`` from a first pass over ``data``, without rendering anything
+
+        With ``master_password`` (encrypted mode) the previous tokens are
+        checked here, and one verdict byte per row is kept so that
+        ``iter_reused``, run over the same rows afterwards, only encrypts
+        the rows that changed.
+        """
+        if master_password is None:
+            for _ in self.iter_compared(data):
+                pass
+        else:
+            seen = set()
+            checked = iter_encrypted(self._candidates(data, seen), master_password, kdf,
+                                     password_of=lambda item: (item[0].password, item[3]),
+                                     workers=workers, chunk_func=verify_chunk)
+            
+            verdicts = bytearray()
+            for (row, name, entry, token, same_settings), verified in checked:
+                self.report.record(name, entry, verified and same_settings)
+                verdicts.append(verified)
+            
+            self._finish(seen)
+            self._verdicts = verdicts
+        
+        self._compared = True
+    
+    def iter_reused(self, data, master_password, kdf=DEFAULT_KDF, workers=None):
+        """Yield ``(row, encrypted)`` like ``iter_encrypted``, reusing unchanged tokens"""
+        if self._verdicts is not None:
+            yield from self._iter_verified(data, master_password, kdf, workers)
+            return
+        
+        seen = set()
+        candidates = self._candidates(data, seen)
+        pairs = iter_encrypted(candidates, master_password, kdf, password_of=lambda item: (item[0].password, item[3]),
+                               workers=workers, chunk_func=reuse_chunk)
+        
+        for (row, name, entry, token, same_settings), encrypted in pairs:
+            self.report.record(name, entry, same_settings and token is not None and encrypted == token)
+            yield row, encrypted
+        
+        self._finish(seen)
+    
+    def _iter_verified(self, data, master_password, kdf, workers):
+        """``iter_reused`` after ``compare``: kept tokens pass through and only changed rows are encrypted"""
+        verdicts = iter(self._verdicts)
+        items = ((row, token if next(verdicts) else None) for row, _, _, token, _ in self._candidates(data, set()))
+        pairs = iter_encrypted(items, master_password, kdf, password_of=lambda item: '' if item[1] else item[0].password,
+                               workers=workers)
+        
+        for (row, token), encrypted in pairs:
+            yield row, token if token is not None else encrypted
+    
+    def iter_compared(self, data):
+        """Yield ``(row, '')`` for plain output, recording which rows changed"""
+        if self._compared:
+            yield from ((row, '') for row in data)
+            return
+        
+        seen = set()
+        
+        for row, name, entry, _, same_settings in self._candidates(data, seen):
+            unchanged = same_settings and entry.password == row.password
+            self.report.record(name, entry, unchanged)
+            yield row, ''
+        
+        self._finish(seen)
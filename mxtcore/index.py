@@ -0,0 +1,195 @@
+"""
+Sidecar lookup index for large .mxtsessions files
+
+``servers.mxtsessions.mxtidx`` is a small SQLite database mapping each
+session's name, hostname and IP to the byte offset and length of its
+line, so a lookup seeks straight to the matching lines instead of
+parsing (and decrypting) the whole file. The index records the size and
+mtime of the file it was built from and is rebuilt whenever either
+changes.
+"""
+
+import os
+import re
+import sqlite3
+from mxtcore.sessions import SESSION_MARKER, match_session_line
+from mxtcore.records import SessionRecord
+
+INDEX_SUFFIX = '.mxtidx'
+
+# Bump when the table layout changes so older sidecars are rebuilt
+INDEX_VERSION = 1
+
+# Rows inserted per executemany batch while building
+INSERT_BATCH_SIZE = 10000
+
+SCHEMA = """
+CREATE TABLE meta (key TEXT PRIMARY KEY, value INTEGER NOT NULL);
+CREATE TABLE sessions (
+    offset INTEGER NOT NULL,
+    length INTEGER NOT NULL,
+    session_name TEXT NOT NULL,
+    hostname TEXT NOT NULL COLLATE NOCASE,
+    ip TEXT NOT NULL
+);
+"""
+
+# Created after the bulk insert, which is much faster than maintaining them row by row
+INDEXES = """
+CREATE INDEX sessions_hostname ON sessions (hostname);
+CREATE INDEX sessions_ip ON sessions (ip);
+"""
+
+def index_path(sessions_file):
+    return sessions_file + INDEX_SUFFIX
+
+def split_hostname(session_name, ip):
+    """``web01_10.0.0.1`` -> ``web01``; names not in ``Hostname_IP`` form are returned unchanged"""
+    suffix = f"_{ip}"
+    if session_name.endswith(suffix) and len(session_name) > len(suffix):
+        return session_name[:-len(suffix)]
+    return session_name
+
+def _file_signature(sessions_file):
+    stat = os.stat(sessions_file)
+    return {'version': INDEX_VERSION, 'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+
+def _iter_index_rows(sessions_file):
+    """Yield ``(offset, length, session_name, hostname, ip)`` for every session line"""
+    offset = 0
+    with open(sessions_file, 'rb') as f:
+        for raw_line in f:
+            length = len(raw_line)
+            if SESSION_MARKER in raw_line:
+                match = match_session_line(raw_line.decode('utf-8').strip())
+                if match:
+                    session_name, ip = match.group(1, 2)
+                    yield offset, length, session_name, split_hostname(session_name, ip), ip
+            offset += length
+
+def _regexp(pattern, value):
+    return re.search(pattern, value, re.IGNORECASE) is not None
+
+class SessionIndex:
+    """Offsets of the session lines of one .mxtsessions file, backed by a sidecar database
+
+    With ``persist=False`` (or when the sidecar can't be written next to
+    the file) the index is built in memory and discarded afterwards.
+    """
+    
+    def __init__(self, sessions_file, persist=True):
+        self.sessions_file = sessions_file
+        self.path = index_path(sessions_file) if persist else None
+        self.rebuilt = False
+        self._connection = self._open()
+    
+    def _open(self):
+        signature = _file_signature(self.sessions_file)
+        
+        if self.path is not None:
+            try:
+                connection = sqlite3.connect(self.path)
+                if self._read_signature(connection) == signature:
+                    return self._prepare(connection)
+                connection.close()
+                self._build(self.path + '.tmp', signature)
+                os.replace(self.path + '.tmp', self.path)
+                return self._prepare(sqlite3.connect(self.path))
+            except (sqlite3.Error, OSError):
+                # Read-only directory or a damaged sidecar: fall back to a throwaway index
+                self.path = None
+        
+        return self._prepare(self._build(':memory:', signature))
+    
+    @staticmethod
+    def _read_signature(connection):
+        try:
+            return dict(connection.execute("SELECT key, value FROM meta"))
+        except sqlite3.DatabaseError:
+            return None
+    
+    @staticmethod
+    def _prepare(connection):
+        connection.create_function('REGEXP', 2, _regexp, deterministic=True)
+        return connection
+    
+    def _build(self, path, signature):
+        if path != ':memory:' and os.path.exists(path):
+            os.remove(path)
+        
+        connection = sqlite3.connect(path)
+        try:
+            connection.executescript(SCHEMA)
+            rows = _iter_index_rows(self.sessions_file)
+            while True:
+                batch = [row for _, row in zip(range(INSERT_BATCH_SIZE), rows)]
+                if not batch:
+                    break
+                connection.executemany("INSERT INTO sessions VALUES (?, ?, ?, ?, ?)", batch)
+            connection.executescript(INDEXES)
+            connection.executemany("INSERT INTO meta VALUES (?, ?)", signature.items())
+            connection.commit()
+        except Exception:
+            connection.close()
+            if path != ':memory:' and os.path.exists(path):
+                os.remove(path)
+            raise
+        
+        self.rebuilt = True
+        if path == ':memory:':
+            return connection
+        connection.close()
+    
+    def __len__(self):
+        return self._connection.execute("SELECT COUNT(*) FROM sessions").fetchone()[0]
+    
+    def find(self, host=None, ip=None, pattern=None):
+        """Return ``(offset, length)`` of the session lines matching every given criterion, in file order
+
+        ``host`` matches the hostname case-insensitively, ``ip`` matches
+        exactly and ``pattern`` is a case-insensitive regular expression
+        searched in the session name.
+        """
+        clauses, params = [], []
+        if host is not None:
+            clauses.append("hostname = ?")
+            params.append(host)
+        if ip is not None:
+            clauses.append("ip = ?")
+            params.append(ip)
+        if pattern is not None:
+            try:
+                re.compile(pattern)
+            except re.error as e:
+                raise ValueError(f"Invalid pattern '{pattern}': {str(e)}")
+            clauses.append("session_name REGEXP ?")
+            params.append(pattern)
+        
+        where = f" WHERE {' AND '.join(clauses)}" if clauses else ""
+        return self._connection.execute(f"SELECT offset, length FROM sessions{where} ORDER BY offset", params).fetchall()
+    
+    def read_sessions(self, locations):
+        """Read the session lines at ``locations`` and return them as SessionRecords"""
+        sessions = []
+        with open(self.sessions_file, 'rb') as f:
+            for offset, length in locations:
+                f.seek(offset)
+                match = match_session_line(f.read(length).decode('utf-8').strip())
+                if match is None:
+                    raise Exception(f"Index is out of date at byte {offset}; delete {self.path} and retry")
+                sessions.append(SessionRecord(None, match.group(2), match.group(3), match.group(4),
+                                              session_name=match.group(1)))
+        return sessions
+    
+    def lookup(self, host=None, ip=None, pattern=None):
+        """Sessions matching the given criteria (see ``find``), read straight from their offsets"""
+        return self.read_sessions(self.find(host, ip, pattern))
+    
+    def close(self):
+        self._connection.close()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc_info):
+        self.close()
@@ -0,0 +1,300 @@
+"""
+Inventory readers for the MXTSessions Generator
+
+Turn uploaded inventories (.xlsx workbooks, CSV/TSV text or JSON lines)
+into a stream of validated rows, each a ``SessionRecord`` with the
+``Hostname``, ``IP``, ``user`` and ``password`` columns plus any optional
+columns the inventory has. Unreadable or invalid inventories raise
+ValueError; anything else is an internal error.
+"""
+
+import csv
+import io
+import itertools
+import json
+import os
+from mxtcore.records import SessionRecord
+from mxtcore.templates import DEFAULT_TEMPLATES, TYPE_COLUMN
+
+REQUIRED_COLUMNS = ['Hostname', 'IP', 'user', 'password']
+
+# Optional columns passed through to the session templates when present
+OPTIONAL_COLUMNS = ['port', 'type', 'ssh_key', 'jump_host', 'jump_port', 'jump_user']
+
+# Supported inventory formats
+FORMAT_XLSX = 'xlsx'
+FORMAT_CSV = 'csv'
+FORMAT_TSV = 'tsv'
+FORMAT_JSONL = 'jsonl'
+INPUT_FORMATS = (FORMAT_XLSX, FORMAT_CSV, FORMAT_TSV, FORMAT_JSONL)
+
+FORMAT_EXTENSIONS = {
+    '.xlsx': FORMAT_XLSX,
+    '.csv': FORMAT_CSV,
+    '.tsv': FORMAT_TSV,
+    '.tab': FORMAT_TSV,
+    '.jsonl': FORMAT_JSONL,
+    '.ndjson': FORMAT_JSONL
+}
+
+# Label used in error messages for each format
+FORMAT_LABELS = {
+    FORMAT_XLSX: 'Excel file',
+    FORMAT_CSV: 'CSV file',
+    FORMAT_TSV: 'TSV file',
+    FORMAT_JSONL: 'JSON lines file'
+}
+
+def _as_binary_stream(file_content):
+    """Wrap uploaded bytes in a stream; file objects are passed through"""
+    if isinstance(file_content, (bytes, bytearray)):
+        return io.BytesIO(file_content)
+    return file_content
+
+def _peek(file_content, size=4096):
+    """Return the first ``size`` bytes of an upload without consuming it"""
+    if isinstance(file_content, (bytes, bytearray)):
+        return bytes(file_content[:size])
+    
+    position = file_content.tell()
+    head = file_content.read(size)
+    file_content.seek(position)
+    return head
+
+def detect_input_format(filename, file_content):
+    """Pick the inventory format from the file extension, falling back to content sniffing
+
+    Returns None when neither the extension nor the content is recognised.
+    """
+    extension = os.path.splitext(filename or '')[1].lower()
+    if extension in FORMAT_EXTENSIONS:
+        return FORMAT_EXTENSIONS[extension]
+    
+    head = _peek(file_content)
+    if head.startswith(b'PK\x03\x04'):
+        return FORMAT_XLSX
+    
+    text = head.decode('utf-8-sig', errors='ignore').lstrip()
+    if text.startswith('{'):
+        return FORMAT_JSONL
+    
+    # Delimited text is only accepted when its header names the required columns
+    header = text.split('\n', 1)[0]
+    for delimiter, input_format in (('\t', FORMAT_TSV), (',', FORMAT_CSV)):
+        columns = [column.strip().strip('"') for column in header.split(delimiter)]
+        if all(column in columns for column in REQUIRED_COLUMNS):
+            return input_format
+    
+    return None
+
+def _optional_value(value):
+    """Text of an optional cell; whole-number floats (Excel ports) lose their ``.0``"""
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    return str(value if value is not None else '').strip()
+
+def _validated_rows(header, rows):
+    """Validate the header, then yield one SessionRecord per usable data row
+
+    ``header`` and each row are sequences of cell values in column order.
+    Empty rows and rows without a hostname or IP are skipped. A ``type``
+    must name one of the loaded session templates (empty means SSH).
+    """
+    # Get header row (first row)
+    headers = [str(value).strip() if value else '' for value in header or ()]
+    
+    # Validate required columns
+    missing_columns = [col for col in REQUIRED_COLUMNS if col not in headers]
+    
+    if missing_columns:
+        raise ValueError(f"Missing required columns: {', '.join(missing_columns)}")
+    
+    # Get column indices
+    hostname_idx = headers.index('Hostname')
+    ip_idx = headers.index('IP')
+    user_idx = headers.index('user')
+    password_idx = headers.index('password')
+    optional_indices = [(column, headers.index(column)) for column in OPTIONAL_COLUMNS if column in headers]
+    session_types = DEFAULT_TEMPLATES.templates
+    
+    # Read data rows
+    for row in rows:
+        if not row or all(cell is None or str(cell).strip() == '' for cell in row):
+            continue  # Skip empty rows
+        
+        # Ensure we have enough columns
+        if len(row) < len(headers):
+            row = tuple(row) + (None,) * (len(headers) - len(row))
+        
+        hostname = str(row[hostname_idx] or '').strip()
+        ip = str(row[ip_idx] or '').strip()
+        
+        # Skip rows without essential data
+        if not hostname or not ip:
+            continue
+        
+        extra = None
+        if optional_indices:
+            extra = {column: _optional_value(row[index]) for column, index in optional_indices}
+            if TYPE_COLUMN in extra:
+                session_type = extra[TYPE_COLUMN] = extra[TYPE_COLUMN].lower()
+                if session_type and session_type not in session_types:
+                    raise ValueError(f"{hostname}: unsupported session type '{session_type}', "
+                                     f"expected one of: {', '.join(session_types)}")
+        
+        yield SessionRecord(
+            hostname,
+            ip,
+            str(row[user_idx] or '').strip(),
+            str(row[password_idx] or '').strip(),
+            extra=extra
+        )
+
+def _open_workbook(file_content):
+    """Open uploaded bytes (or a binary file object) as a read-only workbook"""
+    # Imported here: openpyxl (and the numpy it pulls in) is only needed for .xlsx inventories
+    from openpyxl import load_workbook
+    
+    try:
+        # Read-only mode parses the sheet XML lazily instead of building every cell
+        return load_workbook(_as_binary_stream(file_content), read_only=True)
+    except MemoryError:
+        raise
+    except Exception as e:
+        raise ValueError(f"Failed to read Excel file: {str(e)}")
+
+def list_excel_sheets(file_content):
+    """Return the worksheet names of an Excel file in workbook order"""
+    workbook = _open_workbook(file_content)
+    try:
+        return list(workbook.sheetnames)
+    finally:
+        workbook.close()
+
+def iter_excel_rows(file_content, sheet_name=None):
+    """Stream validated rows from an Excel file using openpyxl read-only mode
+
+    Rows are yielded one at a time as SessionRecords, so memory stays flat
+    regardless of how many rows the worksheet holds. ``sheet_name``
+    selects a worksheet; the active one is used by default.
+    """
+    workbook = _open_workbook(file_content)
+    
+    try:
+        worksheet = workbook[sheet_name] if sheet_name is not None else workbook.active
+        rows = worksheet.iter_rows(values_only=True)
+        yield from _validated_rows(next(rows, None), rows)
+    
+    except (ValueError, MemoryError):
+        raise
+    except Exception as e:
+        raise ValueError(f"Failed to read Excel file: {str(e)}")
+    finally:
+        workbook.close()
+
+def iter_delimited_rows(file_content, delimiter=','):
+    """Stream validated rows from CSV or TSV text"""
+    label = 'TSV file' if delimiter == '\t' else 'CSV file'
+    
+    try:
+        text = io.TextIOWrapper(_as_binary_stream(file_content), encoding='utf-8-sig', newline='')
+        try:
+            rows = csv.reader(text, delimiter=delimiter)
+            yield from _validated_rows(next(rows, None), rows)
+        finally:
+            # Detach so the caller's stream isn't closed along with the wrapper (unless the caller already closed it)
+            if not text.closed:
+                text.detach()
+    
+    except (ValueError, MemoryError):
+        raise
+    except Exception as e:
+        raise ValueError(f"Failed to read {label}: {str(e)}")
+
+def iter_jsonl_rows(file_content):
+    """Stream validated rows from JSON lines, one object per line keyed by column name"""
+    def records(lines):
+        for line_num, line in enumerate(lines, start=1):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError as e:
+                raise Exception(f"line {line_num}: {e.msg}")
+            if not isinstance(record, dict):
+                raise Exception(f"line {line_num} is not a JSON object")
+            yield record
+    
+    try:
+        text = io.TextIOWrapper(_as_binary_stream(file_content), encoding='utf-8-sig')
+        try:
+            objects = records(text)
+            first = next(objects, None)
+            
+            # Columns come from the first object; later objects may leave optional keys out
+            header = list(first) if first is not None else []
+            rows = (
+                tuple(record.get(column) for column in header)
+                for record in itertools.chain((first,) if first is not None else (), objects)
+            )
+            yield from _validated_rows(header, rows)
+        finally:
+            # Detach so the caller's stream isn't closed along with the wrapper (unless the caller already closed it)
+            if not text.closed:
+                text.detach()
+    
+    except (ValueError, MemoryError):
+        raise
+    except Exception as e:
+        raise ValueError(f"Failed to read JSON lines file: {str(e)}")
+
+def iter_inventory_rows(file_content, input_format=FORMAT_XLSX, sheet_name=None):
+    """Stream validated rows from an inventory in any supported format"""
+    if input_format == FORMAT_XLSX:
+        return iter_excel_rows(file_content, sheet_name)
+    if input_format == FORMAT_CSV:
+        return iter_delimited_rows(file_content, ',')
+    if input_format == FORMAT_TSV:
+        return iter_delimited_rows(file_content, '\t')
+    if input_format == FORMAT_JSONL:
+        return iter_jsonl_rows(file_content)
+    raise ValueError(f"Unsupported input format: {input_format}")
+
+def open_inventory_rows(file_content, input_format=FORMAT_XLSX, sheet_name=None):
+    """Validate an inventory up front and return a lazy iterator over its rows
+
+    The header and the first data row are read eagerly so that malformed
+    uploads are rejected before any output is produced; the remaining rows
+    are only parsed as the caller consumes them.
+    """
+    rows = iter_inventory_rows(file_content, input_format, sheet_name)
+    first_row = next(rows, None)
+    
+    if first_row is None:
+        raise ValueError(f"No valid data rows found in {FORMAT_LABELS[input_format]}")
+    
+    return itertools.chain((first_row,), rows)
+
+def check_session_types(file_content, input_format=FORMAT_XLSX, sheet_name=None):
+    """Read an inventory through once if it has a ``type`` column, raising ValueError for an unsupported type
+
+    Lets streamed responses reject bad types before their status is sent.
+    Without the column only the first row is read. Callers rewind
+    ``file_content`` before reading it again.
+    """
+    rows = iter_inventory_rows(file_content, input_format, sheet_name)
+    try:
+        first_row = next(rows, None)
+        if first_row is not None and TYPE_COLUMN in first_row.keys():
+            for _ in rows:
+                pass
+    finally:
+        rows.close()
+
+def open_excel_rows(file_content, sheet_name=None):
+    """Validate an Excel file up front and return a lazy iterator over its rows"""
+    return open_inventory_rows(file_content, FORMAT_XLSX, sheet_name)
+
+def read_excel_file(file_content):
+    """Read Excel file using openpyxl and return data as a list of SessionRecords"""
+    return list(open_excel_rows(file_content))
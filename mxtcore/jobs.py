@@ -0,0 +1,165 @@
+"""
+File-backed job store for background sessions conversions
+
+Each job's status lives in ``<job_id>.json`` and its output in
+``<job_id>.mxtsessions`` under a shared directory, so any gunicorn worker
+can answer status and result requests for a job started by another.
+Jobs run on a small bounded thread pool inside the worker that accepted
+them; no external services are needed.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+import json
+import os
+import re
+import tempfile
+import threading
+import time
+import uuid
+
+JOB_QUEUED = 'queued'
+JOB_RUNNING = 'running'
+JOB_COMPLETED = 'completed'
+JOB_FAILED = 'failed'
+
+# Job ids are uuid4 hex strings; anything else is rejected before touching the filesystem
+JOB_ID_PATTERN = re.compile(r'^[0-9a-f]{32}$')
+
+class JobQueueFull(Exception):
+    """Raised when a job is submitted while the local queue is at capacity"""
+
+class JobProgress:
+    """Handle passed to a running job for reporting rows processed"""
+    
+    def __init__(self, store, job_id, update_every=1000, min_interval=0.5):
+        self._store = store
+        self._job_id = job_id
+        self._update_every = update_every
+        self._min_interval = min_interval
+        self._last_write = 0.0
+        self.rows_processed = 0
+    
+    def advance(self, rows=1):
+        """Count processed rows, persisting the total every few thousand rows"""
+        self.rows_processed += rows
+        if self.rows_processed % self._update_every == 0 and time.monotonic() - self._last_write >= self._min_interval:
+            self._last_write = time.monotonic()
+            self._store.update(self._job_id, rows_processed=self.rows_processed)
+    
+    def track(self, rows):
+        """Wrap an iterable of rows, advancing the counter as each one is consumed"""
+        for row in rows:
+            yield row
+            self.advance()
+
+class JobStore:
+    """Bounded local worker pool plus a directory of job status and result files"""
+    
+    def __init__(self, directory, max_workers=2, max_pending=8, ttl=3600):
+        self.directory = directory
+        self.max_pending = max_pending
+        self.ttl = ttl
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='mxt-job')
+        self._pending = 0
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+    
+    def _status_path(self, job_id):
+        return os.path.join(self.directory, f"{job_id}.json")
+    
+    def result_path(self, job_id):
+        return os.path.join(self.directory, f"{job_id}.mxtsessions")
+    
+    def _write_status(self, job_id, status):
+        # Write-then-rename so readers in other workers never see a partial file
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        with os.fdopen(fd, 'w') as f:
+            json.dump(status, f)
+        os.replace(tmp_path, self._status_path(job_id))
+    
+    def get(self, job_id):
+        """Return a job's status dictionary, or None if the id is unknown"""
+        if not JOB_ID_PATTERN.match(job_id or ''):
+            return None
+        try:
+            with open(self._status_path(job_id)) as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            return None
+    
+    def update(self, job_id, **fields):
+        """Merge ``fields`` into a job's persisted status"""
+        with self._lock:
+            status = self.get(job_id)
+            if status is None:
+                return
+            status.update(fields)
+            self._write_status(job_id, status)
+    
+    def submit(self, func, output_filename):
+        """Queue ``func(progress, result_path)`` as a new job and return its id
+
+        Raises JobQueueFull when ``max_pending`` jobs are already queued or
+        running in this worker.
+        """
+        with self._lock:
+            if self._pending >= self.max_pending:
+                raise JobQueueFull("Job queue is full, retry later")
+            self._pending += 1
+        
+        try:
+            self.cleanup()
+            
+            job_id = uuid.uuid4().hex
+            self._write_status(job_id, {
+                'job_id': job_id,
+                'status': JOB_QUEUED,
+                'rows_processed': 0,
+                'output_filename': output_filename,
+                'created_at': datetime.now().isoformat(),
+                'finished_at': None,
+                'error': None
+            })
+            self._executor.submit(self._run, job_id, func)
+        except BaseException:
+            # The job never reached _run, which would otherwise give the slot back
+            with self._lock:
+                self._pending -= 1
+            raise
+        
+        return job_id
+    
+    def _run(self, job_id, func):
+        progress = JobProgress(self, job_id)
+        try:
+            self.update(job_id, status=JOB_RUNNING, started_at=datetime.now().isoformat())
+            func(progress, self.result_path(job_id))
+            self.update(job_id, status=JOB_COMPLETED, rows_processed=progress.rows_processed,
+                        finished_at=datetime.now().isoformat())
+        except Exception as e:
+            try:
+                os.unlink(self.result_path(job_id))
+            except OSError:
+                pass
+            self.update(job_id, status=JOB_FAILED, rows_processed=progress.rows_processed,
+                        error=str(e), finished_at=datetime.now().isoformat())
+        finally:
+            with self._lock:
+                self._pending -= 1
+    
+    def cleanup(self):
+        """Remove status and result files older than the TTL"""
+        cutoff = time.time() - self.ttl
+        try:
+            names = os.listdir(self.directory)
+        except FileNotFoundError:
+            return
+        
+        for name in names:
+            path = os.path.join(self.directory, name)
+            try:
+                if os.path.getmtime(path) < cutoff:
+                    os.unlink(path)
+            except OSError:
+                pass
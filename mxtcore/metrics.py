@@ -0,0 +1,151 @@
+"""
+Prometheus metrics for /generate
+
+Counters, histograms and the in-flight gauge live in the default
+registry. When ``PROMETHEUS_MULTIPROC_DIR`` is set (gunicorn), every
+worker writes its samples to that directory and ``render_metrics``
+aggregates all of them, so any worker can answer a scrape.
+"""
+
+import itertools
+import os
+import time
+from prometheus_client import (
+    Counter, Histogram, Gauge, CollectorRegistry, REGISTRY, CONTENT_TYPE_LATEST, generate_latest, multiprocess
+)
+from mxtcore.timing import StageClock, STAGE_PARSE, STAGE_SEND
+
+# Client went away before the response finished (nginx convention)
+STATUS_CLIENT_CLOSED = 499
+
+SECONDS_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+ROWS_BUCKETS = (10, 100, 1000, 5000, 10000, 50000, 100000, 500000, 1000000)
+BYTES_BUCKETS = tuple(1024 * 4 ** power for power in range(10))
+
+REQUESTS = Counter(
+    'mxt_generate_requests_total', 'Requests handled by /generate',
+    ['password_format', 'status']
+)
+STAGE_SECONDS = Histogram(
+    'mxt_generate_stage_seconds', 'Wall time spent in each /generate stage',
+    ['stage'], buckets=SECONDS_BUCKETS
+)
+REQUEST_SECONDS = Histogram(
+    'mxt_generate_duration_seconds', 'Total /generate request time, including streaming the response',
+    ['password_format'], buckets=SECONDS_BUCKETS
+)
+ROWS = Histogram(
+    'mxt_generate_rows', 'Inventory rows converted per request',
+    ['password_format'], buckets=ROWS_BUCKETS
+)
+INPUT_BYTES = Histogram(
+    'mxt_generate_input_bytes', 'Uploaded inventory size per request',
+    buckets=BYTES_BUCKETS
+)
+OUTPUT_BYTES = Histogram(
+    'mxt_generate_output_bytes', 'Response body size per request',
+    buckets=BYTES_BUCKETS
+)
+IN_PROGRESS = Gauge(
+    'mxt_generate_in_progress', 'Requests currently being handled by /generate',
+    multiprocess_mode='livesum'
+)
+ADMISSION_REJECTED = Counter(
+    'mxt_admission_rejected_total', '/generate requests turned away by admission control',
+    ['status']
+)
+ADMISSION_WAIT_SECONDS = Histogram(
+    'mxt_admission_wait_seconds', 'Time admitted /generate requests spent queued',
+    buckets=SECONDS_BUCKETS
+)
+
+def render_metrics():
+    """Return ``(payload, content_type)`` in the Prometheus text exposition format"""
+    if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    
+    return generate_latest(registry), CONTENT_TYPE_LATEST
+
+class GenerateMetrics:
+    """Collects the measurements of one /generate request
+
+    Stage timings come from ``clock``. Non-streamed responses are recorded
+    with ``finish``; streamed bodies go through ``stream``, which records
+    everything once the last chunk has been sent or the client disconnects.
+    Callables in ``on_finish`` run after the request has been recorded.
+    """
+    
+    def __init__(self, prefetch_bytes=0):
+        self.prefetch_bytes = prefetch_bytes
+        self.clock = StageClock()
+        self.password_format = 'plain'
+        self.input_bytes = 0
+        self.output_bytes = 0
+        self.streaming = False
+        self.body_complete = False
+        self.on_finish = []
+        self._finished = False
+        IN_PROGRESS.inc()
+    
+    def stream(self, chunks):
+        """Wrap a response body, counting output bytes and the time spent sending each chunk
+
+        Up to ``prefetch_bytes`` of the body (all of it when None) are
+        produced before returning; ``body_complete`` tells whether that
+        covered the whole body, so full timings can still go in the headers.
+        """
+        chunks = iter(chunks)
+        
+        prefetched = []
+        size = 0
+        while self.prefetch_bytes is None or size < self.prefetch_bytes:
+            try:
+                chunk = next(chunks)
+            except StopIteration:
+                self.body_complete = True
+                break
+            prefetched.append(chunk)
+            size += len(chunk)
+        
+        self.streaming = True
+        return self._stream(prefetched if self.body_complete else itertools.chain(prefetched, chunks))
+    
+    def _stream(self, chunks):
+        status = 500
+        try:
+            for chunk in chunks:
+                self.output_bytes += len(chunk)
+                sent = time.perf_counter()
+                yield chunk
+                self.clock.add(STAGE_SEND, time.perf_counter() - sent)
+            status = 200
+        except GeneratorExit:
+            status = STATUS_CLIENT_CLOSED
+            raise
+        finally:
+            self.finish(status)
+    
+    def finish(self, status):
+        """Record the request once; later calls are ignored"""
+        if self._finished:
+            return
+        self._finished = True
+        
+        IN_PROGRESS.dec()
+        REQUESTS.labels(self.password_format, str(status)).inc()
+        REQUEST_SECONDS.labels(self.password_format).observe(self.clock.elapsed())
+        
+        for stage, seconds in self.clock.totals.items():
+            STAGE_SECONDS.labels(stage).observe(seconds)
+        
+        if STAGE_PARSE in self.clock.counts:
+            ROWS.labels(self.password_format).observe(self.clock.counts[STAGE_PARSE])
+        if self.input_bytes:
+            INPUT_BYTES.observe(self.input_bytes)
+        OUTPUT_BYTES.observe(self.output_bytes)
+        
+        for callback in self.on_finish:
+            callback()
@@ -0,0 +1,52 @@
+"""
+Whole conversions for a separate process
+
+The ASGI server (asgi.py) keeps its event loop free by running each
+conversion here, on the shared process pool: the inventory is read from
+a spooled input file and the (optionally compressed) sessions file is
+written to an output file, so only paths and timings cross the process
+boundary.
+"""
+
+from mxtcore.cipher import DEFAULT_KDF
+from mxtcore.compression import iter_compressed
+from mxtcore.inventory import open_inventory_rows
+from mxtcore.render import iter_mxtsessions_content, iter_chunks
+from mxtcore.timing import StageClock, STAGE_PARSE, STAGE_RENDER
+
+def convert_file(input_path, output_path, input_format, base_filename, password_format='plain',
+                 encryption_key=None, kdf=DEFAULT_KDF, encoding=None):
+    """Convert the inventory at ``input_path`` into a sessions file at ``output_path``
+
+    ``encoding`` compresses the output with that content coding. Returns
+    the ``(totals, counts)`` of the conversion's StageClock.
+    """
+    clock = StageClock()
+    
+    with open(input_path, 'rb') as f:
+        try:
+            data = clock.measure(STAGE_PARSE, open_inventory_rows, f, input_format)
+        except Exception as e:
+            # Reported to the client as a bad upload (400), like the Flask app does
+            raise ValueError(str(e))
+        
+        # Already running on a pool worker, so encrypt serially inside it
+        sessions_content = iter_mxtsessions_content(
+            data,
+            base_filename,
+            password_format=password_format,
+            encryption_key=encryption_key,
+            kdf=kdf,
+            encrypt_workers=1,
+            clock=clock
+        )
+        
+        chunks = clock.wrap(iter_chunks(sessions_content), STAGE_RENDER)
+        if encoding:
+            chunks = iter_compressed(chunks, encoding)
+        
+        with open(output_path, 'wb') as out:
+            for chunk in chunks:
+                out.write(chunk)
+    
+    return clock.totals, clock.counts
@@ -0,0 +1,238 @@
+"""
+Parallel password encryption (and decryption) for large inventories
+
+Passwords are split into ordered chunks and fanned out to a thread or
+process pool; results are yielded back in input order. Inputs below the
+row-count threshold are encrypted serially so small uploads pay no pool
+overhead.
+"""
+
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from collections import deque
+import itertools
+import multiprocessing
+import os
+import threading
+from mxtcore.cipher import get_cipher_context, DEFAULT_KDF
+from mxtcore.records import STATUS_DECRYPTED, STATUS_PLAIN, STATUS_FAILED
+
+EXECUTOR_THREAD = 'thread'
+EXECUTOR_PROCESS = 'process'
+EXECUTOR_CHOICES = (EXECUTOR_THREAD, EXECUTOR_PROCESS)
+
+# Tunables, overridable through the environment
+ENCRYPT_WORKERS = int(os.environ.get('MXT_ENCRYPT_WORKERS', os.cpu_count() or 1))
+ENCRYPT_EXECUTOR = os.environ.get('MXT_ENCRYPT_EXECUTOR', EXECUTOR_PROCESS)
+ENCRYPT_CHUNK_SIZE = int(os.environ.get('MXT_ENCRYPT_CHUNK_SIZE', 1000))
+PARALLEL_THRESHOLD = int(os.environ.get('MXT_PARALLEL_THRESHOLD', 5000))
+
+# Pools are created from multithreaded processes (gthread workers, job threads), where a
+# plain fork can copy a lock held by another thread and deadlock the child
+POOL_START_METHOD = os.environ.get(
+    'MXT_POOL_START_METHOD',
+    'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+)
+
+# Imported once by the fork server, so each pool process starts with them loaded
+POOL_PRELOAD_MODULES = ['mxtcore.parallel', 'mxtcore.batch', 'mxtcore.offload']
+
+_executors = {}
+_executors_lock = threading.Lock()
+
+def get_executor(kind=None, workers=None):
+    """Return the shared pool for ``kind``, creating it on first use
+
+    A pool broken by a dead worker process is replaced, so one crash fails
+    only the work that was in flight at the time.
+    """
+    kind = kind or ENCRYPT_EXECUTOR
+    workers = workers or ENCRYPT_WORKERS
+    
+    if kind not in EXECUTOR_CHOICES:
+        raise ValueError(f"Unsupported executor '{kind}', expected one of: {', '.join(EXECUTOR_CHOICES)}")
+    
+    with _executors_lock:
+        executor = _executors.get((kind, workers))
+        if executor is not None and _is_broken(executor):
+            # A pool process died (e.g. OOM-killed) and the pool refuses all further work; start a new one
+            del _executors[(kind, workers)]
+            executor.shutdown(wait=False, cancel_futures=True)
+            executor = None
+        
+        if executor is None:
+            if kind == EXECUTOR_PROCESS:
+                executor = ProcessPoolExecutor(max_workers=workers, mp_context=_process_context())
+            else:
+                executor = ThreadPoolExecutor(max_workers=workers)
+            _executors[(kind, workers)] = executor
+        return executor
+
+def _is_broken(executor):
+    """True once a pool can no longer run work (``BrokenExecutor`` on every submit)"""
+    return bool(getattr(executor, '_broken', False))
+
+def _process_context():
+    context = multiprocessing.get_context(POOL_START_METHOD)
+    if POOL_START_METHOD == 'forkserver':
+        context.set_forkserver_preload(POOL_PRELOAD_MODULES)
+    return context
+
+def shutdown_executors():
+    """Shut down every shared pool, waiting for pending work and for pool processes to exit"""
+    with _executors_lock:
+        executors = list(_executors.values())
+        _executors.clear()
+    
+    for executor in executors:
+        executor.shutdown(wait=True)
+
+def encrypt_chunk(passwords, master_password, kdf=DEFAULT_KDF):
+    """Encrypt a list of passwords with one cipher context
+
+    Empty passwords are returned unchanged as ``''`` and passwords that
+    fail to encrypt come back as ``None``, so one bad value never aborts
+    the rest of the chunk.
+    """
+    cipher = get_cipher_context(master_password, kdf)
+    results = []
+    
+    for password in passwords:
+        if not password:
+            results.append('')
+            continue
+        try:
+            results.append(cipher.encrypt(password))
+        except Exception:
+            results.append(None)
+    
+    return results
+
+def reuse_chunk(pairs, master_password, kdf=DEFAULT_KDF):
+    """Like ``encrypt_chunk`` for ``(password, previous_token)`` pairs
+
+    A previous token is kept when it still decrypts to ``password`` with
+    this master password; otherwise the password is encrypted afresh.
+    """
+    cipher = get_cipher_context(master_password, kdf)
+    results = []
+    
+    for password, token in pairs:
+        if token and password:
+            try:
+                if cipher.decrypt(token) == password:
+                    results.append(token)
+                    continue
+            except Exception:
+                pass
+        
+        if not password:
+            results.append('')
+            continue
+        try:
+            results.append(cipher.encrypt(password))
+        except Exception:
+            results.append(None)
+    
+    return results
+
+def verify_chunk(pairs, master_password, kdf=DEFAULT_KDF):
+    """Check ``(password, previous_token)`` pairs, True where the token still decrypts to the password"""
+    cipher = get_cipher_context(master_password, kdf)
+    results = []
+    
+    for password, token in pairs:
+        verified = False
+        if token == '':
+            # The previous password was empty and is kept only while it stays empty
+            verified = not password
+        elif token and password:
+            try:
+                verified = cipher.decrypt(token) == password
+            except Exception:
+                pass
+        results.append(verified)
+    
+    return results
+
+def decrypt_chunk(passwords, master_password, kdf=DEFAULT_KDF):
+    """Decrypt a list of session passwords with one cipher context
+
+    Returns one ``(status, value)`` pair per password: the decrypted
+    password for STATUS_DECRYPTED, the password unchanged for
+    STATUS_PLAIN, or the error message for STATUS_FAILED.
+    """
+    cipher = get_cipher_context(master_password, kdf)
+    results = []
+    
+    for password in passwords:
+        if password.startswith('ENCRYPT_FAILED_'):
+            # Encryption failed at generation time and the original password was kept
+            results.append((STATUS_DECRYPTED, password.replace('ENCRYPT_FAILED_', '')))
+        elif password.startswith('ENC:'):
+            try:
+                results.append((STATUS_DECRYPTED, cipher.decrypt(password[4:])))
+            except Exception as e:
+                results.append((STATUS_FAILED, str(e) or type(e).__name__))
+        else:
+            results.append((STATUS_PLAIN, password))
+    
+    return results
+
+def iter_encrypted(items, master_password, kdf=DEFAULT_KDF, password_of=None,
+                   workers=None, executor=None, chunk_size=None, threshold=None, chunk_func=None):
+    """Yield ``(item, encrypted)`` pairs in input order
+
+    ``password_of`` extracts the password from each item (the item itself
+    by default). ``encrypted`` follows the ``encrypt_chunk`` convention.
+    ``chunk_func`` replaces ``encrypt_chunk`` (e.g. ``reuse_chunk``, with
+    ``password_of`` returning pairs, ``verify_chunk`` or ``decrypt_chunk``). Items are consumed lazily, with at
+    most ``2 * workers`` chunks in flight, so memory stays bounded for
+    streamed inputs.
+    """
+    password_of = password_of or (lambda item: item)
+    chunk_func = chunk_func or encrypt_chunk
+    workers = workers or ENCRYPT_WORKERS
+    chunk_size = chunk_size or ENCRYPT_CHUNK_SIZE
+    threshold = PARALLEL_THRESHOLD if threshold is None else threshold
+    
+    items = iter(items)
+    head = list(itertools.islice(items, threshold))
+    
+    # Small inputs (or a single worker) stay serial
+    if workers <= 1 or len(head) < threshold:
+        for chunk in _chunked(itertools.chain(head, items), chunk_size):
+            yield from zip(chunk, chunk_func([password_of(item) for item in chunk], master_password, kdf))
+        return
+    
+    pool = get_executor(executor, workers)
+    pending = deque()
+    
+    try:
+        for chunk in _chunked(itertools.chain(head, items), chunk_size):
+            passwords = [password_of(item) for item in chunk]
+            pending.append((chunk, pool.submit(chunk_func, passwords, master_password, kdf)))
+            
+            if len(pending) >= workers * 2:
+                chunk, future = pending.popleft()
+                yield from zip(chunk, future.result())
+        
+        while pending:
+            chunk, future = pending.popleft()
+            yield from zip(chunk, future.result())
+    finally:
+        # Drop queued work if the consumer stops early (e.g. client disconnect)
+        for _, future in pending:
+            future.cancel()
+
+def encrypt_passwords(passwords, master_password, kdf=DEFAULT_KDF, **options):
+    """Encrypt a sequence of passwords, returning the results as a list in input order"""
+    return [encrypted for _, encrypted in iter_encrypted(passwords, master_password, kdf, **options)]
+
+def _chunked(iterable, size):
+    """Split an iterable into lists of at most ``size`` items"""
+    iterator = iter(iterable)
+    while True:
+        chunk = list(itertools.islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
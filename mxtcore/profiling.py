@@ -0,0 +1,72 @@
+"""
+Opt-in cProfile capture for single /generate requests
+
+Profiling is off unless the server enables it; a client then asks for a
+profile of one request with a header. Each profile is written to a local
+directory as ``<profile_id>.prof`` (for pstats, snakeviz, ...) plus a
+``<profile_id>.txt`` summary of the most expensive calls.
+"""
+
+import cProfile
+import io
+import os
+import pstats
+import re
+import uuid
+
+# Profile ids are uuid4 hex strings; anything else is rejected before touching the filesystem
+PROFILE_ID_PATTERN = re.compile(r'^[0-9a-f]{32}$')
+
+PROFILE_FORMAT_PSTATS = 'prof'
+PROFILE_FORMAT_TEXT = 'txt'
+PROFILE_FORMATS = (PROFILE_FORMAT_PSTATS, PROFILE_FORMAT_TEXT)
+
+# Functions listed in the text summary
+SUMMARY_LIMIT = 60
+
+class RequestProfiler:
+    """cProfile session for one request, saved to ``directory`` when stopped"""
+    
+    def __init__(self, directory):
+        self.directory = directory
+        self.profile_id = uuid.uuid4().hex
+        self._profile = None
+    
+    def start(self):
+        """Start profiling the current thread; returns False if another profiler is already active"""
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+        except ValueError:
+            return False
+        
+        self._profile = profile
+        return True
+    
+    def stop(self):
+        """Stop profiling and write the ``.prof`` and ``.txt`` files"""
+        if self._profile is None:
+            return
+        
+        profile = self._profile
+        self._profile = None
+        profile.disable()
+        
+        os.makedirs(self.directory, exist_ok=True)
+        profile.dump_stats(self.path(PROFILE_FORMAT_PSTATS))
+        
+        summary = io.StringIO()
+        stats = pstats.Stats(profile, stream=summary)
+        stats.sort_stats(pstats.SortKey.CUMULATIVE).print_stats(SUMMARY_LIMIT)
+        stats.sort_stats(pstats.SortKey.TIME).print_stats(SUMMARY_LIMIT)
+        with open(self.path(PROFILE_FORMAT_TEXT), 'w', encoding='utf-8') as f:
+            f.write(summary.getvalue())
+    
+    def path(self, profile_format):
+        return profile_path(self.directory, self.profile_id, profile_format)
+
+def profile_path(directory, profile_id, profile_format=PROFILE_FORMAT_PSTATS):
+    """Path of a saved profile, or None for malformed ids and formats"""
+    if not PROFILE_ID_PATTERN.match(profile_id) or profile_format not in PROFILE_FORMATS:
+        return None
+    return os.path.join(directory, f"{profile_id}.{profile_format}")
@@ -0,0 +1,96 @@
+"""
+Compact per-session record shared by the generator and the tools
+
+One ``__slots__`` object per inventory row or parsed session replaces the
+per-row dictionaries used before, and decryption updates records in
+place through ``status`` and ``error`` instead of copying them. Legacy
+dictionary-style access (``record['Hostname']``) still works for callers
+outside the hot paths.
+"""
+
+# Status flags set in place by decrypt_sessions
+STATUS_PENDING = 0
+STATUS_DECRYPTED = 1
+STATUS_PLAIN = 2
+STATUS_FAILED = 3
+
+# Dictionary keys used by earlier versions, mapped to record attributes
+KEY_ATTRIBUTES = {
+    'Hostname': 'hostname',
+    'IP': 'ip',
+    'ip': 'ip',
+    'user': 'user',
+    'username': 'user',
+    'password': 'password',
+    'session_name': 'name'
+}
+
+# Columns every inventory record has, in inventory order
+BASE_COLUMNS = ('Hostname', 'IP', 'user', 'password')
+
+class SessionRecord:
+    """One server: an inventory row, or a session parsed from a .mxtsessions file
+
+    Inventory rows have ``hostname``; parsed sessions have ``session_name``
+    instead. ``extra`` holds optional inventory columns (or None).
+    """
+    
+    __slots__ = ('hostname', 'ip', 'user', 'password', 'session_name', 'extra', 'status', 'error')
+    
+    def __init__(self, hostname, ip, user, password, session_name=None, extra=None):
+        self.hostname = hostname
+        self.ip = ip
+        self.user = user
+        self.password = password
+        self.session_name = session_name
+        self.extra = extra
+        self.status = STATUS_PENDING
+        self.error = None
+    
+    @classmethod
+    def from_session_entry(cls, entry):
+        return cls(None, entry.ip, entry.username, entry.password, session_name=entry.session_name)
+    
+    @classmethod
+    def from_dict(cls, row):
+        """Build a record from an inventory or session dictionary"""
+        # Plain four-column inventory rows are by far the most common
+        if len(row) == len(BASE_COLUMNS) and 'Hostname' in row:
+            return cls(row['Hostname'], row['IP'], row['user'], row['password'])
+        
+        extra = {key: value for key, value in row.items() if key not in KEY_ATTRIBUTES} or None
+        return cls(row.get('Hostname'), row.get('IP', row.get('ip')), row.get('user', row.get('username')),
+                   row.get('password'), session_name=row.get('session_name'), extra=extra)
+    
+    @property
+    def name(self):
+        """Session name: as parsed, or ``Hostname_IP`` for inventory rows"""
+        if self.session_name is not None:
+            return self.session_name
+        return f"{self.hostname}_{self.ip}"
+    
+    def keys(self):
+        """Inventory columns this record carries"""
+        return BASE_COLUMNS + tuple(self.extra or ())
+    
+    def __getitem__(self, key):
+        attribute = KEY_ATTRIBUTES.get(key)
+        if attribute is not None:
+            return getattr(self, attribute)
+        if self.extra and key in self.extra:
+            return self.extra[key]
+        raise KeyError(key)
+    
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+    
+    def __repr__(self):
+        return f"SessionRecord({self.name!r}, ip={self.ip!r}, user={self.user!r})"
+
+def as_records(rows):
+    """Yield ``rows`` as SessionRecords, converting dictionaries from older callers"""
+    for row in rows:
+        yield SessionRecord.from_dict(row) if isinstance(row, dict) else row
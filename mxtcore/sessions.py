@@ -0,0 +1,44 @@
+"""
+Parsing of generated .mxtsessions files
+
+Shared by the decryption tool and incremental regeneration, which both
+need the session name, IP, username and password of every SSH session
+line without decoding the rest of the file.
+"""
+
+import re
+from collections import namedtuple
+
+# Session line (any icon, session type and port) split into name, host, username, password and the untouched tail;
+# the username and password may be empty
+SESSION_LINE_PATTERN = re.compile(r'^([^=]+)=#\d+#\d+%([^%]+)%\d*%([^%]*)%([^%]*)(%.*)$')
+
+# Marker every session line carries; lines without it are skipped before decoding
+SESSION_MARKER = b'=#'
+
+# Compact record yielded by the incremental parser; ``settings`` is only filled in on request
+SessionEntry = namedtuple('SessionEntry', ['session_name', 'ip', 'username', 'password', 'settings'], defaults=(None,))
+
+def match_session_line(line):
+    """Match a stripped line against the session pattern, or return None for non-session lines"""
+    if not line or line.startswith('[') or '=#' not in line:
+        return None
+    return SESSION_LINE_PATTERN.match(line)
+
+def session_settings(line, match):
+    """A matched session line with its password field emptied, to compare everything but the password"""
+    return line[:match.start(4)] + line[match.end(4):]
+
+def iter_session_entries(raw_lines, settings=False):
+    """Yield one SessionEntry per session line in an iterable of raw byte lines
+
+    With ``settings``, each entry also carries ``session_settings`` of its line.
+    """
+    for raw_line in raw_lines:
+        if SESSION_MARKER not in raw_line:
+            continue
+        
+        line = raw_line.decode('utf-8').strip()
+        match = match_session_line(line)
+        if match:
+            yield SessionEntry(*match.group(1, 2, 3, 4), session_settings(line, match) if settings else None)
@@ -0,0 +1,172 @@
+"""
+Precompiled session-line templates
+
+A template is one .mxtsessions session line with ``{column}`` or
+``{column:default}`` slots, e.g. ``{Hostname}_{IP}=#109#0%{IP}%{port:22}%...``.
+``{password}`` receives the rendered password (plain or ``ENC:`` token);
+every other slot reads the inventory column of the same name from a
+``SessionRecord`` (an attribute for the base columns). Templates
+are compiled once per set of inventory columns into a function that
+builds each line with a single ``''.join``: slots for columns the
+inventory doesn't have are folded into the static text at compile time,
+so rows are never parsed or formatted.
+"""
+
+import hashlib
+import os
+import re
+
+SLOT_PATTERN = re.compile(r'\{([A-Za-z_][A-Za-z0-9_]*)(?::([^{}]*))?\}')
+
+# Slot filled with the rendered password rather than an inventory column
+PASSWORD_SLOT = 'password'
+
+# Column selecting the template for each row
+TYPE_COLUMN = 'type'
+
+# Base inventory columns are record attributes; other columns live in ``record.extra``
+COLUMN_ATTRIBUTES = {'Hostname': 'hostname', 'IP': 'ip', 'user': 'user'}
+
+SESSION_SSH = 'ssh'
+SESSION_RDP = 'rdp'
+SESSION_VNC = 'vnc'
+DEFAULT_SESSION_TYPE = SESSION_SSH
+
+# Terminal settings, font and colors shared by the built-in templates
+TERMINAL_SETTINGS = "#MobaFont%10%0%0%-1%15%236,236,236%30,30,30%180,180,192%0%-1%0%%xterm%-1%-1%_Std_Colors_0_%80%24%0%1%-1%<none>%%0%1%-1#0# #-1"
+
+# Built-in session lines; jump host and key fields sit where MobaXterm keeps the SSH gateway and private key
+BUILTIN_TEMPLATES = {
+    SESSION_SSH: "{Hostname}_{IP}=#109#0%{IP}%{port:22}%{user}%{password}%-1%-1%%{jump_host}%{jump_port}%{jump_user}%0%0%0%{ssh_key}%1080%%0%0%1" + TERMINAL_SETTINGS,
+    SESSION_RDP: "{Hostname}_{IP}=#91#4%{IP}%{port:3389}%{user}%{password}%0%-1%0%0%0%-1%0%0%{jump_host}%{jump_port}%{jump_user}%0%0%0%0%-1%0%0%0" + TERMINAL_SETTINGS,
+    SESSION_VNC: "{Hostname}_{IP}=#128#5%{IP}%{port:5900}%{user}%{password}%-1%0%%{jump_host}%{jump_port}%{jump_user}%0%0%0%0" + TERMINAL_SETTINGS
+}
+
+# Extension of template files in a template directory (``<type>.tmpl``)
+TEMPLATE_EXTENSION = '.tmpl'
+
+class SessionTemplate:
+    """One session-line template split into static segments and slots"""
+    
+    def __init__(self, source, name=DEFAULT_SESSION_TYPE):
+        self.name = name
+        self.source = source.rstrip('\r\n')
+        self.segments = []
+        self.slots = []
+        
+        position = 0
+        for match in SLOT_PATTERN.finditer(self.source):
+            self.segments.append(self.source[position:match.start()])
+            self.slots.append((match.group(1), match.group(2) or ''))
+            position = match.end()
+        self.segments.append(self.source[position:] + '\n')
+        
+        if '{' in ''.join(self.segments) or '}' in ''.join(self.segments):
+            raise ValueError(f"Template '{name}' has a malformed slot")
+        
+        self._compiled = {}
+    
+    def compile(self, columns):
+        """Return ``render(row, password) -> str`` for rows that have ``columns``"""
+        key = frozenset(columns)
+        render = self._compiled.get(key)
+        if render is None:
+            render = self._compiled[key] = self._build(key)
+        return render
+    
+    def _build(self, columns):
+        namespace = {}
+        parts = []
+        static = [self.segments[0]]
+        
+        def flush_static():
+            if static and ''.join(static):
+                name = f"s{len(namespace)}"
+                namespace[name] = ''.join(static)
+                parts.append(name)
+            static.clear()
+        
+        for (column, default), segment in zip(self.slots, self.segments[1:]):
+            if column == PASSWORD_SLOT:
+                flush_static()
+                parts.append('password')
+            elif column in columns:
+                flush_static()
+                if column in COLUMN_ATTRIBUTES:
+                    value = f"row.{COLUMN_ATTRIBUTES[column]}"
+                else:
+                    column_name = f"c{len(namespace)}"
+                    namespace[column_name] = column
+                    value = f"row.extra[{column_name}]"
+                
+                if default:
+                    default_name = f"d{len(namespace)}"
+                    namespace[default_name] = default
+                    value = f"({value} or {default_name})"
+                parts.append(value)
+            else:
+                # Column absent from this inventory: the default is constant, fold it into the static text
+                static.append(default)
+            static.append(segment)
+        flush_static()
+        
+        # Only generated names appear in the source; all template text lives in the namespace
+        source = f"def render(row, password):\n    return ''.join(({', '.join(parts)},))\n"
+        exec(compile(source, f"<session template {self.name}>", 'exec'), namespace)
+        return namespace['render']
+
+class TemplateSet:
+    """Session templates by type, with the row renderer selected per inventory"""
+    
+    def __init__(self, templates=None):
+        self.templates = {
+            session_type: SessionTemplate(source, session_type)
+            for session_type, source in (templates or BUILTIN_TEMPLATES).items()
+        }
+        if DEFAULT_SESSION_TYPE not in self.templates:
+            raise ValueError(f"A '{DEFAULT_SESSION_TYPE}' template is required")
+        
+        # Identifies the output these templates produce (part of result cache keys)
+        digest = hashlib.sha256()
+        for session_type in sorted(self.templates):
+            digest.update(f"{session_type}\0{self.templates[session_type].source}\0".encode('utf-8'))
+        self.fingerprint = digest.hexdigest()[:16]
+    
+    def renderer(self, columns):
+        """Return ``render(row, password) -> str`` for rows that have ``columns``
+
+        Without a ``type`` column every row uses the SSH template; otherwise
+        each row picks its template by type (empty means SSH).
+        """
+        columns = frozenset(columns)
+        default = self.templates[DEFAULT_SESSION_TYPE].compile(columns)
+        if TYPE_COLUMN not in columns:
+            return default
+        
+        renderers = {session_type: template.compile(columns) for session_type, template in self.templates.items()}
+        renderers[''] = default
+        
+        def render(row, password):
+            render_type = renderers.get(row.extra[TYPE_COLUMN])
+            if render_type is None:
+                raise ValueError(f"{row.hostname}: unsupported session type '{row.extra[TYPE_COLUMN]}', "
+                                 f"expected one of: {', '.join(self.templates)}")
+            return render_type(row, password)
+        
+        return render
+
+def load_templates(directory):
+    """Built-in templates overridden or extended by ``<type>.tmpl`` files in ``directory``"""
+    templates = dict(BUILTIN_TEMPLATES)
+    
+    for file_name in sorted(os.listdir(directory)):
+        session_type, extension = os.path.splitext(file_name)
+        if extension != TEMPLATE_EXTENSION:
+            continue
+        with open(os.path.join(directory, file_name), encoding='utf-8') as f:
+            templates[session_type.lower()] = f.read()
+    
+    return TemplateSet(templates)
+
+# MXT_TEMPLATE_DIR swaps in custom templates for every conversion in this process
+DEFAULT_TEMPLATES = load_templates(os.environ['MXT_TEMPLATE_DIR']) if os.environ.get('MXT_TEMPLATE_DIR') else TemplateSet()
@@ -0,0 +1,84 @@
+"""
+Per-stage wall clock timing for streamed conversions
+
+Parsing, encryption and rendering run interleaved inside one chain of
+generators, so each stage is timed by wrapping its iterator: time spent
+inside a wrapped ``next()`` is charged to that stage, minus whatever an
+inner wrapped stage consumed, giving exclusive per-stage totals.
+"""
+
+import time
+
+STAGE_UPLOAD = 'upload'
+STAGE_PARSE = 'parse'
+STAGE_ENCRYPT = 'encrypt'
+STAGE_RENDER = 'render'
+STAGE_SEND = 'send'
+STAGES = (STAGE_UPLOAD, STAGE_PARSE, STAGE_ENCRYPT, STAGE_RENDER, STAGE_SEND)
+
+# Stages reported in the Server-Timing header; sending happens after the headers are out
+SERVER_TIMING_STAGES = (STAGE_UPLOAD, STAGE_PARSE, STAGE_ENCRYPT, STAGE_RENDER)
+
+class StageClock:
+    """Accumulates exclusive wall time per stage for one request"""
+    
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.totals = {}
+        self.counts = {}
+        self._stack = []
+        self._mark = self.started
+    
+    def _enter(self, stage):
+        now = time.perf_counter()
+        if self._stack:
+            self.add(self._stack[-1], now - self._mark)
+        self._stack.append(stage)
+        self._mark = now
+    
+    def _exit(self):
+        now = time.perf_counter()
+        self.add(self._stack.pop(), now - self._mark)
+        self._mark = now
+    
+    def add(self, stage, seconds):
+        """Charge ``seconds`` to ``stage``"""
+        self.totals[stage] = self.totals.get(stage, 0.0) + seconds
+    
+    def measure(self, stage, func, *args, **kwargs):
+        """Call ``func`` and charge its run time to ``stage``"""
+        self._enter(stage)
+        try:
+            return func(*args, **kwargs)
+        finally:
+            self._exit()
+    
+    def wrap(self, iterable, stage):
+        """Yield from ``iterable``, charging the time spent producing each item to ``stage``
+
+        The number of items produced is kept in ``counts[stage]``.
+        """
+        iterator = iter(iterable)
+        self.counts.setdefault(stage, 0)
+        
+        while True:
+            self._enter(stage)
+            try:
+                item = next(iterator)
+            except StopIteration:
+                return
+            finally:
+                self._exit()
+            
+            self.counts[stage] += 1
+            yield item
+    
+    def elapsed(self):
+        """Seconds since the clock was created"""
+        return time.perf_counter() - self.started
+    
+    def server_timing(self, stages=SERVER_TIMING_STAGES):
+        """``Server-Timing`` header value with each stage and the total so far, in milliseconds"""
+        entries = [f"{stage};dur={self.totals.get(stage, 0.0) * 1000:.1f}" for stage in stages]
+        entries.append(f"total;dur={self.elapsed() * 1000:.1f}")
+        return ', '.join(entries)
@@ -0,0 +1,106 @@
+"""
+Bounded-memory handling of uploaded inventories
+
+Uploads are spooled: the first ``UPLOAD_SPOOL_BYTES`` of each file stay
+in memory and anything larger overflows to an anonymous temp file. The
+parsers read that stream directly, so a large workbook is never held in
+memory as one bytes object. Gzip uploads are decompressed into another
+spool the same way, with a cap on the decompressed size.
+"""
+
+import gzip
+import os
+import shutil
+import tempfile
+import zlib
+from mxtcore.compression import GZIP_MAGIC
+
+# Per-file bytes kept in memory before spooling to disk
+UPLOAD_SPOOL_BYTES = int(os.environ.get('MXT_UPLOAD_SPOOL_BYTES', 1024 * 1024))
+
+# Whole request body limit (Flask MAX_CONTENT_LENGTH); larger requests get 413 before the body is read
+MAX_UPLOAD_BYTES = int(os.environ.get('MXT_MAX_UPLOAD_BYTES', 256 * 1024 * 1024))
+
+# Limit on the size of a gzip upload once decompressed
+MAX_DECOMPRESSED_BYTES = int(os.environ.get('MXT_MAX_DECOMPRESSED_BYTES', 1024 * 1024 * 1024))
+
+COPY_BUFFER_BYTES = 1024 * 1024
+
+class UploadTooLarge(Exception):
+    """Raised when an upload exceeds a configured size limit (answered with 413)"""
+
+def spooled_file():
+    """Empty upload buffer: in memory up to ``UPLOAD_SPOOL_BYTES``, then an anonymous temp file"""
+    return tempfile.SpooledTemporaryFile(max_size=UPLOAD_SPOOL_BYTES, mode='w+b')
+
+def format_limit(limit):
+    """``268435456`` -> ``256 MB``"""
+    if limit >= 1024 * 1024:
+        return f"{limit // (1024 * 1024)} MB"
+    return f"{limit} bytes"
+
+def stream_size(stream):
+    """Size in bytes of a seekable stream, leaving its position unchanged"""
+    position = stream.tell()
+    size = stream.seek(0, os.SEEK_END)
+    stream.seek(position)
+    return size
+
+def _copy_limited(source, target, limit, label):
+    total = 0
+    while True:
+        block = source.read(COPY_BUFFER_BYTES)
+        if not block:
+            break
+        total += len(block)
+        if limit is not None and total > limit:
+            raise UploadTooLarge(f"{label} exceeds the {format_limit(limit)} limit")
+        target.write(block)
+    target.seek(0)
+
+def open_upload(stream, max_decompressed_bytes=None):
+    """Return a readable, seekable stream over an uploaded file, positioned at its start
+
+    Gzip uploads are decompressed into a new spooled file (rejected with
+    UploadTooLarge past ``max_decompressed_bytes``); anything else is the
+    upload's own stream.
+    """
+    max_decompressed_bytes = MAX_DECOMPRESSED_BYTES if max_decompressed_bytes is None else max_decompressed_bytes
+    
+    stream.seek(0)
+    if stream.read(len(GZIP_MAGIC)) != GZIP_MAGIC:
+        stream.seek(0)
+        return stream
+    
+    stream.seek(0)
+    decompressed = spooled_file()
+    try:
+        with gzip.GzipFile(fileobj=stream, mode='rb') as gz:
+            _copy_limited(gz, decompressed, max_decompressed_bytes, "Decompressed upload")
+    except UploadTooLarge:
+        decompressed.close()
+        raise
+    except (OSError, EOFError, zlib.error) as e:
+        decompressed.close()
+        raise Exception(f"Invalid gzip upload: {str(e)}")
+    
+    return decompressed
+
+def detach_upload(stream):
+    """Copy an upload to a temp file that outlives the request (for background jobs)
+
+    The caller owns the returned file and must close it.
+    """
+    copy = tempfile.TemporaryFile(mode='w+b')
+    stream.seek(0)
+    shutil.copyfileobj(stream, copy, COPY_BUFFER_BYTES)
+    copy.seek(0)
+    return copy
+
+def save_upload(stream, path):
+    """Copy an upload to ``path`` so other processes (pool workers) can open it by name"""
+    stream.seek(0)
+    with open(path, 'wb') as f:
+        shutil.copyfileobj(stream, f, COPY_BUFFER_BYTES)
+    stream.seek(0)
+    return path
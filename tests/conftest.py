@@ -0,0 +1,35 @@
+"""
+Shared fixtures for the MXTSessions Generator tests
+
+Run from the repository root with ``python -m pytest``.
+"""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+INVENTORY_COLUMNS = ['Hostname', 'IP', 'user', 'password']
+
+@pytest.fixture
+def inventory_rows():
+    """A small inventory as row dictionaries, including an empty user and password"""
+    return [
+        {'Hostname': 'web01', 'IP': '10.0.0.1', 'user': 'admin', 'password': 'pw-web01'},
+        {'Hostname': 'web02', 'IP': '10.0.0.2', 'user': 'deploy', 'password': 'p@ss word!'},
+        {'Hostname': 'db01', 'IP': '10.0.1.1', 'user': 'postgres', 'password': ''},
+        {'Hostname': 'bastion', 'IP': '10.0.2.1', 'user': '', 'password': ''},
+    ]
+
+@pytest.fixture
+def write_csv(tmp_path):
+    """Return ``write(name, rows, columns)``, which saves row dictionaries as a CSV inventory in tmp_path"""
+    def write(name, rows, columns=INVENTORY_COLUMNS):
+        path = tmp_path / name
+        lines = [','.join(columns)] + [','.join(str(row.get(column, '')) for column in columns) for row in rows]
+        path.write_text('\n'.join(lines) + '\n')
+        return str(path)
+    
+    return write
@@ -0,0 +1,37 @@
+"""
+mobaxterm_decrypt.py writing its output over its own input
+"""
+
+import os
+import subprocess
+import sys
+
+from mxtcore.render import generate_mxtsessions_content
+
+MASTER_PASSWORD = 'test-master-password'
+
+DECRYPT_TOOL = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'mobaxterm_decrypt.py')
+
+def run_decrypt(*args):
+    return subprocess.run([sys.executable, DECRYPT_TOOL, *args], capture_output=True, text=True)
+
+def test_output_may_be_the_input(tmp_path, inventory_rows):
+    sessions_file = tmp_path / 'servers.mxtsessions'
+    sessions_file.write_text(generate_mxtsessions_content(inventory_rows, 'servers', 'encrypted', MASTER_PASSWORD))
+    sessions_file.chmod(0o600)
+    
+    result = run_decrypt(str(sessions_file), MASTER_PASSWORD, '--output', str(sessions_file))
+    
+    assert result.returncode == 0, result.stderr
+    assert sessions_file.read_text() == generate_mxtsessions_content(inventory_rows, 'servers')
+    assert oct(sessions_file.stat().st_mode & 0o777) == oct(0o600)
+    assert os.listdir(tmp_path) == ['servers.mxtsessions']
+
+def test_file_without_sessions_is_left_alone(tmp_path):
+    sessions_file = tmp_path / 'empty.mxtsessions'
+    sessions_file.write_text("[Bookmarks]\nSubRep=empty\nImgNum=41\n\n")
+    
+    run_decrypt(str(sessions_file), MASTER_PASSWORD, '--output', str(sessions_file))
+    
+    assert sessions_file.read_text() == "[Bookmarks]\nSubRep=empty\nImgNum=41\n\n"
+    assert os.listdir(tmp_path) == ['empty.mxtsessions']
@@ -0,0 +1,78 @@
+"""
+Added/Changed/Removed counts of incremental regeneration against a previous file
+"""
+
+import pytest
+
+from mxtcore.incremental import PreviousSessions
+from mxtcore.records import as_records
+from mxtcore.render import generate_mxtsessions_content, iter_mxtsessions_content
+
+MASTER_PASSWORD = 'test-master-password'
+
+COLUMNS = ['Hostname', 'IP', 'user', 'password', 'port']
+
+PREVIOUS_ROWS = [
+    {'Hostname': 'web01', 'IP': '10.0.0.1', 'user': 'admin', 'password': 'pw-web01', 'port': '22'},
+    {'Hostname': 'web02', 'IP': '10.0.0.2', 'user': 'admin', 'password': 'pw-web02', 'port': '22'},
+    {'Hostname': 'db01', 'IP': '10.0.1.1', 'user': 'postgres', 'password': 'pw-db01', 'port': '22'},
+    {'Hostname': 'bastion', 'IP': '10.0.2.1', 'user': '', 'password': '', 'port': '22'},
+    {'Hostname': 'old01', 'IP': '10.0.9.1', 'user': 'admin', 'password': 'pw-old01', 'port': '22'},
+]
+
+# web02: new password, db01: new port, old01: removed, new01: added; web01 and bastion unchanged
+CURRENT_ROWS = [
+    {'Hostname': 'web01', 'IP': '10.0.0.1', 'user': 'admin', 'password': 'pw-web01', 'port': '22'},
+    {'Hostname': 'web02', 'IP': '10.0.0.2', 'user': 'admin', 'password': 'rotated', 'port': '22'},
+    {'Hostname': 'db01', 'IP': '10.0.1.1', 'user': 'postgres', 'password': 'pw-db01', 'port': '2222'},
+    {'Hostname': 'bastion', 'IP': '10.0.2.1', 'user': '', 'password': '', 'port': '22'},
+    {'Hostname': 'new01', 'IP': '10.0.3.1', 'user': 'admin', 'password': 'pw-new01', 'port': '22'},
+]
+
+EXPECTED_REPORT = {
+    'added': ['new01_10.0.3.1'],
+    'changed': ['web02_10.0.0.2', 'db01_10.0.1.1'],
+    'removed': ['old01_10.0.9.1'],
+    'unchanged': 2
+}
+
+def previous_sessions(rows, password_format):
+    content = generate_mxtsessions_content(rows, 'servers', password_format, MASTER_PASSWORD)
+    return content, PreviousSessions.from_content(content.encode('utf-8'))
+
+def render(rows, password_format, previous):
+    return ''.join(iter_mxtsessions_content(rows, 'servers', password_format, MASTER_PASSWORD, previous=previous))
+
+@pytest.mark.parametrize('password_format', ['plain', 'encrypted'])
+@pytest.mark.parametrize('compare_first', [False, True])
+def test_report_counts(password_format, compare_first):
+    _, previous = previous_sessions(PREVIOUS_ROWS, password_format)
+    if compare_first:
+        master_password = MASTER_PASSWORD if password_format == 'encrypted' else None
+        previous.compare(as_records(CURRENT_ROWS), master_password)
+    
+    render(CURRENT_ROWS, password_format, previous)
+    
+    assert previous.report.as_dict() == EXPECTED_REPORT
+
+@pytest.mark.parametrize('password_format', ['plain', 'encrypted'])
+@pytest.mark.parametrize('compare_first', [False, True])
+def test_unchanged_inventory_is_byte_identical(password_format, compare_first):
+    content, previous = previous_sessions(PREVIOUS_ROWS, password_format)
+    if compare_first:
+        previous.compare(as_records(PREVIOUS_ROWS), MASTER_PASSWORD if password_format == 'encrypted' else None)
+    
+    assert render(PREVIOUS_ROWS, password_format, previous) == content
+    assert previous.report.as_dict() == {'added': [], 'changed': [], 'removed': [], 'unchanged': len(PREVIOUS_ROWS)}
+
+def test_encrypted_tokens_kept_only_for_unchanged_passwords():
+    content, previous = previous_sessions(PREVIOUS_ROWS, 'encrypted')
+    old_lines = dict(line.split('=', 1) for line in content.splitlines() if '=#' in line)
+    new_lines = dict(line.split('=', 1) for line in render(CURRENT_ROWS, 'encrypted', previous).splitlines() if '=#' in line)
+    
+    assert new_lines['web01_10.0.0.1'] == old_lines['web01_10.0.0.1']
+    assert new_lines['web02_10.0.0.2'] != old_lines['web02_10.0.0.2']
+    # Only the port changed, so the token is kept and the rest of the line differs
+    old_token = old_lines['db01_10.0.1.1'].split('%')[4]
+    assert new_lines['db01_10.0.1.1'].split('%')[4] == old_token
+    assert new_lines['db01_10.0.1.1'] != old_lines['db01_10.0.1.1']
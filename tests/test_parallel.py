@@ -0,0 +1,29 @@
+"""
+Shared executor pools recovering from a dead worker process
+"""
+
+import os
+import signal
+import time
+
+from mxtcore.parallel import get_executor, shutdown_executors, EXECUTOR_PROCESS
+
+def wait_until_broken(pool, timeout=10):
+    deadline = time.monotonic() + timeout
+    while not pool._broken and time.monotonic() < deadline:
+        time.sleep(0.05)
+    return pool._broken
+
+def test_get_executor_replaces_broken_pool():
+    pool = get_executor(EXECUTOR_PROCESS, 1)
+    try:
+        os.kill(pool.submit(os.getpid).result(), signal.SIGKILL)
+        assert wait_until_broken(pool)
+        
+        replacement = get_executor(EXECUTOR_PROCESS, 1)
+        
+        assert replacement is not pool
+        assert replacement.submit(os.getpid).result() > 0
+        assert get_executor(EXECUTOR_PROCESS, 1) is replacement
+    finally:
+        shutdown_executors()
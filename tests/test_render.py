@@ -0,0 +1,79 @@
+"""
+Generated output must stay byte-identical to the original single-pass renderer
+"""
+
+import base64
+import hashlib
+import io
+
+import pytest
+from cryptography.fernet import Fernet
+
+from mxtcore.inventory import open_inventory_rows, FORMAT_CSV
+from mxtcore.render import generate_mxtsessions_content
+
+MASTER_PASSWORD = 'test-master-password'
+
+# Fernet tokens carry a random IV and a timestamp; pinning both makes encrypted output comparable byte for byte
+FIXED_IV = b'\x00' * 16
+FIXED_TIME = 1700000000
+
+def baseline_content(data, file_name, password_format='plain', encryption_key=None):
+    """The renderer of the first release, kept verbatim as the reference output"""
+    content = "[Bookmarks]\n"
+    content += f"SubRep={file_name}\n"
+    content += f"ImgNum=41\n\n"
+    
+    for row in data:
+        hostname = row['Hostname']
+        ip = row['IP']
+        username = row['user']
+        password = row['password']
+        
+        if password_format == 'encrypted' and encryption_key and password:
+            key = base64.urlsafe_b64encode(hashlib.sha256(encryption_key.encode()).digest())
+            password = base64.urlsafe_b64encode(Fernet(key).encrypt(password.encode())).decode()
+            password = f"ENC:{password}"
+        
+        session_name = f"{hostname}_{ip}"
+        content += f"{session_name}=#109#0%{ip}%22%{username}%{password}%-1%-1%%%%%0%0%0%%1080%%0%0%1#MobaFont%10%0%0%-1%15%236,236,236%30,30,30%180,180,192%0%-1%0%%xterm%-1%-1%_Std_Colors_0_%80%24%0%1%-1%<none>%%0%1%-1#0# #-1\n"
+    
+    return content
+
+@pytest.fixture
+def fixed_fernet(monkeypatch):
+    monkeypatch.setattr(Fernet, 'encrypt', lambda self, data: self._encrypt_from_parts(data, FIXED_TIME, FIXED_IV))
+
+@pytest.mark.parametrize('password_format', ['plain', 'encrypted'])
+def test_rows_match_baseline(inventory_rows, fixed_fernet, password_format):
+    expected = baseline_content(inventory_rows, 'servers', password_format, MASTER_PASSWORD)
+    content = generate_mxtsessions_content(inventory_rows, 'servers', password_format, MASTER_PASSWORD)
+    
+    assert content == expected
+
+@pytest.mark.parametrize('password_format', ['plain', 'encrypted'])
+def test_csv_inventory_matches_baseline(inventory_rows, write_csv, fixed_fernet, password_format):
+    path = write_csv('servers.csv', inventory_rows)
+    with open(path, 'rb') as f:
+        content = generate_mxtsessions_content(open_inventory_rows(f, FORMAT_CSV), 'servers', password_format,
+                                               MASTER_PASSWORD)
+    
+    assert content == baseline_content(inventory_rows, 'servers', password_format, MASTER_PASSWORD)
+
+def test_generate_endpoint_matches_baseline(inventory_rows):
+    from openpyxl import Workbook
+    from app import app
+    
+    workbook = Workbook()
+    workbook.active.append(['Hostname', 'IP', 'user', 'password'])
+    for row in inventory_rows:
+        workbook.active.append([row['Hostname'], row['IP'], row['user'], row['password']])
+    upload = io.BytesIO()
+    workbook.save(upload)
+    upload.seek(0)
+    
+    response = app.test_client().post('/generate', data={'file': (upload, 'servers.xlsx')},
+                                      content_type='multipart/form-data')
+    
+    assert response.status_code == 200
+    assert response.get_data() == baseline_content(inventory_rows, 'servers').encode('utf-8')